@@ -0,0 +1,316 @@
+"""
+Benchmarks in airspeed velocity (asv) format.
+
+Every class is parametrized by num_particles of dimer model. Methods prefixed by time_ are timed,
+peakmem_ ones report peak resident memory, track_ ones return tracked values (number of nonzeros).
+Benchmarks can be run by asv (see asv.conf.json) or offline by benchmarks/run.py.
+"""
+from oqspy.oqs import oqs
+from oqspy.parallel import csr_matvec, set_num_threads
+from oqspy.basis import to_hermitian_basis
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+from scipy.sparse import csr_matrix
+import numpy as np
+
+
+num_particles_ladder = [10, 50, 100, 200]
+
+E = 1.0
+U = 0.5
+J = 1.0
+gamma = 0.1
+drv_ampl = 1.5
+drv_freq = 1.0
+drv_phas = 0.0
+
+
+def dimer_system(num_particles, drv_type=0, precision='double', basis='vec'):
+    sys = oqs(dimer_get_sys_size(num_particles), 1, 1, precision=precision, basis=basis)
+    sys.init_hamiltonian(dimer_get_hamiltonian(num_particles, E, U, J))
+    sys.init_dissipation(dimer_get_dissipators(num_particles), [gamma / float(num_particles)])
+    sys.init_driving(
+        dimer_get_driving_hamiltonias(num_particles),
+        dimer_get_driving_functions(drv_type, drv_ampl, drv_freq, drv_phas)
+    )
+    return sys
+
+
+def initial_state(num_particles):
+    sys_size = dimer_get_sys_size(num_particles)
+    state = np.zeros(sys_size * sys_size, dtype=np.complex128)
+    state[0] = 1.0
+    return state
+
+
+class ModelSuite:
+    params = num_particles_ladder
+    param_names = ['num_particles']
+
+    def time_hamiltonian(self, num_particles):
+        dimer_get_hamiltonian(num_particles, E, U, J)
+
+    def time_driving_hamiltonians(self, num_particles):
+        dimer_get_driving_hamiltonias(num_particles)
+
+    def time_dissipators(self, num_particles):
+        dimer_get_dissipators(num_particles)
+
+
+class LindbladianSuite:
+    params = num_particles_ladder
+    param_names = ['num_particles']
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles)
+        self.sys.lindbladian
+
+    def time_calc_lindbladian(self, num_particles):
+        # Sparsity pattern is known after setup, so only data array is refilled
+        self.sys._oqs__calc_lindbladian()
+
+    def time_calc_driving_lindbladians(self, num_particles):
+        self.sys._oqs__calc_driving_lindbladians()
+
+    def time_lindbladian_from_scratch(self, num_particles):
+        dimer_system(num_particles).lindbladian
+
+    def peakmem_lindbladian_from_scratch(self, num_particles):
+        dimer_system(num_particles).lindbladian
+
+    def track_lindbladian_nnz(self, num_particles):
+        return self.sys.lindbladian.nnz
+
+    def track_driving_lindbladian_nnz(self, num_particles):
+        return self.sys.driving_lindbladians[0].nnz
+
+    track_lindbladian_nnz.unit = 'nnz'
+    track_driving_lindbladian_nnz.unit = 'nnz'
+
+
+class SteadyStateSuite:
+    params = num_particles_ladder
+    param_names = ['num_particles']
+    timeout = 600
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles)
+        self.sys.lindbladian
+
+    def time_direct(self, num_particles):
+        self.sys.steady_state(method='direct')
+
+    def peakmem_direct(self, num_particles):
+        self.sys.steady_state(method='direct')
+
+
+class BlockPropagationSuite:
+    # Sixteen basis states propagated over quarter of period together or one by one
+    params = num_particles_ladder[:2]
+    param_names = ['num_particles']
+    timeout = 600
+    num_states = 16
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles, drv_type=1)
+        self.sys.driven_generator
+        sys_size = dimer_get_sys_size(num_particles)
+        self.block = np.zeros((sys_size * sys_size, self.num_states), dtype=np.complex128)
+        state_ids = np.arange(self.num_states) % sys_size
+        self.block[state_ids * (sys_size + 1), np.arange(self.num_states)] = 1.0
+        self.time = 0.25 * dimer_get_periods(drv_freq)[0]
+
+    def time_block(self, num_particles):
+        for _ in self.sys.iter_propagate(self.block, [0.0, self.time]):
+            pass
+
+    def time_columns(self, num_particles):
+        for state_id in range(self.num_states):
+            for _ in self.sys.iter_propagate(self.block[:, state_id], [0.0, self.time]):
+                pass
+
+
+class BatchedPropagationSuite:
+    # Sixteen driving amplitudes propagated over quarter of period in one batch or one by one
+    params = num_particles_ladder[:2]
+    param_names = ['num_particles']
+    timeout = 600
+    amplitudes = np.linspace(0.5, 2.0, 16)
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles, drv_type=1)
+        self.sys.driving_lindbladians
+        self.state = initial_state(num_particles)
+        self.time = 0.25 * dimer_get_periods(drv_freq)[0]
+
+    def time_batch(self, num_particles):
+        for _ in self.sys.iter_propagate_batch(self.state, [0.0, self.time], driving_amplitudes=self.amplitudes):
+            pass
+
+    def time_points(self, num_particles):
+        driving_hamiltonians = dimer_get_driving_hamiltonias(num_particles)
+        for amplitude in self.amplitudes:
+            self.sys.init_driving(driving_hamiltonians, dimer_get_driving_functions(1, amplitude * drv_ampl, drv_freq, drv_phas))
+            for _ in self.sys.iter_propagate(self.state, [0.0, self.time]):
+                pass
+
+
+class ThreadScalingSuite:
+    # Products with dimer Lindbladian of 200 particles (40401 x 40401) by multithreaded kernel
+    params = [1, 2, 4, 8, 16]
+    param_names = ['num_threads']
+    timeout = 600
+    num_particles = 200
+
+    def setup(self, num_threads):
+        self.sys = dimer_system(self.num_particles)
+        self.lindbladian = self.sys.lindbladian
+        self.state = initial_state(self.num_particles) + 1.0
+        self.block = np.repeat(self.state[:, np.newaxis], 16, axis=1)
+        set_num_threads(num_threads)
+
+    def teardown(self, num_threads):
+        set_num_threads(1)
+
+    def time_matvec(self, num_threads):
+        for _ in range(10):
+            csr_matvec(self.lindbladian, self.state)
+
+    def time_matvec_block(self, num_threads):
+        csr_matvec(self.lindbladian, self.block)
+
+    def time_propagate(self, num_threads):
+        for _ in self.sys.iter_propagate(self.state, [0.0, 0.01]):
+            pass
+
+
+class SpectrumSuite:
+    params = num_particles_ladder
+    param_names = ['num_particles']
+    timeout = 600
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles)
+        self.sys.lindbladian
+
+    def time_spectral_gap(self, num_particles):
+        self.sys.spectral_gap(k=6)
+
+    def peakmem_spectral_gap(self, num_particles):
+        self.sys.spectral_gap(k=6)
+
+
+class HermitianBasisSuite:
+    # Complex vec(rho) against real Hermitian coordinates for dimer of 100 particles (10201 x 10201)
+    params = ['vec', 'hermitian']
+    param_names = ['basis']
+    timeout = 600
+    num_particles = 100
+
+    def setup(self, basis):
+        self.sys = dimer_system(self.num_particles, basis=basis)
+        self.sys.driven_generator
+        self.state = initial_state(self.num_particles)
+        if basis == 'hermitian':
+            self.state = to_hermitian_basis(self.state, dimer_get_sys_size(self.num_particles))
+        self.time = 0.1 * dimer_get_periods(drv_freq)[0]
+
+    def time_steady_state(self, basis):
+        self.sys.steady_state(method='direct')
+
+    def peakmem_steady_state(self, basis):
+        self.sys.steady_state(method='direct')
+
+    def time_matvec(self, basis):
+        for _ in range(10):
+            csr_matvec(self.sys.lindbladian, self.state)
+
+    def time_iter_propagate(self, basis):
+        for _ in self.sys.iter_propagate(self.state, [0.0, self.time]):
+            pass
+
+    def track_lindbladian_bytes(self, basis):
+        lindbladian = self.sys.lindbladian
+        return lindbladian.data.nbytes + lindbladian.indices.nbytes + lindbladian.indptr.nbytes
+
+    track_lindbladian_bytes.unit = 'bytes'
+
+
+class SymmetrySuite:
+    # Autonomous dimer of 100 particles without energy offset: whole Lindbladian against two parity sectors
+    params = ['full', 'parity']
+    param_names = ['sectors']
+    timeout = 600
+    num_particles = 100
+
+    def setup(self, sectors):
+        sys_size = dimer_get_sys_size(self.num_particles)
+        self.sys = oqs(sys_size, 0, 1)
+        self.sys.init_hamiltonian(dimer_get_hamiltonian(self.num_particles, 0.0, U, J))
+        self.sys.init_dissipation(dimer_get_dissipators(self.num_particles), [gamma / float(self.num_particles)])
+        self.sys.lindbladian
+        st_ids = np.arange(sys_size)
+        self.symmetry = csr_matrix((np.ones(sys_size), (st_ids, st_ids[::-1])), shape=(sys_size, sys_size))
+
+    def time_steady_state(self, sectors):
+        if sectors == 'full':
+            self.sys.steady_state(method='direct')
+        else:
+            self.sys.sector_steady_states(self.symmetry)
+
+    def peakmem_steady_state(self, sectors):
+        self.time_steady_state(sectors)
+
+    def time_spectrum(self, sectors):
+        if sectors == 'full':
+            self.sys.spectrum(k=12, return_modes=False)
+        else:
+            self.sys.sector_spectrum(k=6, symmetry=self.symmetry)
+
+
+class IterativeSteadyStateSuite:
+    params = num_particles_ladder
+    param_names = ['num_particles']
+    timeout = 600
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles)
+        self.sys.lindbladian
+
+    def time_gmres_ilu(self, num_particles):
+        self.sys.steady_state(method='gmres', preconditioner='ilu', maxiter=5000)
+
+    def time_gmres_ilu_mixed(self, num_particles):
+        self.sys.steady_state(method='gmres', preconditioner='ilu', maxiter=5000, precision='mixed')
+
+
+class PropagationSuite:
+    params = num_particles_ladder[:3]
+    param_names = ['num_particles']
+    timeout = 600
+
+    def setup(self, num_particles):
+        self.sys = dimer_system(num_particles)
+        self.sys.lindbladian
+        self.sys.driving_lindbladians
+        self.state = initial_state(num_particles)
+        self.period = dimer_get_periods(drv_freq)[0]
+
+    def time_iter_propagate_period(self, num_particles):
+        for _ in self.sys.iter_propagate(self.state, [0.0, self.period]):
+            pass
+
+    def time_iter_propagate_period_magnus(self, num_particles):
+        for _ in self.sys.iter_propagate(self.state, [0.0, self.period], method='CFM4'):
+            pass
+
+    def time_propagate_periods(self, num_particles):
+        self.sys.propagate_periods(self.state, num_periods=1)
+
+    def peakmem_propagate_periods(self, num_particles):
+        self.sys.propagate_periods(self.state, num_periods=1)
@@ -0,0 +1,205 @@
+"""
+Offline runner of benchmarks (without asv).
+
+Each benchmark and parameter runs in a fresh process, which records wall time (best of repeats),
+peak resident memory and tracked values. Results are written as JSON and compared with baseline.
+Baseline is machine-specific and not committed, it is recorded locally on reference revision first:
+
+    python -m benchmarks.run --save-baseline benchmarks/baseline.json
+    python -m benchmarks.run --output results.json --baseline benchmarks/baseline.json
+
+Exit status is 1 if any benchmark regressed by more than threshold factor (or tracked value changed).
+"""
+from benchmarks import benchmarks
+import multiprocessing
+import argparse
+import platform
+import resource
+import inspect
+import json
+import time
+import sys
+import os
+import re
+import numpy as np
+import scipy
+
+
+prefixes = ['time_', 'peakmem_', 'track_']
+
+
+def _peak_rss():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    scale = 1 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+
+def _run_one(class_name, method_name, param, repeat, queue):
+    try:
+        instance = getattr(benchmarks, class_name)()
+        if hasattr(instance, 'setup'):
+            instance.setup(param)
+        method = getattr(instance, method_name)
+        result = {}
+        if method_name.startswith('time_'):
+            times = []
+            for _ in range(repeat):
+                time_start = time.perf_counter()
+                method(param)
+                times.append(time.perf_counter() - time_start)
+            result['value'] = min(times)
+            result['unit'] = 'seconds'
+        elif method_name.startswith('peakmem_'):
+            method(param)
+            result['value'] = _peak_rss()
+            result['unit'] = 'bytes'
+        else:
+            result['value'] = float(method(param))
+            result['unit'] = getattr(method, 'unit', 'unit')
+        result['peak_rss'] = _peak_rss()
+        if hasattr(instance, 'teardown'):
+            instance.teardown(param)
+        queue.put(result)
+    except Exception as error:
+        queue.put({'error': f'{type(error).__name__}: {error}'})
+
+
+def discover(pattern=None):
+    """
+    List of (name, class name, method name, parameter) of all benchmarks.
+    """
+    result = []
+    for class_name, cls in inspect.getmembers(benchmarks, inspect.isclass):
+        if cls.__module__ != benchmarks.__name__:
+            continue
+        params = getattr(cls, 'params', [None])
+        for method_name in sorted(vars(cls)):
+            if not any(method_name.startswith(prefix) for prefix in prefixes):
+                continue
+            for param in params:
+                name = f'{class_name}.{method_name}({param})'
+                if pattern is None or re.search(pattern, name):
+                    result.append((name, class_name, method_name, param))
+    return result
+
+
+def run(pattern=None, repeat=3, verbose=True):
+    """
+    Run benchmarks, each in separate process.
+
+    :return:
+        Dictionary with machine description and results.
+    :rtype: dict
+    """
+    context = multiprocessing.get_context('spawn')
+    results = {}
+    for name, class_name, method_name, param in discover(pattern):
+        queue = context.Queue()
+        process = context.Process(target=_run_one, args=(class_name, method_name, param, repeat, queue))
+        process.start()
+        timeout = getattr(getattr(benchmarks, class_name), 'timeout', 60)
+        try:
+            result = queue.get(timeout=timeout)
+        except Exception:
+            result = {'error': 'timeout'}
+            process.terminate()
+        process.join()
+        results[name] = result
+        if verbose:
+            print(f'{name:60s} {_format(result)}', flush=True)
+    return {
+        'machine': {
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'scipy': scipy.__version__
+        },
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': results
+    }
+
+
+def compare(results, baseline, threshold=1.5):
+    """
+    Comparison of results with baseline.
+
+    Timings and memory peaks regress if they grow by more than threshold factor,
+    tracked values (nnz) must be unchanged.
+
+    :return:
+        List of (name, baseline value, current value, ratio, status).
+    :rtype: list
+    """
+    rows = []
+    for name, current in sorted(results['results'].items()):
+        previous = baseline['results'].get(name)
+        if previous is None or 'value' not in previous:
+            continue
+        if 'value' not in current:
+            rows.append((name, previous['value'], None, None, 'failed'))
+            continue
+        ratio = current['value'] / previous['value'] if previous['value'] else np.inf
+        if current['unit'] in ['seconds', 'bytes']:
+            if ratio > threshold:
+                status = 'slower' if current['unit'] == 'seconds' else 'larger'
+            elif ratio < 1.0 / threshold:
+                status = 'faster' if current['unit'] == 'seconds' else 'smaller'
+            else:
+                status = 'same'
+        else:
+            status = 'same' if current['value'] == previous['value'] else 'changed'
+        rows.append((name, previous['value'], current['value'], ratio, status))
+    return rows
+
+
+def _format(result):
+    if 'error' in result:
+        return 'ERROR ' + result['error']
+    value = result['value']
+    if result['unit'] == 'seconds':
+        text = f'{value * 1.0e3:12.3f} ms'
+    elif result['unit'] == 'bytes':
+        text = f'{value / 2.0 ** 20:12.1f} MiB'
+    else:
+        text = f'{value:12.0f} {result["unit"]}'
+    return text + f'   (peak RSS {result["peak_rss"] / 2.0 ** 20:.1f} MiB)'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Offline runner of oqspy benchmarks.')
+    parser.add_argument('--bench', default=None, help='Regular expression selecting benchmarks.')
+    parser.add_argument('--repeat', type=int, default=3, help='Number of repeats of timing benchmarks.')
+    parser.add_argument('--output', default=None, help='JSON file for results.')
+    parser.add_argument('--baseline', default=None, help='JSON file with baseline results.')
+    parser.add_argument('--save-baseline', default=None, help='Store results as new baseline.')
+    parser.add_argument('--threshold', type=float, default=1.5, help='Regression factor.')
+    args = parser.parse_args(argv)
+
+    results = run(args.bench, args.repeat)
+    for fn in [args.output, args.save_baseline]:
+        if fn is not None:
+            with open(fn, 'w') as f:
+                json.dump(results, f, indent=2)
+
+    if args.baseline is None:
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f'Baseline {args.baseline} not found, comparison skipped (record it with --save-baseline).')
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    print()
+    print(f'{"benchmark":60s} {"baseline":>14s} {"current":>14s} {"ratio":>8s}  status')
+    for name, previous, current, ratio, status in rows:
+        current = 'n/a' if current is None else f'{current:14.6g}'
+        ratio = 'n/a' if ratio is None else f'{ratio:8.2f}'
+        print(f'{name:60s} {previous:14.6g} {current:>14s} {ratio:>8s}  {status}')
+    regressions = [row for row in rows if row[4] in ['slower', 'larger', 'changed', 'failed']]
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
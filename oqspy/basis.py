@@ -0,0 +1,159 @@
+from scipy.sparse import csr_matrix, issparse
+from scipy.sparse.linalg import LinearOperator
+import numpy as np
+
+
+def _basis_ids(sys_size):
+    """
+    Positions of diagonal, upper (p < q) and lower (q > p) elements of vec(rho) (column-major).
+    """
+    rows, cols = np.triu_indices(sys_size, 1)
+    diag_ids = np.arange(sys_size) * (sys_size + 1)
+    return diag_ids, rows + cols * sys_size, cols + rows * sys_size
+
+
+def _check_size(state, sys_size):
+    if state.ndim not in [1, 2] or state.shape[0] != sys_size * sys_size:
+        raise ValueError('Incorrect size of state.')
+
+
+def hermitian_basis(sys_size):
+    """
+    Unitary change of basis from real Hermitian coordinates x to vec(rho) = T x.
+
+    Coordinates keep the layout of vec(rho): diagonal position of rho_pp holds Re(rho_pp),
+    position of rho_pq (p < q) holds sqrt(2) Re(rho_pq) and position of rho_qp holds sqrt(2) Im(rho_pq)
+    (symmetric and antisymmetric generalized Gell-Mann matrices up to normalization).
+    Coordinates of Hermitian rho are real, trace functional and diagonal are the same as for vec(rho).
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :return:
+        Transformation matrix T (CSR format) of size sys_size^2 x sys_size^2.
+    :rtype: csr_matrix
+    """
+    diag_ids, upper_ids, lower_ids = _basis_ids(sys_size)
+    scale = 1.0 / np.sqrt(2.0)
+    rows = np.concatenate((diag_ids, upper_ids, lower_ids, upper_ids, lower_ids))
+    cols = np.concatenate((diag_ids, upper_ids, upper_ids, lower_ids, lower_ids))
+    data = np.concatenate((
+        np.ones(sys_size, dtype=np.complex128),
+        np.full(upper_ids.size, scale, dtype=np.complex128),
+        np.full(upper_ids.size, scale, dtype=np.complex128),
+        np.full(upper_ids.size, 1.0j * scale, dtype=np.complex128),
+        np.full(upper_ids.size, -1.0j * scale, dtype=np.complex128)
+    ))
+    super_size = sys_size * sys_size
+    return csr_matrix((data, (rows, cols)), shape=(super_size, super_size))
+
+
+def to_hermitian_basis(state, sys_size):
+    """
+    Real Hermitian coordinates of vec(rho) (see hermitian_basis).
+
+    Anti-Hermitian part of rho is discarded, i.e. result is Re(T^H vec(rho)).
+
+    :param state:
+        vec(rho) (column-major) or block of states (sys_size^2 x m).
+    :type state: numpy.ndarray
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :return:
+        Real coordinates of the same shape as state.
+    :rtype: numpy.ndarray
+    """
+    state = np.asarray(state)
+    _check_size(state, sys_size)
+    diag_ids, upper_ids, lower_ids = _basis_ids(sys_size)
+    scale = 1.0 / np.sqrt(2.0)
+    coords = np.empty(state.shape, dtype=np.result_type(state.real.dtype, np.float32))
+    coords[diag_ids] = state[diag_ids].real
+    coords[upper_ids] = scale * (state[upper_ids].real + state[lower_ids].real)
+    coords[lower_ids] = scale * (state[upper_ids].imag - state[lower_ids].imag)
+    return coords
+
+
+def from_hermitian_basis(coords, sys_size):
+    """
+    vec(rho) of Hermitian coordinates (see hermitian_basis), i.e. T x.
+
+    Map is linear, so complex coordinates (e.g. eigenvectors of real superoperators) are accepted as well.
+
+    :param coords:
+        Coordinates or block of coordinates (sys_size^2 x m).
+    :type coords: numpy.ndarray
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :return:
+        vec(rho) (column-major) of the same shape as coords.
+    :rtype: numpy.ndarray
+    """
+    coords = np.asarray(coords)
+    _check_size(coords, sys_size)
+    diag_ids, upper_ids, lower_ids = _basis_ids(sys_size)
+    scale = 1.0 / np.sqrt(2.0)
+    state = np.empty(coords.shape, dtype=np.result_type(coords, np.complex64))
+    state[diag_ids] = coords[diag_ids]
+    state[upper_ids] = scale * (coords[upper_ids] + 1.0j * coords[lower_ids])
+    state[lower_ids] = scale * (coords[upper_ids] - 1.0j * coords[lower_ids])
+    return state
+
+
+def hermitian_superoperator(superoperator, sys_size, dtype=np.float64, tol=1.0e-10):
+    """
+    Real matrix T^H S T of Hermiticity-preserving superoperator S (Lindbladian, driving Lindbladian)
+    in Hermitian basis (see hermitian_basis).
+
+    Real matrix has more nonzeros than S (each element couples to real and imaginary parts),
+    but half the bytes per nonzero and real arithmetic, so products need about a third of flops of complex ones.
+
+    :param superoperator:
+        Superoperator acting on vec(rho) (CSR format or LinearOperator).
+    :type superoperator: csr_matrix or LinearOperator
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :param dtype:
+        Real data type of result.
+    :type dtype: numpy.dtype
+
+    :param tol:
+        Relative tolerance of imaginary part of T^H S T (checked for CSR superoperators only).
+    :type tol: float
+
+    :return:
+        Real superoperator acting on Hermitian coordinates (CSR format or LinearOperator).
+    :rtype: csr_matrix or LinearOperator
+    """
+    super_size = sys_size * sys_size
+    if superoperator.shape != (super_size, super_size):
+        raise ValueError('Incorrect size of superoperator.')
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError('dtype must be real floating type.')
+
+    if not issparse(superoperator):
+        def matvec(coords):
+            state = superoperator.matvec(from_hermitian_basis(np.ravel(coords), sys_size))
+            return to_hermitian_basis(np.ravel(state), sys_size).astype(dtype, copy=False)
+
+        return LinearOperator((super_size, super_size), matvec=matvec, dtype=dtype)
+
+    transform = hermitian_basis(sys_size)
+    product = (transform.conj().T @ csr_matrix(superoperator, dtype=np.complex128) @ transform).tocsr()
+    scale = np.max(np.abs(superoperator.data), initial=0.0)
+    if np.max(np.abs(product.data.imag), initial=0.0) > tol * max(scale, 1.0):
+        raise ValueError('superoperator does not preserve Hermiticity.')
+    result = csr_matrix((product.data.real.astype(dtype), product.indices, product.indptr), shape=product.shape)
+    result.eliminate_zeros()
+    result.sort_indices()
+    return result
@@ -0,0 +1,203 @@
+from scipy.sparse import csr_matrix
+from oqspy.io import save_sparse_binary, load_sparse_binary
+import numpy as np
+import hashlib
+import os
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def operators_key(kind, operators, gammas=None, dtype=np.complex128):
+    """
+    Hash key of superoperator built from given operators.
+
+    :param kind:
+        Kind of superoperator (e.g. 'lindbladian', 'driving_lindbladian').
+    :type kind: str
+
+    :param operators:
+        List of input operators (CSR format).
+    :type operators: list
+
+    :param gammas:
+        List of dissipation rates.
+    :type gammas: list
+
+    :param dtype:
+        Data type of superoperator.
+    :type dtype: numpy.dtype
+
+    :return:
+        Key string.
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    sha.update(kind.encode())
+    sha.update(np.dtype(dtype).str.encode())
+    for operator in operators:
+        operator = csr_matrix(operator)
+        sha.update(np.array(operator.shape, dtype=np.int64).tobytes())
+        sha.update(np.ascontiguousarray(operator.indptr, dtype=np.int64).tobytes())
+        sha.update(np.ascontiguousarray(operator.indices, dtype=np.int64).tobytes())
+        sha.update(np.ascontiguousarray(operator.data, dtype=np.complex128).tobytes())
+    if gammas is not None:
+        sha.update(np.array(gammas, dtype=np.float64).tobytes())
+    return kind + '_' + sha.hexdigest()
+
+
+class LindbladianCache:
+    """
+    Persistent on-disk cache of built superoperators.
+
+    Entries are stored in memory-mappable binary CSR format (oqspy.io), one file per key.
+    Files are written to temporary names and atomically renamed, so concurrent writers
+    from several processes never expose partial entries. Total size is bounded
+    by least-recently-used eviction, serialized between processes by lock file where available.
+    """
+
+    suffix = '.csr'
+
+    def __init__(self, directory, max_bytes=None):
+        """
+        :param directory:
+            Cache directory.
+        :type directory: str
+
+        :param max_bytes:
+            Maximum total size of cache files. Unbounded if None.
+        :type max_bytes: int
+        """
+        if max_bytes is not None and max_bytes <= 0:
+            raise ValueError('max_bytes must be positive.')
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """
+        File name of cache entry.
+        """
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """
+        Cached superoperator (memory-mapped, read-only) or None.
+
+        :param key:
+            Key of entry.
+        :type key: str
+
+        :return:
+            Superoperator (CSR format).
+        :rtype: csr_matrix
+        """
+        fn = self.path(key)
+        try:
+            mtx = load_sparse_binary(fn, mmap=True)
+            os.utime(fn)
+        except (FileNotFoundError, ValueError):
+            return None
+        return mtx
+
+    def put(self, key, mtx):
+        """
+        Store superoperator in cache.
+
+        :param key:
+            Key of entry.
+        :type key: str
+
+        :param mtx:
+            Superoperator.
+        :type mtx: csr_matrix
+        """
+        fn_tmp = os.path.join(self.directory, f'.{key}.{uuid.uuid4().hex}.tmp')
+        try:
+            save_sparse_binary(fn_tmp, mtx)
+            os.replace(fn_tmp, self.path(key))
+        finally:
+            if os.path.exists(fn_tmp):
+                os.remove(fn_tmp)
+        if self.max_bytes is not None:
+            self.evict()
+
+    def get_or_build(self, key, builder):
+        """
+        Cached superoperator or newly built one (which is then stored).
+
+        :param key:
+            Key of entry.
+        :type key: str
+
+        :param builder:
+            Function without arguments building superoperator.
+        :type builder: function
+
+        :return:
+            Superoperator (CSR format).
+        :rtype: csr_matrix
+        """
+        mtx = self.get(key)
+        if mtx is None:
+            mtx = builder()
+            self.put(key, mtx)
+        return mtx
+
+    def entries(self):
+        """
+        List of (key, size, last access time) of cache entries.
+        """
+        result = []
+        for fn in os.listdir(self.directory):
+            if not fn.endswith(self.suffix) or fn.startswith('.'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, fn))
+            except FileNotFoundError:
+                continue
+            result.append((fn[:-len(self.suffix)], stat.st_size, stat.st_mtime))
+        return result
+
+    def size(self):
+        """
+        Total size of cache entries in bytes.
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove least-recently-used entries until total size does not exceed max_bytes.
+        """
+        if self.max_bytes is None:
+            return
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                entries = sorted(self.entries(), key=lambda entry: entry[2])
+                total = sum(size for _, size, _ in entries)
+                for key, size, _ in entries:
+                    if total <= self.max_bytes:
+                        break
+                    try:
+                        os.remove(self.path(key))
+                    except (FileNotFoundError, PermissionError):
+                        continue
+                    total -= size
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def clear(self):
+        """
+        Remove all cache entries.
+        """
+        for key, _, _ in self.entries():
+            try:
+                os.remove(self.path(key))
+            except (FileNotFoundError, PermissionError):
+                continue
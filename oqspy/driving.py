@@ -0,0 +1,57 @@
+import numpy as np
+
+
+def vectorize_driving(function):
+    """
+    Driving function accepting both scalar time and NumPy array of times.
+
+    Functions already marked with attribute 'vectorized' are returned as is,
+    scalar closures are wrapped by adapter evaluating them element-wise.
+
+    :param function:
+        Driving function of one argument (time).
+    :type function: function
+
+    :return:
+        Vectorized driving function.
+    :rtype: function
+    """
+    if getattr(function, 'vectorized', False):
+        return function
+
+    def vectorized(time):
+        times = np.asarray(time, dtype=np.float64)
+        if times.ndim == 0:
+            return function(float(times))
+        values = np.array([function(t) for t in times.ravel()])
+        return values.reshape(times.shape)
+
+    vectorized.vectorized = True
+    if hasattr(function, 'segments'):
+        vectorized.segments = function.segments
+    return vectorized
+
+
+def tabulate_driving(functions, times):
+    """
+    Values of driving functions on time grid.
+
+    :param functions:
+        List of driving functions.
+    :type functions: list
+
+    :param times:
+        Time grid.
+    :type times: numpy.ndarray
+
+    :return:
+        Array of shape (len(functions), len(times)).
+    :rtype: numpy.ndarray
+    """
+    times = np.asarray(times, dtype=np.float64)
+    if times.ndim != 1:
+        raise ValueError('times must be one-dimensional array.')
+    table = np.zeros((len(functions), times.size), dtype=np.float64)
+    for f_id, function in enumerate(functions):
+        table[f_id, :] = vectorize_driving(function)(times)
+    return table
@@ -0,0 +1,155 @@
+from scipy.sparse import isspmatrix_csr
+from scipy.sparse.linalg import eigs
+from oqspy.propagation import propagate, DrivenGenerator
+from oqspy.parallel import get_context
+from oqspy.basis import from_hermitian_basis
+import numpy as np
+
+
+_shared = {}
+
+
+def _init_worker(lindbladian, driving_lindbladians, driving_functions, period, kwargs):
+    _shared['lindbladian'] = lindbladian
+    _shared['driving_lindbladians'] = driving_lindbladians
+    _shared['driving_functions'] = driving_functions
+    _shared['period'] = period
+    _shared['kwargs'] = kwargs
+
+
+def _result_dtype(lindbladian, driving_lindbladians):
+    # Lindbladians in Hermitian basis are real, so is their monodromy
+    return np.result_type(np.float64, lindbladian.dtype, *[mtx.dtype for mtx in driving_lindbladians or []])
+
+
+def _propagate_columns(column_ids):
+    lindbladian = _shared['lindbladian']
+    super_size = lindbladian.shape[0]
+    dtype = _result_dtype(lindbladian, _shared['driving_lindbladians'])
+    block = np.zeros((super_size, len(column_ids)), dtype=dtype)
+    for block_id, column_id in enumerate(column_ids):
+        state = np.zeros(super_size, dtype=dtype)
+        state[column_id] = 1.0
+        block[:, block_id] = propagate(
+            lindbladian,
+            state,
+            0.0,
+            _shared['period'],
+            _shared['driving_lindbladians'],
+            _shared['driving_functions'],
+            **_shared['kwargs']
+        )
+    return column_ids, block
+
+
+def monodromy(lindbladian, driving_lindbladians, driving_functions, period, num_workers=1, chunk_size=None, **kwargs):
+    """
+    Floquet monodromy superoperator (one-period propagator) of periodically driven OQS.
+
+    Each of sys_size^2 basis columns is propagated over one period independently,
+    columns are split into chunks and distributed across a process pool.
+    Lindbladians and driving functions are passed to workers once at start-up
+    (inherited without copying where 'fork' start method is available).
+    Merged generator of CSR Lindbladians (DrivenGenerator) is built once for all columns.
+
+    :param lindbladian:
+        Lindbladian (CSR format) or DrivenGenerator (driving_lindbladians are then None).
+    :type lindbladian: csr_matrix
+
+    :param driving_lindbladians:
+        List of driving Lindbladians (CSR format).
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param period:
+        Driving period.
+    :type period: float
+
+    :param num_workers:
+        Number of worker processes. Columns are propagated in current process if 1.
+    :type num_workers: int
+
+    :param chunk_size:
+        Number of columns per task.
+    :type chunk_size: int
+
+    :param kwargs:
+        Additional arguments of oqspy.propagation.propagate.
+
+    :return:
+        Dense monodromy matrix of size sys_size^2 x sys_size^2.
+    :rtype: numpy.ndarray
+    """
+    if not isinstance(num_workers, int) or num_workers <= 0:
+        raise ValueError('num_workers must be positive integer.')
+    if period <= 0.0:
+        raise ValueError('period must be positive.')
+
+    if driving_lindbladians and isspmatrix_csr(lindbladian) and all(isspmatrix_csr(mtx) for mtx in driving_lindbladians):
+        lindbladian, driving_lindbladians = DrivenGenerator(lindbladian, driving_lindbladians), None
+
+    super_size = lindbladian.shape[0]
+    if chunk_size is None:
+        chunk_size = max(1, super_size // (4 * num_workers))
+    chunks = [list(range(begin, min(begin + chunk_size, super_size))) for begin in range(0, super_size, chunk_size)]
+
+    result = np.zeros((super_size, super_size), dtype=_result_dtype(lindbladian, driving_lindbladians))
+    init_args = (lindbladian, driving_lindbladians, driving_functions, period, kwargs)
+
+    if num_workers == 1:
+        _init_worker(*init_args)
+        try:
+            for chunk in chunks:
+                column_ids, block = _propagate_columns(chunk)
+                result[:, column_ids] = block
+        finally:
+            _shared.clear()
+    else:
+        with get_context().Pool(num_workers, initializer=_init_worker, initargs=init_args) as pool:
+            for column_ids, block in pool.imap_unordered(_propagate_columns, chunks):
+                result[:, column_ids] = block
+
+    return result
+
+
+def asymptotic_state(monodromy_mtx, sys_size, basis='vec'):
+    """
+    Asymptotic periodic density matrix, eigenvector of monodromy for eigenvalue 1.
+
+    :param monodromy_mtx:
+        Monodromy matrix.
+    :type monodromy_mtx: numpy.ndarray
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :param basis:
+        Coordinates of monodromy: 'vec' (vec(rho)) or 'hermitian' (see oqspy.basis.hermitian_basis).
+    :type basis: str
+
+    :return:
+        Density matrix (sys_size x sys_size) at phase 0 and its eigenvalue.
+    :rtype: tuple
+    """
+    super_size = sys_size * sys_size
+    if monodromy_mtx.shape != (super_size, super_size):
+        raise ValueError('Incorrect size of monodromy.')
+    if basis not in ['vec', 'hermitian']:
+        raise ValueError('basis must be \'vec\' or \'hermitian\'.')
+
+    if super_size <= 2048:
+        evals, evecs = np.linalg.eig(monodromy_mtx)
+    else:
+        evals, evecs = eigs(monodromy_mtx, k=1, sigma=1.0)
+    eval_id = np.argmin(np.abs(evals - 1.0))
+
+    vec = evecs[:, eval_id]
+    if basis == 'hermitian':
+        vec = from_hermitian_basis(vec, sys_size)
+    rho = vec.reshape((sys_size, sys_size), order='F')
+    rho = rho / np.trace(rho)
+    return rho, evals[eval_id]
@@ -0,0 +1,262 @@
+from contextlib import contextmanager, nullcontext
+import numpy as np
+import time
+import tracemalloc
+
+
+def operator_stats(mtx):
+    """
+    Statistics of sparse operator.
+
+    :param mtx:
+        Sparse matrix (CSR format).
+    :type mtx: csr_matrix
+
+    :return:
+        Dictionary with 'shape', 'nnz', 'fill' (nnz / number of elements), 'bandwidth' (max |row - col|),
+        'nbytes' (memory of CSR arrays) and 'dtype'.
+    :rtype: dict
+    """
+    num_rows, num_cols = mtx.shape
+    rows = np.repeat(np.arange(num_rows, dtype=np.int64), np.diff(mtx.indptr))
+    bandwidth = int(np.max(np.abs(rows - mtx.indices), initial=0))
+    return {
+        'shape': (num_rows, num_cols),
+        'nnz': int(mtx.nnz),
+        'fill': mtx.nnz / float(num_rows * num_cols),
+        'bandwidth': bandwidth,
+        'nbytes': int(mtx.data.nbytes + mtx.indices.nbytes + mtx.indptr.nbytes),
+        'dtype': str(mtx.dtype)
+    }
+
+
+# Memory tracing is shared by all Instrumentation objects: it is started by the first outermost stage
+# and stopped when the last one ends (never stopped if it was started outside of oqspy)
+_tracing = {'users': 0, 'owned': False}
+
+
+def _acquire_tracing():
+    if _tracing['users'] == 0 and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _tracing['owned'] = True
+    _tracing['users'] += 1
+
+
+def _release_tracing():
+    _tracing['users'] -= 1
+    if _tracing['users'] == 0 and _tracing['owned']:
+        tracemalloc.stop()
+        _tracing['owned'] = False
+
+
+class InstrumentationReport:
+    """
+    Structured report of instrumentation records.
+
+    stages: list of dictionaries with 'name' (path of nested stages separated by '/'), 'depth',
+    'time' (wall time in seconds) and 'memory_peak' (peak of traced allocations in bytes or None).
+    operators: dictionary of operator names and their statistics (see operator_stats).
+    infos: list of (name, dictionary) of solver statistics.
+    """
+
+    def __init__(self, stages, operators, infos):
+        self.stages = stages
+        self.operators = operators
+        self.infos = infos
+
+    def totals(self):
+        """
+        Total wall time, number of calls and maximal memory peak of every stage.
+
+        :return:
+            Dictionary of stage names and dictionaries with 'time', 'calls' and 'memory_peak'.
+        :rtype: dict
+        """
+        result = {}
+        for stage in self.stages:
+            total = result.setdefault(stage['name'], {'time': 0.0, 'calls': 0, 'memory_peak': None})
+            total['time'] += stage['time']
+            total['calls'] += 1
+            if stage['memory_peak'] is not None:
+                total['memory_peak'] = max(total['memory_peak'] or 0, stage['memory_peak'])
+        return result
+
+    def as_dict(self):
+        """
+        Report as dictionary of plain Python types (e.g. for JSON).
+        """
+        return {
+            'stages': [dict(stage) for stage in self.stages],
+            'totals': self.totals(),
+            'operators': {name: dict(stats) for name, stats in self.operators.items()},
+            'infos': [{'name': name, 'info': dict(info)} for name, info in self.infos]
+        }
+
+    def __str__(self):
+        lines = [f'{"stage":50s} {"calls":>6s} {"time, s":>12s} {"peak, MiB":>12s}']
+        for name, total in self.totals().items():
+            peak = '' if total['memory_peak'] is None else f'{total["memory_peak"] / 2.0 ** 20:12.2f}'
+            lines.append(f'{name:50s} {total["calls"]:6d} {total["time"]:12.6f} {peak:>12s}')
+        if self.operators:
+            lines.append('')
+            lines.append(f'{"operator":30s} {"size":>10s} {"nnz":>12s} {"fill":>12s} {"bandwidth":>10s}')
+            for name, stats in self.operators.items():
+                lines.append(f'{name:30s} {stats["shape"][0]:10d} {stats["nnz"]:12d} {stats["fill"]:12.3e} {stats["bandwidth"]:10d}')
+        return '\n'.join(lines)
+
+
+class Instrumentation:
+    """
+    Recorder of per-stage wall time, allocation peaks and operator statistics.
+
+    Hooks are functions hook(event) called with every record as dictionary
+    with 'type' ('stage', 'operator' or 'info'), 'name' and recorded values.
+    Memory peaks are traced by tracemalloc (NumPy allocations included), which slows down
+    allocation-heavy code, so it can be disabled by track_memory=False.
+    Tracing runs only while stages are measured: it is started by outermost stage and stopped after it.
+    """
+
+    enabled = True
+
+    def __init__(self, hooks=None, track_memory=True):
+        """
+        :param hooks:
+            List of functions called with every record.
+        :type hooks: list
+
+        :param track_memory:
+            Trace allocation peaks of stages.
+        :type track_memory: bool
+        """
+        self.hooks = list(hooks) if hooks is not None else []
+        self.track_memory = track_memory
+        self.__stages = []
+        self.__operators = {}
+        self.__infos = []
+        self.__stack = []
+
+    def add_hook(self, hook):
+        """
+        Register function hook(event) called with every record.
+        """
+        self.hooks.append(hook)
+
+    def __emit(self, event):
+        for hook in self.hooks:
+            hook(event)
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Context manager measuring stage. Stages can be nested.
+
+        :param name:
+            Stage name.
+        :type name: str
+        """
+        acquired = self.track_memory and not self.__stack
+        if acquired:
+            _acquire_tracing()
+        tracing = self.track_memory and tracemalloc.is_tracing()
+
+        path = '/'.join([frame['name'] for frame in self.__stack] + [name])
+        frame = {'name': name, 'max_peak': 0}
+        if tracing:
+            current, peak = tracemalloc.get_traced_memory()
+            if self.__stack:
+                parent = self.__stack[-1]
+                parent['max_peak'] = max(parent['max_peak'], peak)
+            frame['start'] = current
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+        self.__stack.append(frame)
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - time_start
+            self.__stack.pop()
+            memory_peak = None
+            if tracing:
+                peak = max(tracemalloc.get_traced_memory()[1], frame['max_peak'])
+                memory_peak = peak - frame['start']
+                if self.__stack:
+                    parent = self.__stack[-1]
+                    parent['max_peak'] = max(parent['max_peak'], peak)
+            if acquired:
+                _release_tracing()
+            record = {'name': path, 'depth': len(self.__stack), 'time': elapsed, 'memory_peak': memory_peak}
+            self.__stages.append(record)
+            self.__emit(dict(record, type='stage'))
+
+    def record_operator(self, name, mtx):
+        """
+        Record statistics of sparse operator.
+
+        :param name:
+            Operator name.
+        :type name: str
+
+        :param mtx:
+            Sparse matrix (CSR format).
+        :type mtx: csr_matrix
+        """
+        stats = operator_stats(mtx)
+        self.__operators[name] = stats
+        self.__emit(dict(stats, type='operator', name=name))
+
+    def record_info(self, name, info):
+        """
+        Record dictionary of solver statistics.
+
+        :param name:
+            Solver name.
+        :type name: str
+
+        :param info:
+            Statistics.
+        :type info: dict
+        """
+        self.__infos.append((name, dict(info)))
+        self.__emit(dict(info, type='info', name=name))
+
+    def report(self):
+        """
+        Structured report of all records.
+
+        :rtype: InstrumentationReport
+        """
+        return InstrumentationReport(list(self.__stages), dict(self.__operators), list(self.__infos))
+
+    def reset(self):
+        """
+        Remove all records.
+        """
+        self.__stages = []
+        self.__operators = {}
+        self.__infos = []
+
+
+class NullInstrumentation:
+    """
+    Disabled instrumentation: all records are ignored at negligible cost.
+    """
+
+    enabled = False
+
+    def stage(self, name):
+        return _null_context
+
+    def record_operator(self, name, mtx):
+        pass
+
+    def record_info(self, name, info):
+        pass
+
+    def report(self):
+        return InstrumentationReport([], {}, [])
+
+
+_null_context = nullcontext()
+
+null_instrumentation = NullInstrumentation()
@@ -0,0 +1,218 @@
+from scipy.sparse import csr_matrix, coo_matrix
+import numpy as np
+import struct
+
+
+_text_table = str.maketrans({'(': ' ', ')': ' ', ',': ' ', '\t': ' '})
+
+_binary_magic = b'OQSPYCSR'
+_binary_version = 1
+_binary_header = struct.Struct('<8sIIqqq8s8s')
+_binary_alignment = 64
+
+
+def _read_text_values(fn):
+    with open(fn) as f:
+        text = f.read()
+    return np.fromstring(text.translate(_text_table), dtype=np.float64, sep=' ')
+
+
+def read_sparse_text(fn, size):
+    """
+    Sparse matrix from text file with lines 'row<TAB>col<TAB>(real,imag)'.
+
+    File is read in a single pass and parsed by NumPy without per-line processing.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param size:
+        Matrix size.
+    :type size: int
+
+    :return:
+        Matrix (CSR format).
+    :rtype: csr_matrix
+    """
+    values = _read_text_values(fn)
+    if values.size % 4 != 0:
+        raise ValueError('Incorrect format of sparse matrix file.')
+    values = values.reshape((-1, 4))
+    rows = values[:, 0].astype(np.int64)
+    cols = values[:, 1].astype(np.int64)
+    data = values[:, 2] + 1.0j * values[:, 3]
+    return csr_matrix((data, (rows, cols)), shape=(size, size))
+
+
+def read_dense_text(fn, size):
+    """
+    Dense matrix from text file with lines '(real,imag)' in row-major order.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param size:
+        Matrix size.
+    :type size: int
+
+    :return:
+        Matrix of shape (size, size).
+    :rtype: numpy.ndarray
+    """
+    values = _read_text_values(fn)
+    if values.size != 2 * size * size:
+        raise ValueError('Incorrect format of dense matrix file.')
+    values = values.reshape((-1, 2))
+    return (values[:, 0] + 1.0j * values[:, 1]).reshape((size, size))
+
+
+def write_sparse_text(fn, mtx):
+    """
+    Sparse matrix to text file with lines 'row<TAB>col<TAB>(real,imag)' in column-major order.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mtx:
+        Sparse matrix.
+    :type mtx: scipy.sparse.spmatrix
+    """
+    mtx = coo_matrix(mtx.tocsc())
+    data = np.asarray(mtx.data, dtype=np.complex128)
+    table = np.column_stack((mtx.row, mtx.col, data.real, data.imag))
+    np.savetxt(fn, table, fmt='%d\t%d\t(%.16e,%.16e)')
+
+
+def write_dense_text(fn, mtx):
+    """
+    Dense matrix to text file with lines '(real,imag)' in row-major order.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mtx:
+        Dense matrix.
+    :type mtx: numpy.ndarray
+    """
+    data = np.asarray(mtx, dtype=np.complex128).ravel()
+    np.savetxt(fn, np.column_stack((data.real, data.imag)), fmt='(%.16e,%.16e)')
+
+
+def _aligned(offset):
+    return (offset + _binary_alignment - 1) // _binary_alignment * _binary_alignment
+
+
+def save_sparse_binary(fn, mtx):
+    """
+    Sparse matrix to compact binary file: header followed by aligned CSR arrays (indptr, indices, data).
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mtx:
+        Sparse matrix.
+    :type mtx: scipy.sparse.spmatrix
+    """
+    mtx = csr_matrix(mtx)
+    arrays = [mtx.indptr, mtx.indices, mtx.data]
+    header = _binary_header.pack(
+        _binary_magic,
+        _binary_version,
+        0,
+        mtx.shape[0],
+        mtx.shape[1],
+        mtx.nnz,
+        mtx.indices.dtype.str.encode(),
+        mtx.data.dtype.str.encode()
+    )
+    with open(fn, 'wb') as f:
+        f.write(header)
+        offset = len(header)
+        for array in arrays:
+            begin = _aligned(offset)
+            f.write(b'\0' * (begin - offset))
+            f.write(np.ascontiguousarray(array).tobytes())
+            offset = begin + array.nbytes
+
+
+def load_sparse_binary(fn, mmap=True):
+    """
+    Sparse matrix from binary file written by save_sparse_binary.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mmap:
+        Memory-map arrays (read-only, without copying) instead of reading them into memory.
+    :type mmap: bool
+
+    :return:
+        Matrix (CSR format).
+    :rtype: csr_matrix
+    """
+    with open(fn, 'rb') as f:
+        header = f.read(_binary_header.size)
+    if len(header) != _binary_header.size:
+        raise ValueError('Incorrect binary matrix file.')
+    magic, version, _, num_rows, num_cols, nnz, index_dtype, data_dtype = _binary_header.unpack(header)
+    if magic != _binary_magic or version != _binary_version:
+        raise ValueError('Incorrect binary matrix file.')
+    index_dtype = np.dtype(index_dtype.rstrip(b'\0').decode())
+    data_dtype = np.dtype(data_dtype.rstrip(b'\0').decode())
+
+    specs = [(index_dtype, num_rows + 1), (index_dtype, nnz), (data_dtype, nnz)]
+    arrays = []
+    offset = _binary_header.size
+    for dtype, count in specs:
+        begin = _aligned(offset)
+        if count == 0:
+            arrays.append(np.zeros(0, dtype=dtype))
+        elif mmap:
+            arrays.append(np.memmap(fn, dtype=dtype, mode='r', offset=begin, shape=(count,)))
+        else:
+            with open(fn, 'rb') as f:
+                f.seek(begin)
+                arrays.append(np.fromfile(f, dtype=dtype, count=count))
+        offset = begin + count * dtype.itemsize
+    indptr, indices, data = arrays
+    return csr_matrix((data, indices, indptr), shape=(num_rows, num_cols), copy=False)
+
+
+def save_dense_binary(fn, mtx):
+    """
+    Dense matrix to binary .npy file.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mtx:
+        Dense matrix.
+    :type mtx: numpy.ndarray
+    """
+    np.save(fn, np.asarray(mtx))
+
+
+def load_dense_binary(fn, mmap=True):
+    """
+    Dense matrix from binary .npy file.
+
+    :param fn:
+        File name.
+    :type fn: str
+
+    :param mmap:
+        Memory-map matrix (read-only) instead of reading it into memory.
+    :type mmap: bool
+
+    :return:
+        Matrix.
+    :rtype: numpy.ndarray
+    """
+    return np.load(fn, mmap_mode='r' if mmap else None)
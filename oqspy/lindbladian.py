@@ -0,0 +1,384 @@
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+import numpy as np
+
+
+def _csr_entries(mtx):
+    """
+    Row and column indices of stored entries of CSR matrix (in storage order).
+    """
+    rows = np.repeat(np.arange(mtx.shape[0], dtype=np.int64), np.diff(mtx.indptr))
+    cols = mtx.indices.astype(np.int64)
+    return rows, cols
+
+
+def _eye_kron_ids(rows, cols, sys_size):
+    """
+    Triplet indices of kron(eye, A) and ids of source entries of A.
+    """
+    shift = np.arange(sys_size, dtype=np.int64) * sys_size
+    super_rows = (shift[:, np.newaxis] + rows[np.newaxis, :]).ravel()
+    super_cols = (shift[:, np.newaxis] + cols[np.newaxis, :]).ravel()
+    src = np.tile(np.arange(rows.size, dtype=np.int64), sys_size)
+    return super_rows, super_cols, src
+
+
+def _kron_eye_ids(rows, cols, sys_size):
+    """
+    Triplet indices of kron(A, eye) and ids of source entries of A.
+    """
+    shift = np.arange(sys_size, dtype=np.int64)
+    super_rows = (rows[:, np.newaxis] * sys_size + shift[np.newaxis, :]).ravel()
+    super_cols = (cols[:, np.newaxis] * sys_size + shift[np.newaxis, :]).ravel()
+    src = np.repeat(np.arange(rows.size, dtype=np.int64), sys_size)
+    return super_rows, super_cols, src
+
+
+def _kron_ids(rows_a, cols_a, rows_b, cols_b, sys_size):
+    """
+    Triplet indices of kron(A, B) and ids of source entries of A and B.
+    """
+    num_a = rows_a.size
+    num_b = rows_b.size
+    super_rows = np.repeat(rows_a * sys_size, num_b) + np.tile(rows_b, num_a)
+    super_cols = np.repeat(cols_a * sys_size, num_b) + np.tile(cols_b, num_a)
+    src_a = np.repeat(np.arange(num_a, dtype=np.int64), num_b)
+    src_b = np.tile(np.arange(num_b, dtype=np.int64), num_a)
+    return super_rows, super_cols, src_a, src_b
+
+
+def _row_pairs(mtx):
+    """
+    Pairs of stored entries sharing the same row, (D^+ D)_{ac} = sum_b conj(D_ba) D_bc.
+    """
+    counts = np.diff(mtx.indptr).astype(np.int64)
+    rows, _ = _csr_entries(mtx)
+    left = np.repeat(np.arange(rows.size, dtype=np.int64), counts[rows])
+    offsets = np.arange(left.size, dtype=np.int64) - np.repeat(np.cumsum(counts[rows]) - counts[rows], counts[rows])
+    right = mtx.indptr[rows[left]].astype(np.int64) + offsets
+    return left, right
+
+
+class LindbladianPattern:
+    """
+    Symbolic structure of Lindbladian superoperator.
+
+    Every Kronecker term is written as COO triplets using index arithmetic directly from nonzeros
+    of Hamiltonian and dissipators. Each triplet value is conj(s_a) * s_b, where s is the short
+    vector of source values (constants, Hamiltonian data and scaled dissipators data).
+    Distinct source pairs (a, b) are few (about nnz of inputs), so only the pair id of every triplet
+    sorted in CSR order is kept together with resulting CSR structure (indptr, indices).
+    Lindbladian with the same input sparsity patterns is then rebuilt by a linear pass over triplets,
+    temporary arrays of this pass are allocated by refill only.
+    """
+
+    def __init__(self, hamiltonian, dissipators):
+        """
+        :param hamiltonian:
+            Hamiltonian CSR matrix.
+        :type hamiltonian: csr_matrix
+
+        :param dissipators:
+            List of dissipators (CSR format).
+        :type dissipators: list
+        """
+        sys_size = hamiltonian.shape[0]
+        self.sys_size = sys_size
+        self.super_size = sys_size * sys_size
+        self.hamiltonian_structure = (hamiltonian.indptr.copy(), hamiltonian.indices.copy())
+        self.dissipators_structure = [(d.indptr.copy(), d.indices.copy()) for d in dissipators]
+
+        # Source vector layout: [1j, -1j, hamiltonian.data,
+        #                        sqrt(gamma_0) * dissipators[0].data, -0.5 * sqrt(gamma_0) * dissipators[0].data, ...]
+        self.source_offsets = [2, 2 + hamiltonian.nnz]
+        for diss in dissipators:
+            self.source_offsets.append(self.source_offsets[-1] + 2 * diss.nnz)
+        self.source_size = self.source_offsets[-1]
+
+        all_rows = []
+        all_cols = []
+        all_pairs = []
+        pairs_a = []
+        pairs_b = []
+        num_pairs = [0]
+
+        def add_term(rows, cols, pair_ids, src_a, src_b):
+            # Triplets of term reference its source pairs (src_a[k], src_b[k]) by local pair_ids
+            all_rows.append(rows)
+            all_cols.append(cols)
+            all_pairs.append(pair_ids + num_pairs[0])
+            pairs_a.append(src_a)
+            pairs_b.append(src_b)
+            num_pairs[0] += src_a.size
+
+        h_rows, h_cols = _csr_entries(hamiltonian)
+        h_shift = self.source_offsets[0]
+        h_src = np.arange(hamiltonian.nnz, dtype=np.int64) + h_shift
+        rows, cols, src = _eye_kron_ids(h_rows, h_cols, sys_size)
+        add_term(rows, cols, src, np.zeros(h_src.size, dtype=np.int64), h_src)
+        rows, cols, src = _kron_eye_ids(h_cols, h_rows, sys_size)
+        add_term(rows, cols, src, np.ones(h_src.size, dtype=np.int64), h_src)
+
+        for diss_id, diss in enumerate(dissipators):
+            d_shift = self.source_offsets[diss_id + 1]
+            d_half_shift = d_shift + diss.nnz
+            d_rows, d_cols = _csr_entries(diss)
+            rows, cols, src_a, src_b = _kron_ids(d_rows, d_cols, d_rows, d_cols, sys_size)
+            add_term(rows, cols, np.arange(rows.size, dtype=np.int64), src_a + d_shift, src_b + d_shift)
+
+            left, right = _row_pairs(diss)
+            rows, cols, src = _kron_eye_ids(d_cols[right], d_cols[left], sys_size)
+            add_term(rows, cols, src, left + d_shift, right + d_half_shift)
+            rows, cols, src = _eye_kron_ids(d_cols[left], d_cols[right], sys_size)
+            add_term(rows, cols, src, left + d_shift, right + d_half_shift)
+
+        rows = np.concatenate(all_rows)
+        cols = np.concatenate(all_cols)
+        self.num_triplets = rows.size
+
+        keys = rows * self.super_size + cols
+        del rows, cols
+        perm = np.argsort(keys, kind='stable')
+        keys = keys[perm]
+
+        self.pair_a = np.concatenate(pairs_a).astype(np.intp)
+        self.pair_b = np.concatenate(pairs_b).astype(np.intp)
+        id_dtype = np.int32 if max(num_pairs[0], self.num_triplets) < 2 ** 31 else np.int64
+        self.pairs = np.concatenate(all_pairs)[perm].astype(id_dtype)
+        del perm
+
+        is_start = np.ones(keys.size, dtype=bool)
+        is_start[1:] = keys[1:] != keys[:-1]
+        self.starts = np.flatnonzero(is_start).astype(id_dtype)
+
+        unique_keys = keys[self.starts]
+        self.indices = (unique_keys % self.super_size).astype(np.int32 if self.super_size < 2 ** 31 else np.int64)
+        row_counts = np.bincount(unique_keys // self.super_size, minlength=self.super_size)
+        self.indptr = np.concatenate(([0], np.cumsum(row_counts))).astype(self.indices.dtype)
+        self.nnz = unique_keys.size
+
+    def matches(self, hamiltonian, dissipators):
+        """
+        Check that Hamiltonian and dissipators have the sparsity pattern of this structure.
+
+        :return:
+            True if patterns are identical.
+        :rtype: bool
+        """
+        if hamiltonian.shape[0] != self.sys_size or len(dissipators) != len(self.dissipators_structure):
+            return False
+        structures = [self.hamiltonian_structure] + self.dissipators_structure
+        for mtx, (indptr, indices) in zip([hamiltonian] + list(dissipators), structures):
+            if not (np.array_equal(mtx.indptr, indptr) and np.array_equal(mtx.indices, indices)):
+                return False
+        return True
+
+    def assemble(self, hamiltonian, dissipators, gammas, dtype=np.complex128):
+        """
+        New Lindbladian with this structure.
+
+        Only data array is allocated, indices and indptr arrays are shared by all Lindbladians
+        assembled with this structure and must not be modified.
+
+        :return:
+            Lindbladian (CSR format) of size sys_size^2.
+        :rtype: csr_matrix
+        """
+        data = np.zeros(self.nnz, dtype=dtype)
+        lindbladian = csr_matrix((data, self.indices, self.indptr), shape=(self.super_size, self.super_size), copy=False)
+        self.refill(lindbladian, hamiltonian, dissipators, gammas)
+        return lindbladian
+
+    def refill(self, lindbladian, hamiltonian, dissipators, gammas):
+        """
+        Refill data array of Lindbladian with this structure in place.
+
+        :param lindbladian:
+            Lindbladian (CSR format) previously created by assemble.
+        :type lindbladian: csr_matrix
+
+        :param hamiltonian:
+            Hamiltonian CSR matrix with the same pattern.
+        :type hamiltonian: csr_matrix
+
+        :param dissipators:
+            List of dissipators (CSR format) with the same patterns.
+        :type dissipators: list
+
+        :param gammas:
+            List of dissipation rates.
+        :type gammas: list
+        """
+        if lindbladian.nnz != self.nnz:
+            raise ValueError('Lindbladian does not have this structure.')
+
+        source = np.empty(self.source_size, dtype=np.complex128)
+        source[0] = 1.0j
+        source[1] = -1.0j
+        source[self.source_offsets[0]:self.source_offsets[1]] = hamiltonian.data
+        for diss_id, (diss, gamma) in enumerate(zip(dissipators, gammas)):
+            begin = self.source_offsets[diss_id + 1]
+            np.multiply(diss.data, np.sqrt(gamma), out=source[begin:begin + diss.nnz])
+            np.multiply(diss.data, -0.5 * np.sqrt(gamma), out=source[begin + diss.nnz:begin + 2 * diss.nnz])
+
+        pair_values = np.conjugate(source[self.pair_a])
+        pair_values *= source[self.pair_b]
+        # mode='clip' avoids internal buffering of np.take
+        buffer = np.take(pair_values, self.pairs, mode='clip')
+
+        if lindbladian.dtype == np.complex128:
+            np.add.reduceat(buffer, self.starts, out=lindbladian.data)
+        else:
+            lindbladian.data[:] = np.add.reduceat(buffer, self.starts)
+
+
+def assemble_lindbladian(hamiltonian, dissipators, gammas, dtype=np.complex128):
+    """
+    Lindbladian superoperator assembled directly from nonzeros of its inputs.
+
+    All Kronecker terms are written as COO triplets using index arithmetic
+    and duplicates are summed once, no intermediate superoperators are created.
+
+    :param hamiltonian:
+        Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dissipators:
+        List of dissipators (CSR format).
+    :type dissipators: list
+
+    :param gammas:
+        List of dissipation rates.
+    :type gammas: list
+
+    :param dtype:
+        Data type of superoperator.
+    :type dtype: numpy.dtype
+
+    :return:
+        Lindbladian (CSR format) of size sys_size^2.
+    :rtype: csr_matrix
+    """
+    return LindbladianPattern(hamiltonian, dissipators).assemble(hamiltonian, dissipators, gammas, dtype)
+
+
+def assemble_driving_lindbladian(hamiltonian, dtype=np.complex128):
+    """
+    Driving Lindbladian superoperator -i * [H_drv, .] assembled directly from nonzeros.
+
+    :param hamiltonian:
+        Driving Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dtype:
+        Data type of superoperator.
+    :type dtype: numpy.dtype
+
+    :return:
+        Driving Lindbladian (CSR format) of size sys_size^2.
+    :rtype: csr_matrix
+    """
+    return LindbladianPattern(hamiltonian, []).assemble(hamiltonian, [], [], dtype)
+
+
+def lindbladian_operator(hamiltonian, dissipators, gammas, dtype=np.complex128):
+    """
+    Matrix-free Lindbladian acting on vec(rho) of size sys_size^2.
+
+    Each product reshapes vec(rho) (column-major) to a sys_size x sys_size
+    density matrix and applies -i[H, rho] + sum gamma (D rho D^+ - 0.5 {D^+ D, rho})
+    using sparse x dense products, so only O(nnz(H) + nnz(D) + sys_size^2) memory is used.
+
+    :param hamiltonian:
+        Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dissipators:
+        List of dissipators (CSR format).
+    :type dissipators: list
+
+    :param gammas:
+        List of dissipation rates.
+    :type gammas: list
+
+    :param dtype:
+        Data type of operator.
+    :type dtype: numpy.dtype
+
+    :return:
+        Lindbladian linear operator.
+    :rtype: LinearOperator
+    """
+    sys_size = hamiltonian.shape[0]
+    super_size = sys_size * sys_size
+
+    hamiltonian = csr_matrix(hamiltonian, dtype=dtype)
+    hamiltonian_h = hamiltonian.getH().tocsr()
+    terms = []
+    for diss, gamma in zip(dissipators, gammas):
+        diss = csr_matrix(diss, dtype=dtype)
+        diss_h = diss.getH().tocsr()
+        diss_prod = (diss_h * diss).tocsr()
+        terms.append((gamma, diss, diss_h, diss_prod))
+
+    def matvec(vec):
+        rho = np.asarray(vec, dtype=dtype).reshape((sys_size, sys_size), order='F')
+        res = -1.0j * (hamiltonian @ rho - _right_product(rho, hamiltonian))
+        for gamma, diss, diss_h, diss_prod in terms:
+            res += gamma * (
+                _right_product(diss @ rho, diss_h) - 0.5 * (diss_prod @ rho + _right_product(rho, diss_prod))
+            )
+        return res.ravel(order='F')
+
+    def rmatvec(vec):
+        rho = np.asarray(vec, dtype=dtype).reshape((sys_size, sys_size), order='F')
+        res = 1.0j * (hamiltonian_h @ rho - _right_product(rho, hamiltonian_h))
+        for gamma, diss, diss_h, diss_prod in terms:
+            res += gamma * (
+                _right_product(diss_h @ rho, diss) - 0.5 * (diss_prod @ rho + _right_product(rho, diss_prod))
+            )
+        return res.ravel(order='F')
+
+    return LinearOperator((super_size, super_size), matvec=matvec, rmatvec=rmatvec, dtype=dtype)
+
+
+def driving_lindbladian_operator(hamiltonian, dtype=np.complex128):
+    """
+    Matrix-free driving Lindbladian -i * [H_drv, .] acting on vec(rho).
+
+    :param hamiltonian:
+        Driving Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dtype:
+        Data type of operator.
+    :type dtype: numpy.dtype
+
+    :return:
+        Driving Lindbladian linear operator.
+    :rtype: LinearOperator
+    """
+    sys_size = hamiltonian.shape[0]
+    super_size = sys_size * sys_size
+
+    hamiltonian = csr_matrix(hamiltonian, dtype=dtype)
+    hamiltonian_h = hamiltonian.getH().tocsr()
+
+    def matvec(vec):
+        rho = np.asarray(vec, dtype=dtype).reshape((sys_size, sys_size), order='F')
+        res = -1.0j * (hamiltonian @ rho - _right_product(rho, hamiltonian))
+        return res.ravel(order='F')
+
+    def rmatvec(vec):
+        rho = np.asarray(vec, dtype=dtype).reshape((sys_size, sys_size), order='F')
+        res = 1.0j * (hamiltonian_h @ rho - _right_product(rho, hamiltonian_h))
+        return res.ravel(order='F')
+
+    return LinearOperator((super_size, super_size), matvec=matvec, rmatvec=rmatvec, dtype=dtype)
+
+
+def _right_product(rho, mtx):
+    """
+    Dense x sparse product rho * mtx evaluated as (mtx^T * rho^T)^T.
+    """
+    return (mtx.transpose() @ rho.transpose()).transpose()
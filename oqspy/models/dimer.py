@@ -1,6 +1,5 @@
 import numpy as np
 from scipy.sparse import csr_matrix
-import math
 
 
 def dimer_get_sys_size(num_particles):
@@ -13,100 +12,76 @@ def dimer_get_periods(freq):
     return [period]
 
 
-def dimer_get_hamiltonian(num_particles, E, U, J):
+def dimer_get_hamiltonian(num_particles, E, U, J, dtype=np.float64):
     sys_size = dimer_get_sys_size(num_particles)
     U /= float(num_particles)
 
-    rows = []
-    cols = []
-    vals = []
+    st_ids = np.arange(sys_size, dtype=np.int64)
+    rev_ids = sys_size - (st_ids + 1)
 
-    for st_id in range(0, sys_size):
-        rows.append(st_id)
-        cols.append(st_id)
-        val_U = 2.0 * U * float(st_id * (st_id - 1) + (sys_size - (st_id + 1)) * (sys_size - (st_id + 1) - 1))
-        val_E = -E * float((sys_size - (st_id + 1)) - st_id)
-        vals.append(val_U + val_E)
+    vals_U = 2.0 * U * (st_ids * (st_ids - 1) + rev_ids * (rev_ids - 1)).astype(np.float64)
+    vals_E = -E * (rev_ids - st_ids).astype(np.float64)
+    diag = vals_U + vals_E
+    diag -= _sequential_sum(diag) / float(sys_size)
 
-    trace = sum(vals) / float(sys_size)
-    vals = [val - trace for val in vals]
+    off_diag = -J * np.sqrt((rev_ids[:-1] * (st_ids[:-1] + 1)).astype(np.float64))
 
-    for st_id in range(0, sys_size - 1):
-        rows.append(st_id + 1)
-        cols.append(st_id)
-        vals.append(-J * np.sqrt(float((sys_size - (st_id + 1)) * (st_id + 1))))
+    return _dimer_tridiagonal(diag, off_diag, off_diag, dtype)
 
-        rows.append(st_id)
-        cols.append(st_id + 1)
-        vals.append(-J * np.sqrt(float((st_id + 1) * (sys_size - (st_id + 1)))))
 
-    hamiltonian = csr_matrix((vals, (rows, cols)), shape=(sys_size, sys_size))
-
-    return hamiltonian
-
-
-def dimer_get_driving_hamiltonias(num_particles):
+def dimer_get_driving_hamiltonias(num_particles, dtype=np.float64):
     sys_size = dimer_get_sys_size(num_particles)
 
-    rows = []
-    cols = []
-    vals = []
-
-    for st_id in range(0, sys_size):
-        rows.append(st_id)
-        cols.append(st_id)
-        val = -1.0 * float((sys_size - (st_id + 1)) - st_id)
-        vals.append(val)
-
-    trace = sum(vals) / float(sys_size)
-    vals = [val - trace for val in vals]
+    st_ids = np.arange(sys_size, dtype=np.int64)
+    diag = -1.0 * ((sys_size - (st_ids + 1)) - st_ids).astype(np.float64)
+    diag -= _sequential_sum(diag) / float(sys_size)
 
-    hamiltonians = [csr_matrix((vals, (rows, cols)), shape=(sys_size, sys_size))]
+    hamiltonians = [csr_matrix((diag, (st_ids, st_ids)), shape=(sys_size, sys_size), dtype=dtype)]
     return hamiltonians
 
 
 def dimer_get_driving_functions(type, ampl, freq, phas):
     if type == 0:
         period = dimer_get_periods(freq)[0]
+        half_period = period * 0.5
 
         def driving(time):
-            mod_time = math.fmod(time, period)
-            half_period = period * 0.5
-            if mod_time < half_period:
-                drv = ampl
-            else:
-                drv = -ampl
+            mod_time = np.fmod(time, period)
+            drv = np.where(mod_time < half_period, ampl, -ampl)
+            if np.ndim(drv) == 0:
+                drv = float(drv)
             return drv
+        driving.segments = [0.0, half_period, period]
     else:
         def driving(time):
             drv = ampl * np.sin(freq * time + phas)
             return drv
+    driving.vectorized = True
     return [driving]
 
 
-def dimer_get_dissipators(num_particles):
+def dimer_get_dissipators(num_particles, dtype=np.float64):
     sys_size = dimer_get_sys_size(num_particles)
 
-    rows = []
-    cols = []
-    vals = []
+    st_ids = np.arange(sys_size, dtype=np.int64)
+    rev_ids = sys_size - (st_ids + 1)
 
-    for st_id in range(0, sys_size):
-        rows.append(st_id)
-        cols.append(st_id)
-        val = float(st_id - (sys_size - (st_id + 1)))
-        vals.append(val)
+    diag = (st_ids - rev_ids).astype(np.float64)
+    off_diag = np.sqrt((rev_ids[:-1] * (st_ids[:-1] + 1)).astype(np.float64))
 
-    for st_id in range(0, sys_size - 1):
-        rows.append(st_id + 1)
-        cols.append(st_id)
-        val = -np.sqrt(float((sys_size - (st_id + 1)) * (st_id + 1)))
-        vals.append(val)
+    dissipators = [_dimer_tridiagonal(diag, -off_diag, off_diag, dtype)]
+    return dissipators
 
-        rows.append(st_id)
-        cols.append(st_id + 1)
-        val = np.sqrt(float((st_id + 1) * (sys_size - (st_id + 1))))
-        vals.append(val)
 
-    dissipators = [csr_matrix((vals, (rows, cols)), shape=(sys_size, sys_size))]
-    return dissipators
+def _dimer_tridiagonal(diag, lower, upper, dtype):
+    sys_size = diag.size
+    st_ids = np.arange(sys_size, dtype=np.int64)
+    rows = np.concatenate((st_ids, st_ids[1:], st_ids[:-1]))
+    cols = np.concatenate((st_ids, st_ids[:-1], st_ids[1:]))
+    vals = np.concatenate((diag, lower, upper))
+    return csr_matrix((vals, (rows, cols)), shape=(sys_size, sys_size), dtype=dtype)
+
+
+def _sequential_sum(vals):
+    # Left-to-right summation (as built-in sum) instead of pairwise np.sum keeps trace bit-identical
+    return np.cumsum(vals)[-1]
@@ -1,13 +1,56 @@
 from scipy.sparse import csr_matrix
-from scipy import sparse
+from oqspy.lindbladian import \
+    LindbladianPattern, \
+    assemble_lindbladian, \
+    assemble_driving_lindbladian, \
+    lindbladian_operator, \
+    driving_lindbladian_operator
+from oqspy.steady_state import steady_state
+from oqspy.spectrum import liouvillian_spectrum, spectral_gap
+from oqspy.floquet import monodromy, asymptotic_state
+from oqspy.propagation import \
+    piecewise_segments, \
+    PiecewiseConstantPropagator, \
+    DrivenGenerator, \
+    BatchedGenerator, \
+    iter_propagate, \
+    propagate_observables
+from oqspy.trajectories import run_trajectories
+from oqspy.basis import hermitian_superoperator, from_hermitian_basis
+from oqspy.symmetry import \
+    connected_sectors, \
+    symmetry_sectors, \
+    sector_steady_states, \
+    sector_spectrum, \
+    propagate_sectors
+from oqspy.cache import LindbladianCache, operators_key
+from oqspy.instrumentation import Instrumentation, null_instrumentation
 import types
+import functools
 from inspect import signature
 import numpy as np
 
 
+_precision_dtypes = {'double': np.complex128, 'single': np.complex64, 'mixed': np.complex128}
+_real_dtypes = {np.complex128: np.float64, np.complex64: np.float32}
+
+
+def _staged(name):
+    """
+    Decorator measuring method as instrumentation stage.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.instrumentation.stage(name):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class oqs:
 
-    def __init__(self, sys_size, num_driving_segments, num_dissipators):
+    def __init__(self, sys_size, num_driving_segments, num_dissipators, precision='double', basis='vec'):
         """
          Open Quantum System (OQS) basic initialization
 
@@ -23,6 +66,20 @@ class oqs:
         :param num_dissipators:
             Number of dissipators in OQS.
         :type num_dissipators: int
+
+        :param precision:
+            Arithmetic of superoperators and solvers: 'double' (complex128), 'single' (complex64)
+            or 'mixed' (complex128 superoperators, complex64 solves with refinement in complex128).
+            In 'single' precision propagated states stay in double precision, products with superoperators
+            are computed in complex64 and propagation tolerances are limited to 1e-6 (relative) and 1e-8 (absolute).
+        :type precision: str
+
+        :param basis:
+            Coordinates of states and superoperators: 'vec' (complex vec(rho)) or 'hermitian'
+            (real coordinates of Hermitian rho, see oqspy.basis.hermitian_basis).
+            In Hermitian basis superoperators are real (float64, float32 in 'single' precision),
+            propagated states are real coordinates and density matrices are returned as usual.
+        :type basis: str
         """
         if not isinstance(sys_size, int):
             raise TypeError('sys_size must be integer.')
@@ -39,9 +96,17 @@ class oqs:
         if num_dissipators < 0:
             raise ValueError('num_dissipators must be positive integer.')
 
+        if precision not in _precision_dtypes:
+            raise ValueError('precision must be \'double\', \'single\' or \'mixed\'.')
+        if basis not in ['vec', 'hermitian']:
+            raise ValueError('basis must be \'vec\' or \'hermitian\'.')
+
         self.__sys_size = sys_size
         self.__num_driving_segments = num_driving_segments
         self.__num_dissipators = num_dissipators
+        self.__precision = precision
+        self.__dtype = _precision_dtypes[precision]
+        self.__basis = basis
 
         self.__hamiltonian = None
         self.__driving_hamiltonians = None
@@ -50,8 +115,69 @@ class oqs:
         self.__gammas = None
 
         self.__lindbladian = None
+        self.__shift_invert = None
         self.__driving_lindbladians = None
+        self.__piecewise_propagator = None
+        self.__driven_generator = None
+
+        self.__lindbladian_pattern = None
+        self.__cache = None
+        self.__instrumentation = null_instrumentation
+
+    def instrument(self, enabled=True, hooks=None, track_memory=True):
+        """
+        Instrumentation of Open Quantum System (OQS) (opt-in).
+
+        Records wall time and allocation peak of stages (initialization, assembly, solvers, propagation),
+        statistics of superoperators (nnz, fill, bandwidth) and solver statistics.
+
+        :param enabled:
+            Enable instrumentation. Records are discarded if False.
+        :type enabled: bool
+
+        :param hooks:
+            List of functions hook(event) called with every record.
+        :type hooks: list
+
+        :param track_memory:
+            Trace allocation peaks (tracemalloc).
+        :type track_memory: bool
+
+        :return:
+            Instrumentation object (report() returns structured report).
+        :rtype: Instrumentation
+        """
+        if enabled:
+            self.__instrumentation = Instrumentation(hooks, track_memory)
+        else:
+            self.__instrumentation = null_instrumentation
+        return self.__instrumentation
+
+    @property
+    def instrumentation(self):
+        """
+        Current instrumentation object (no-op if instrumentation is disabled).
+        """
+        return self.__instrumentation
+
+    def use_cache(self, cache):
+        """
+        Persistent on-disk cache of Lindbladians (opt-in).
+
+        Lindbladians are looked up by hash of Hamiltonians, dissipators and rates before assembly,
+        newly built ones are stored. Cached Lindbladians are memory-mapped read-only.
+
+        :param cache:
+            Cache object or directory name. Caching is disabled if None.
+        :type cache: LindbladianCache
+        """
+        if isinstance(cache, str):
+            cache = LindbladianCache(cache)
+        if cache is not None and not isinstance(cache, LindbladianCache):
+            raise TypeError('cache must be LindbladianCache, directory name or None.')
+        self.__cache = cache
 
+    @_staged('init_hamiltonian')
     def init_hamiltonian(self, hamiltonian):
         """
         Initialization of Open Quantum System (OQS) with Hamiltonian.
@@ -65,7 +191,12 @@ class oqs:
         if hamiltonian.shape[0] != self.__sys_size or hamiltonian.shape[1] != self.__sys_size:
             raise ValueError('Incorrect size of hamiltonian.')
         self.__hamiltonian = hamiltonian
+        self.__lindbladian = None
+        self.__shift_invert = None
+        self.__piecewise_propagator = None
+        self.__driven_generator = None
 
+    @_staged('init_driving')
     def init_driving(self, hamiltonians, functions):
         """
         Initialization of Open Quantum System (OQS) with driving details.
@@ -109,7 +240,11 @@ class oqs:
 
         self.__driving_hamiltonians = hamiltonians
         self.__driving_functions = functions
+        self.__driving_lindbladians = None
+        self.__piecewise_propagator = None
+        self.__driven_generator = None
 
+    @_staged('init_dissipation')
     def init_dissipation(self, dissipators, gammas):
         """
         Initialization of Open Quantum System (OQS) with dissipation.
@@ -150,7 +285,63 @@ class oqs:
 
         self.__dissipators = dissipators
         self.__gammas = gammas
+        self.__lindbladian = None
+        self.__shift_invert = None
+        self.__piecewise_propagator = None
+        self.__driven_generator = None
+
+    @property
+    def precision(self):
+        """
+        Arithmetic of superoperators and solvers ('double', 'single' or 'mixed').
+        """
+        return self.__precision
+
+    @property
+    def basis(self):
+        """
+        Coordinates of states and superoperators ('vec' or 'hermitian').
+        """
+        return self.__basis
+
+    @property
+    def lindbladian(self):
+        """
+        Lindbladian (CSR format), assembled on first access.
 
+        Cached until Hamiltonian or dissipation is re-initialized.
+        Rebuilt matrix has its own data array, so previously returned ones are not changed;
+        indices and indptr arrays are shared while sparsity patterns stay the same and must not be modified.
+        """
+        if self.__lindbladian is None:
+            self.__calc_lindbladian()
+        return self.__lindbladian
+
+    @property
+    def driving_lindbladians(self):
+        """
+        List of driving Lindbladians (CSR format), assembled on first access.
+
+        Cached until driving is re-initialized (independent of Hamiltonian and dissipation).
+        """
+        if self.__driving_lindbladians is None:
+            self.__calc_driving_lindbladians()
+        return self.__driving_lindbladians
+
+    @property
+    def driven_generator(self):
+        """
+        Time-dependent generator L_0 + sum_k f_k(t) L_k on merged sparsity pattern, built on first access.
+
+        Cached until Hamiltonian, dissipation or driving is re-initialized.
+        """
+        if self.__driven_generator is None:
+            with self.__instrumentation.stage('driven_generator'):
+                self.__driven_generator = DrivenGenerator(self.lindbladian, self.driving_lindbladians)
+                self.__instrumentation.record_operator('driven_generator', self.__driven_generator.matrix)
+        return self.__driven_generator
+
+    @_staged('calc_lindbladian')
     def __calc_lindbladian(self):
 
         if self.__hamiltonian is None:
@@ -160,21 +351,578 @@ class oqs:
         if self.__gammas is None:
             raise ValueError('gammas are not initialized.')
 
-        eye = sparse.eye(self.__sys_size, self.__sys_size, dtype=np.complex, format='csr')
+        instrumentation = self.__instrumentation
+        key = None
+        if self.__cache is not None:
+            with instrumentation.stage('cache_lookup'):
+                key = operators_key('lindbladian', [self.__hamiltonian] + self.__dissipators, self.__gammas, self.__dtype)
+                cached = self.__cache.get(key)
+            if cached is not None:
+                self.__lindbladian = self.__to_basis(cached)
+                instrumentation.record_operator('lindbladian', self.__lindbladian)
+                return
+
+        pattern = self.__lindbladian_pattern
+        if pattern is None or not pattern.matches(self.__hamiltonian, self.__dissipators):
+            with instrumentation.stage('pattern'):
+                pattern = LindbladianPattern(self.__hamiltonian, self.__dissipators)
+                self.__lindbladian_pattern = pattern
+            stage = 'assemble'
+        else:
+            stage = 'refill'
+        # Same sparsity pattern: only new data array is filled, structure is shared with the pattern,
+        # so previously returned Lindbladians are not changed
+        with instrumentation.stage(stage):
+            lindbladian = pattern.assemble(self.__hamiltonian, self.__dissipators, self.__gammas, self.__dtype)
+        self.__lindbladian = self.__to_basis(lindbladian)
+        instrumentation.record_operator('lindbladian', self.__lindbladian)
+        if key is not None:
+            with instrumentation.stage('cache_store'):
+                self.__cache.put(key, lindbladian)
+
+    def __to_basis(self, superoperator):
+        # Pattern, assembly and cache stay in vec(rho) coordinates, Hermitian basis is applied on top
+        if self.__basis == 'vec':
+            return superoperator
+        with self.__instrumentation.stage('hermitian_basis'):
+            return hermitian_superoperator(superoperator, self.__sys_size, _real_dtypes[self.__dtype])
+
+    def get_lindbladian_operator(self):
+        """
+        Matrix-free Lindbladian of Open Quantum System (OQS).
 
-        self.__lindbladian = -1.0j * (
-            sparse.kron(eye, self.__hamiltonian) - sparse.kron(self.__hamiltonian.transpose(copy=True), eye)
-        )
+        Suitable for scipy.sparse.linalg solvers and propagators
+        when the sys_size^2 x sys_size^2 CSR Lindbladian does not fit in memory.
+
+        :return:
+            Lindbladian linear operator acting on vec(rho) (or on Hermitian coordinates, see basis).
+        :rtype: LinearOperator
+        """
+        if self.__hamiltonian is None:
+            raise ValueError('hamiltonian is not initialized.')
+        if self.__dissipators is None:
+            raise ValueError('dissipators are not initialized.')
+        if self.__gammas is None:
+            raise ValueError('gammas are not initialized.')
+
+        return self.__to_basis(lindbladian_operator(self.__hamiltonian, self.__dissipators, self.__gammas, self.__dtype))
+
+    def get_driving_lindbladian_operators(self):
+        """
+        Matrix-free driving Lindbladians of Open Quantum System (OQS).
+
+        :return:
+            List of driving Lindbladian linear operators acting on vec(rho) (or on Hermitian coordinates, see basis).
+        :rtype: list
+        """
+        if self.__num_driving_segments <= 0:
+            raise ValueError('num_driving_segments must be positive for driving lindbladian operators.')
+        if self.__driving_hamiltonians is None:
+            raise ValueError('driving_hamiltonians is not initialized.')
+
+        return [self.__to_basis(driving_lindbladian_operator(h, self.__dtype)) for h in self.__driving_hamiltonians]
+
+    @_staged('steady_state')
+    def steady_state(self, method='direct', matrix_free=False, **kwargs):
+        """
+        Stationary density matrix of autonomous Open Quantum System (OQS).
+
+        :param method:
+            Solver: 'direct' (sparse LU), 'gmres' or 'bicgstab'.
+        :type method: str
+
+        :param matrix_free:
+            Use matrix-free Lindbladian (iterative methods only).
+        :type matrix_free: bool
+
+        :param kwargs:
+            Additional arguments of oqspy.steady_state.steady_state.
+            Precision and basis of OQS are used unless 'precision' or 'basis' is specified.
+
+        :return:
+            Density matrix (sys_size x sys_size) and dictionary with solver statistics.
+        :rtype: tuple
+        """
+        if matrix_free:
+            lindbladian = self.get_lindbladian_operator()
+        else:
+            lindbladian = self.lindbladian
+        kwargs.setdefault('precision', self.__precision)
+        kwargs.setdefault('basis', self.__basis)
+        rho, info = steady_state(lindbladian, self.__sys_size, method=method, **kwargs)
+        self.__instrumentation.record_info('steady_state', info)
+        return rho, info
+
+    @_staged('spectrum')
+    def spectrum(self, k=6, matrix_free=False, **kwargs):
+        """
+        Eigenvalues and modes of Lindbladian of Open Quantum System (OQS) nearest to zero.
+
+        Sparse LU factorization of shift-invert method is kept and reused by subsequent calls
+        until Hamiltonian or dissipation is re-initialized.
+
+        :param k:
+            Number of eigenvalues.
+        :type k: int
+
+        :param matrix_free:
+            Use matrix-free Lindbladian ('arnoldi' method).
+        :type matrix_free: bool
+
+        :param kwargs:
+            Additional arguments of oqspy.spectrum.liouvillian_spectrum.
+
+        :return:
+            Eigenvalues sorted by decreasing real part, matrix of modes (vec(rho) columns)
+            and dictionary with solver statistics.
+        :rtype: tuple
+        """
+        if matrix_free:
+            eigenvalues, modes, info = liouvillian_spectrum(self.get_lindbladian_operator(), k, **kwargs)
+        else:
+            shift_invert = self.__shift_invert
+            if shift_invert is not None and kwargs.get('sigma', shift_invert.sigma) == shift_invert.sigma:
+                kwargs.setdefault('factorization', shift_invert)
+            eigenvalues, modes, info = liouvillian_spectrum(self.lindbladian, k, **kwargs)
+            if info['factorization'] is not None:
+                self.__shift_invert = info['factorization']
+        if modes is not None and self.__basis == 'hermitian':
+            modes = from_hermitian_basis(modes, self.__sys_size)
+        self.__instrumentation.record_info('spectrum', {key: value for key, value in info.items() if key != 'factorization'})
+        return eigenvalues, modes, info
+
+    def spectral_gap(self, k=6, **kwargs):
+        """
+        Liouvillian gap of Open Quantum System (OQS), i.e. inverse asymptotic relaxation time.
+
+        Gap is minimal decay rate among k eigenvalues nearest to zero in modulus (see spectrum),
+        so slowly decaying coherent modes with large imaginary part need larger k
+        (or matrix_free=True, which targets eigenvalues with largest real part).
+
+        :param k:
+            Number of eigenvalues.
+        :type k: int
+
+        :param kwargs:
+            Additional arguments of spectrum.
+
+        :return:
+            Spectral gap.
+        :rtype: float
+        """
+        eigenvalues, _, _ = self.spectrum(k, return_modes=False, **kwargs)
+        return spectral_gap(eigenvalues)
+
+    @_staged('sectors')
+    def sectors(self, symmetry=None):
+        """
+        Invariant subspaces (sectors) of Lindbladian and driving Lindbladians of Open Quantum System (OQS).
+
+        :param symmetry:
+            Unitary weak symmetry operator (sys_size x sys_size, see oqspy.symmetry.symmetry_sectors).
+            Connected components of sparsity pattern are used if None.
+        :type symmetry: csr_matrix
+
+        :return:
+            List of sectors.
+        :rtype: list
+        """
+        if symmetry is not None:
+            if self.__basis != 'vec':
+                raise ValueError('Symmetry sectors require \'vec\' basis.')
+            return symmetry_sectors(symmetry, self.__sys_size)
+        superoperators = [self.lindbladian]
+        if self.__num_driving_segments > 0 and self.__driving_hamiltonians:
+            superoperators += self.driving_lindbladians
+        return connected_sectors(superoperators)
+
+    @_staged('sector_steady_states')
+    def sector_steady_states(self, symmetry=None, num_workers=1):
+        """
+        Stationary density matrices of autonomous Open Quantum System (OQS) solved independently in sectors.
+
+        :param symmetry:
+            Unitary weak symmetry operator (connected components are used if None, see sectors).
+        :type symmetry: csr_matrix
+
+        :param num_workers:
+            Number of worker processes.
+        :type num_workers: int
+
+        :return:
+            List of density matrices (one per sector carrying trace) and dictionary with solver statistics.
+        :rtype: tuple
+        """
+        rhos, info = sector_steady_states(self.lindbladian, self.sectors(symmetry), self.__sys_size,
+                                          num_workers=num_workers, basis=self.__basis)
+        self.__instrumentation.record_info('sector_steady_states', info)
+        return rhos, info
+
+    @_staged('sector_spectrum')
+    def sector_spectrum(self, k=6, symmetry=None, num_workers=1, **kwargs):
+        """
+        Eigenvalues of Lindbladian of Open Quantum System (OQS) nearest to zero, k per sector.
+
+        :param k:
+            Number of eigenvalues per sector.
+        :type k: int
+
+        :param symmetry:
+            Unitary weak symmetry operator (connected components are used if None, see sectors).
+        :type symmetry: csr_matrix
+
+        :param num_workers:
+            Number of worker processes.
+        :type num_workers: int
+
+        :param kwargs:
+            Additional arguments of oqspy.spectrum.liouvillian_spectrum.
+
+        :return:
+            Eigenvalues sorted by decreasing real part, sector ids of eigenvalues and dictionary with statistics.
+        :rtype: tuple
+        """
+        return sector_spectrum(self.lindbladian, self.sectors(symmetry), k, num_workers=num_workers, **kwargs)
+
+    @_staged('propagate_sectors')
+    def propagate_sectors(self, state, time_start, time_finish, symmetry=None, num_workers=1, **kwargs):
+        """
+        Propagation of Open Quantum System (OQS) independently in sectors (driving must respect symmetry).
+
+        :param state:
+            Initial vec(rho) (column-major, or Hermitian coordinates, see basis).
+        :type state: numpy.ndarray
+
+        :param time_start:
+            Initial time.
+        :type time_start: float
+
+        :param time_finish:
+            Final time.
+        :type time_finish: float
+
+        :param symmetry:
+            Unitary weak symmetry operator (connected components are used if None, see sectors).
+        :type symmetry: csr_matrix
+
+        :param num_workers:
+            Number of worker processes.
+        :type num_workers: int
+
+        :param kwargs:
+            Additional arguments of oqspy.propagation.propagate.
+
+        :return:
+            State at time_finish.
+        :rtype: numpy.ndarray
+        """
+        driving_lindbladians = None
+        driving_functions = None
+        if self.__num_driving_segments > 0 and self.__driving_functions:
+            driving_lindbladians = self.driving_lindbladians
+            driving_functions = self.__driving_functions
+        return propagate_sectors(self.lindbladian, state, time_start, time_finish, self.sectors(symmetry),
+                                 driving_lindbladians, driving_functions, num_workers=num_workers, **kwargs)
+
+    @_staged('floquet')
+    def floquet(self, period, num_workers=1, **kwargs):
+        """
+        Floquet monodromy and asymptotic periodic state of driven Open Quantum System (OQS).
+
+        :param period:
+            Driving period.
+        :type period: float
 
-        for diss_id, diss in enumerate(self.__dissipators):
-            tmp_1 = diss.getH().transpose(copy=True)
-            tmp_2 = diss.getH() * diss
-            tmp_3 = tmp_2.transpose(copy=True)
+        :param num_workers:
+            Number of worker processes for column propagation.
+        :type num_workers: int
 
-            self.__lindbladian += 0.5 * self.__gammas[diss_id] * (
-                2.0 * sparse.kron(eye, diss) * sparse.kron(tmp_1, eye) - sparse.kron(tmp_3, eye) - sparse.kron(eye, tmp_2)
+        :param kwargs:
+            Additional arguments of oqspy.floquet.monodromy.
+
+        :return:
+            Monodromy matrix (sys_size^2 x sys_size^2, in coordinates of basis) and asymptotic density matrix
+            (sys_size x sys_size).
+        :rtype: tuple
+        """
+        # Merged generator is cached by OQS, it is not rebuilt for every floquet call
+        lindbladian, driving_lindbladians, driving_functions = self.__get_generator()
+        with self.__instrumentation.stage('monodromy'):
+            monodromy_mtx = monodromy(
+                lindbladian,
+                driving_lindbladians,
+                driving_functions,
+                period,
+                num_workers=num_workers,
+                **kwargs
             )
+        with self.__instrumentation.stage('asymptotic_state'):
+            rho, _ = asymptotic_state(monodromy_mtx, self.__sys_size, self.__basis)
+        return monodromy_mtx, rho
+
+    def iter_propagate(self, state, times, **kwargs):
+        """
+        Generator of (time, vec(rho)) of Open Quantum System (OQS) at output times.
+
+        In Hermitian basis states are real coordinates (see oqspy.basis.to_hermitian_basis).
+
+        :param state:
+            Initial vec(rho) (column-major) at times[0].
+        :type state: numpy.ndarray
+
+        :param times:
+            Increasing output times.
+        :type times: numpy.ndarray
+
+        :param kwargs:
+            Additional arguments of oqspy.propagation.iter_propagate.
+        """
+        lindbladian, driving_lindbladians, driving_functions = self.__get_generator()
+        return iter_propagate(lindbladian, state, times, driving_lindbladians, driving_functions, **kwargs)
+
+    def batched_generator(self, driving_amplitudes=None, dissipation_rates=None):
+        """
+        Generators of Open Quantum System (OQS) for p parameter points sharing Hamiltonian and operators.
+
+        Points differ by multipliers of driving functions and/or by dissipation rates (see BatchedGenerator).
+
+        :param driving_amplitudes:
+            Multipliers of driving functions (num_driving_segments x p, or p values common for all segments).
+            Driving is not scaled if None.
+        :type driving_amplitudes: numpy.ndarray
+
+        :param dissipation_rates:
+            Dissipation rates (num_dissipators x p, or p values common for all dissipators).
+            Rates of OQS are used if None.
+        :type dissipation_rates: numpy.ndarray
+
+        :return:
+            Batched generator and list of driving functions of its terms.
+        :rtype: tuple
+        """
+        if driving_amplitudes is None and dissipation_rates is None:
+            raise ValueError('driving_amplitudes or dissipation_rates must be specified.')
+        is_driven = self.__num_driving_segments > 0 and self.__driving_functions is not None
+        if driving_amplitudes is not None and not is_driven:
+            raise ValueError('driving_amplitudes require initialized driving.')
+
+        rows = {}
+        if driving_amplitudes is not None:
+            rows['driving_amplitudes'] = (np.asarray(driving_amplitudes, dtype=np.float64), self.__num_driving_segments)
+        if dissipation_rates is not None:
+            rows['dissipation_rates'] = (np.asarray(dissipation_rates, dtype=np.float64), self.__num_dissipators)
+        weights = {}
+        for name, (values, num_rows) in rows.items():
+            if values.ndim == 1:
+                values = np.tile(values, (num_rows, 1))
+            if values.ndim != 2 or values.shape[0] != num_rows:
+                raise ValueError(f'{name} must have {num_rows} rows or be one-dimensional.')
+            weights[name] = values
+        num_points = {values.shape[1] for values in weights.values()}
+        if len(num_points) != 1:
+            raise ValueError('driving_amplitudes and dissipation_rates must have the same number of points.')
+        num_points = num_points.pop()
+
+        terms = []
+        term_weights = []
+        functions = []
+        if dissipation_rates is None:
+            lindbladian = self.lindbladian
+        else:
+            if self.__hamiltonian is None:
+                raise ValueError('hamiltonian is not initialized.')
+            if self.__dissipators is None:
+                raise ValueError('dissipators are not initialized.')
+            # Hamiltonian part -i[H, .] is common, every dissipator is a separately weighted term
+            lindbladian = self.__to_basis(assemble_driving_lindbladian(self.__hamiltonian, self.__dtype))
+            empty = csr_matrix(self.__hamiltonian.shape, dtype=self.__hamiltonian.dtype)
+            for dissipator, rates in zip(self.__dissipators, weights['dissipation_rates']):
+                terms.append(self.__to_basis(assemble_lindbladian(empty, [dissipator], [1.0], self.__dtype)))
+                term_weights.append(rates)
+                functions.append(None)
+        if is_driven:
+            amplitudes = weights.get('driving_amplitudes', np.ones((self.__num_driving_segments, num_points)))
+            terms += self.driving_lindbladians
+            term_weights += list(amplitudes)
+            functions += list(self.__driving_functions)
+        return BatchedGenerator(lindbladian, terms, np.array(term_weights).reshape((len(terms), num_points))), functions
+
+    def iter_propagate_batch(self, state, times, driving_amplitudes=None, dissipation_rates=None, **kwargs):
+        """
+        Generator of (time, block) of Open Quantum System (OQS) for p parameter points evolved together.
+
+        Column j of yielded block (sys_size^2 x p) is vec(rho) of parameter point j (see batched_generator).
+
+        :param state:
+            Initial vec(rho) common for all points or block of initial states (sys_size^2 x p).
+        :type state: numpy.ndarray
 
+        :param times:
+            Increasing output times.
+        :type times: numpy.ndarray
+
+        :param driving_amplitudes:
+            Multipliers of driving functions of parameter points.
+        :type driving_amplitudes: numpy.ndarray
+
+        :param dissipation_rates:
+            Dissipation rates of parameter points.
+        :type dissipation_rates: numpy.ndarray
+
+        :param kwargs:
+            Additional arguments of oqspy.propagation.iter_propagate.
+        """
+        generator, functions = self.batched_generator(driving_amplitudes, dissipation_rates)
+        state = np.asarray(state)
+        if state.ndim == 1:
+            state = np.repeat(state[:, np.newaxis], generator.num_points, axis=1)
+        return iter_propagate(generator, state, times, None, functions, **kwargs)
+
+    @_staged('propagate_observables')
+    def propagate_observables(self, state, times, observables, callback=None, out=None, **kwargs):
+        """
+        Expectation values of observables of Open Quantum System (OQS) computed on the fly during propagation.
+
+        :param state:
+            Initial vec(rho) (column-major) at times[0].
+        :type state: numpy.ndarray
+
+        :param times:
+            Increasing output times.
+        :type times: numpy.ndarray
+
+        :param observables:
+            List of observables (sys_size x sys_size).
+        :type observables: list
+
+        :param callback:
+            Function callback(time_id, time, values, state) called at every output time.
+        :type callback: function
+
+        :param out:
+            Path of .npy file for results (written incrementally as memmap).
+        :type out: str
+
+        :param kwargs:
+            Additional arguments of oqspy.propagation.iter_propagate.
+
+        :return:
+            Array of expectation values of shape (len(times), len(observables)).
+        :rtype: numpy.ndarray
+        """
+        lindbladian, driving_lindbladians, driving_functions = self.__get_generator()
+        return propagate_observables(lindbladian, state, times, observables, driving_lindbladians, driving_functions,
+                                     callback=callback, out=out, basis=self.__basis, **kwargs)
+
+    def __get_generator(self):
+        if self.__num_driving_segments > 0 and self.__driving_functions:
+            return self.driven_generator, None, self.__driving_functions
+        return self.lindbladian, None, None
+
+    @_staged('propagate_periods')
+    def propagate_periods(self, state, num_periods=1, segments=None, return_all=False):
+        """
+        Exact propagation of Open Quantum System (OQS) with piecewise-constant driving over whole periods.
+
+        Exponential actions of constant segments are precomputed once and reused across periods and calls.
+
+        :param state:
+            Initial vec(rho) (column-major) at phase 0.
+        :type state: numpy.ndarray
+
+        :param num_periods:
+            Number of periods.
+        :type num_periods: int
+
+        :param segments:
+            List of (duration, [values of driving functions]) covering one period.
+            Detected from 'segments' attribute of driving functions if None.
+        :type segments: list
+
+        :param return_all:
+            Return states after every period.
+        :type return_all: bool
+
+        :return:
+            State after num_periods or list of states after each period.
+        :rtype: numpy.ndarray
+        """
+        if segments is not None:
+            self.__piecewise_propagator = None
+        if self.__piecewise_propagator is None:
+            if segments is None:
+                detected = piecewise_segments(self.__driving_functions)
+                if detected is None:
+                    raise ValueError('Driving functions are not piecewise-constant, segments must be specified.')
+                segments = detected[1]
+            self.__piecewise_propagator = PiecewiseConstantPropagator(self.lindbladian, self.driving_lindbladians, segments)
+        return self.__piecewise_propagator.propagate(state, num_periods, return_all)
+
+    @_staged('trajectories')
+    def trajectories(self, psi_init, times, observables, num_trajectories, num_workers=1, seed=None, **kwargs):
+        """
+        Observables averaged over quantum trajectories (Monte Carlo wavefunction method).
+
+        Needs only O(sys_size) memory per trajectory, driving is taken into account if initialized.
+
+        :param psi_init:
+            Initial state vector.
+        :type psi_init: numpy.ndarray
+
+        :param times:
+            Output times.
+        :type times: numpy.ndarray
+
+        :param observables:
+            List of observables (sys_size x sys_size matrices).
+        :type observables: list
+
+        :param num_trajectories:
+            Number of trajectories.
+        :type num_trajectories: int
+
+        :param num_workers:
+            Number of worker processes.
+        :type num_workers: int
+
+        :param seed:
+            Seed of random streams.
+        :type seed: int
+
+        :param kwargs:
+            Additional arguments of oqspy.trajectories.run_trajectories.
+
+        :return:
+            Dictionary with averaged observables and ensemble statistics.
+        :rtype: dict
+        """
+        if self.__hamiltonian is None:
+            raise ValueError('hamiltonian is not initialized.')
+        if self.__dissipators is None:
+            raise ValueError('dissipators are not initialized.')
+
+        driving_hamiltonians = None
+        driving_functions = None
+        if self.__num_driving_segments > 0 and self.__driving_hamiltonians:
+            driving_hamiltonians = self.__driving_hamiltonians
+            driving_functions = self.__driving_functions
+
+        return run_trajectories(
+            self.__hamiltonian,
+            self.__dissipators,
+            self.__gammas,
+            psi_init,
+            times,
+            observables,
+            num_trajectories,
+            driving_hamiltonians=driving_hamiltonians,
+            driving_functions=driving_functions,
+            num_workers=num_workers,
+            seed=seed,
+            **kwargs
+        )
+
+    @_staged('calc_driving_lindbladians')
     def __calc_driving_lindbladians(self):
 
         if self.__num_driving_segments <= 0:
@@ -184,13 +932,16 @@ class oqs:
         if self.__driving_functions is None:
             raise ValueError('__driving_functions is not initialized.')
 
-        eye = sparse.eye(self.__sys_size, self.__sys_size, dtype=np.complex, format='csr')
-
         self.__driving_lindbladians = []
         for l_id in range(0, self.__num_driving_segments):
-
-            lindbladian = -1.0j * (
-                sparse.kron(eye, self.__driving_hamiltonians[l_id]) - sparse.kron(self.__driving_hamiltonians[l_id].transpose(copy=True), eye)
-            )
-
+            hamiltonian = self.__driving_hamiltonians[l_id]
+            if self.__cache is None:
+                lindbladian = assemble_driving_lindbladian(hamiltonian, self.__dtype)
+            else:
+                lindbladian = self.__cache.get_or_build(
+                    operators_key('driving_lindbladian', [hamiltonian], dtype=self.__dtype),
+                    lambda: assemble_driving_lindbladian(hamiltonian, self.__dtype)
+                )
+            lindbladian = self.__to_basis(lindbladian)
             self.__driving_lindbladians.append(lindbladian)
+            self.__instrumentation.record_operator(f'driving_lindbladian_{l_id}', lindbladian)
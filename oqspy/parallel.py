@@ -0,0 +1,218 @@
+from concurrent.futures import ThreadPoolExecutor
+from scipy.sparse import isspmatrix_csr
+from scipy.sparse.linalg import LinearOperator
+import multiprocessing
+import numpy as np
+import warnings
+import os
+
+# Kernels of SciPy CSR products are private API: products fall back to mtx @ state if they are not available
+try:
+    from scipy.sparse import _sparsetools
+except ImportError:
+    _sparsetools = None
+if not all(hasattr(_sparsetools, name) for name in ['csr_matvec', 'csr_matvecs']):
+    _sparsetools = None
+
+
+def get_context():
+    """
+    Multiprocessing context used by process pools of oqspy.
+
+    'fork' start method is preferred where available: operators and driving closures
+    passed to pool initializer are then inherited by workers without pickling.
+
+    :return:
+        Multiprocessing context.
+    :rtype: multiprocessing.context.BaseContext
+    """
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+# Rows of smaller matrices are not split: thread dispatch would cost more than the product
+min_nnz_per_thread = 1 << 15
+
+# Default number of threads can be set by OQSPY_NUM_THREADS environment variable
+_threads = {'num_threads': int(os.environ.get('OQSPY_NUM_THREADS', 1)), 'executor': None, 'executor_size': 0}
+
+
+def set_num_threads(num_threads=None):
+    """
+    Number of threads of sparse products (csr_matvec) used by solvers and integrators of oqspy.
+
+    :param num_threads:
+        Number of threads (all available cores if None, single-threaded SciPy kernel if 1).
+    :type num_threads: int
+    """
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    if not isinstance(num_threads, int) or num_threads <= 0:
+        raise ValueError('num_threads must be positive integer.')
+    _threads['num_threads'] = num_threads
+
+
+def get_num_threads():
+    """
+    Number of threads of sparse products.
+    """
+    return _threads['num_threads']
+
+
+def _executor(num_threads):
+    executor = _threads['executor']
+    if executor is None or _threads['executor_size'] < num_threads:
+        if executor is not None:
+            executor.shutdown(wait=False)
+        executor = ThreadPoolExecutor(max_workers=num_threads, thread_name_prefix='oqspy')
+        _threads['executor'] = executor
+        _threads['executor_size'] = num_threads
+    return executor
+
+
+def _row_blocks(mtx, num_blocks):
+    """
+    Boundaries of row blocks with approximately equal number of nonzeros.
+    """
+    targets = np.linspace(0, mtx.nnz, num_blocks + 1)
+    boundaries = np.searchsorted(mtx.indptr, targets, side='left')
+    boundaries[0] = 0
+    boundaries[-1] = mtx.shape[0]
+    return np.unique(boundaries)
+
+
+def _csr_rows_matvec_add(mtx, begin, end, state, out):
+    # sparsetools releases GIL, row blocks write to disjoint parts of out
+    indptr = mtx.indptr[begin:end + 1]
+    if state.ndim == 1:
+        _sparsetools.csr_matvec(end - begin, mtx.shape[1], indptr, mtx.indices, mtx.data, state, out[begin:end])
+    else:
+        _sparsetools.csr_matvecs(end - begin, mtx.shape[1], state.shape[1], indptr, mtx.indices, mtx.data,
+                                 state.ravel(), out[begin:end].ravel())
+
+
+def csr_matvec_add(mtx, state, out, num_threads=None):
+    """
+    Accumulation out += mtx @ state, rows are split across threads.
+
+    Every row is computed by SciPy kernel in the same order as in single-threaded product,
+    so results are identical for any number of threads. Products of solvers and integrators go through this function,
+    which falls back to mtx @ state if private SciPy kernels are not available.
+
+    :param mtx:
+        Sparse matrix (CSR format, canonical), data type of state and out.
+    :type mtx: csr_matrix
+
+    :param state:
+        Vector or row-major (C-contiguous) block of vectors.
+    :type state: numpy.ndarray
+
+    :param out:
+        C-contiguous output array of the same data type.
+    :type out: numpy.ndarray
+
+    :param num_threads:
+        Number of threads (see set_num_threads if None).
+    :type num_threads: int
+
+    :return:
+        out.
+    :rtype: numpy.ndarray
+    """
+    if not out.flags.c_contiguous:
+        raise ValueError('out must be C-contiguous array.')
+    if out.shape != (mtx.shape[0],) + state.shape[1:]:
+        raise ValueError('out must have shape of product.')
+    if not mtx.dtype == state.dtype == out.dtype:
+        raise ValueError('mtx, state and out must have the same data type.')
+    # Row blocks of out are written through flattened views, which must not be copies
+    state = np.ascontiguousarray(state)
+    if num_threads is None:
+        num_threads = _threads['num_threads']
+    if _sparsetools is None:
+        out += mtx @ state
+        return out
+    num_blocks = min(num_threads, mtx.nnz // min_nnz_per_thread)
+    if num_blocks <= 1:
+        _csr_rows_matvec_add(mtx, 0, mtx.shape[0], state, out)
+        return out
+    boundaries = _row_blocks(mtx, num_blocks)
+    executor = _executor(num_threads)
+    futures = [executor.submit(_csr_rows_matvec_add, mtx, begin, end, state, out)
+               for begin, end in zip(boundaries[:-1], boundaries[1:])]
+    for future in futures:
+        future.result()
+    return out
+
+
+def csr_matvec(mtx, state, num_threads=None):
+    """
+    Product mtx @ state of CSR matrix and vector (or block of vectors) by multithreaded kernel.
+
+    State is cast to data type of matrix if it is wider. Real matrix is applied to complex state
+    part by part, other matrices of narrower type than state are promoted by SciPy
+    (single-threaded, with RuntimeWarning).
+
+    :param mtx:
+        Sparse matrix (CSR format).
+    :type mtx: csr_matrix
+
+    :param state:
+        Vector or block of vectors.
+    :type state: numpy.ndarray
+
+    :param num_threads:
+        Number of threads (see set_num_threads if None).
+    :type num_threads: int
+
+    :return:
+        Product.
+    :rtype: numpy.ndarray
+    """
+    dtype = np.result_type(mtx.dtype, state.dtype)
+    if mtx.dtype != dtype:
+        if np.iscomplexobj(state) and mtx.dtype == np.result_type(mtx.dtype, state.real.dtype):
+            # Real matrix (Hermitian basis) and complex state: real and imaginary parts are multiplied separately
+            return csr_matvec(mtx, state.real, num_threads) + 1.0j * csr_matvec(mtx, state.imag, num_threads)
+        warnings.warn(f'csr_matvec: matrix of type {mtx.dtype} is promoted to {dtype} in single-threaded product.',
+                      RuntimeWarning, stacklevel=2)
+        return mtx @ state
+    state = np.ascontiguousarray(state, dtype=dtype)
+    out = np.zeros((mtx.shape[0],) + state.shape[1:], dtype=dtype)
+    return csr_matvec_add(mtx, state, out, num_threads)
+
+
+def threaded_operator(mtx, num_threads=None):
+    """
+    CSR matrix as LinearOperator with multithreaded products (for scipy.sparse.linalg solvers).
+
+    Matrix is returned unchanged if it is not in CSR format or single thread is used.
+
+    :param mtx:
+        Sparse matrix.
+    :type mtx: csr_matrix
+
+    :param num_threads:
+        Number of threads (see set_num_threads if None).
+    :type num_threads: int
+
+    :return:
+        Operator.
+    :rtype: LinearOperator
+    """
+    if num_threads is None:
+        num_threads = _threads['num_threads']
+    if not isspmatrix_csr(mtx) or num_threads <= 1:
+        return mtx
+
+    def matvec(vec):
+        return csr_matvec(mtx, np.ravel(vec), num_threads)
+
+    def matmat(block):
+        return csr_matvec(mtx, block, num_threads)
+
+    def rmatvec(vec):
+        return mtx.conj().T @ np.ravel(vec)
+
+    return LinearOperator(mtx.shape, matvec=matvec, matmat=matmat, rmatvec=rmatvec, dtype=mtx.dtype)
@@ -0,0 +1,1109 @@
+from scipy.integrate import solve_ivp
+from scipy.linalg import expm
+from scipy import integrate
+from scipy.sparse import identity, csr_matrix, coo_matrix, isspmatrix_csr
+from oqspy.parallel import csr_matvec, csr_matvec_add
+from oqspy.basis import hermitian_basis
+from oqspy.driving import vectorize_driving, tabulate_driving
+import numpy as np
+
+
+def lindbladian_rhs(lindbladian, driving_lindbladians=None, driving_functions=None, num_states=None):
+    """
+    Right-hand side of master equation d vec(rho) / dt = (L_0 + sum_k f_k(t) L_k) vec(rho).
+
+    For CSR Lindbladians products are accumulated without temporaries (see DrivenGenerator).
+    Products with single-precision Lindbladians are computed in single precision, states and results stay in double.
+    Block of states is passed to rhs as flattened row-major array of size sys_size^2 x num_states,
+    so each sparse matrix is read once per evaluation for all states (sparse x dense block product).
+
+    :param lindbladian:
+        Lindbladian (CSR format, LinearOperator, DrivenGenerator or BatchedGenerator).
+    :type lindbladian: csr_matrix
+
+    :param driving_lindbladians:
+        List of driving Lindbladians (CSR format or LinearOperator).
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param num_states:
+        Number of states in block (single vec(rho) if None).
+    :type num_states: int
+
+    :return:
+        Function rhs(time, state).
+    :rtype: function
+    """
+    if isinstance(lindbladian, (DrivenGenerator, BatchedGenerator)):
+        rhs = lindbladian.rhs(driving_functions)
+    elif not driving_lindbladians and isspmatrix_csr(lindbladian):
+        def rhs(time, state):
+            return csr_matvec(lindbladian, state)
+    elif not driving_lindbladians:
+        def rhs(time, state):
+            return lindbladian @ state
+    elif isspmatrix_csr(lindbladian) and all(isspmatrix_csr(mtx) for mtx in driving_lindbladians):
+        rhs = DrivenGenerator(lindbladian, driving_lindbladians).rhs(driving_functions)
+    else:
+        terms = list(zip(driving_functions, driving_lindbladians))
+
+        def rhs(time, state):
+            res = lindbladian @ state
+            for function, driving_lindbladian in terms:
+                res += function(time) * (driving_lindbladian @ state)
+            return res
+    if _is_single(lindbladian, *(driving_lindbladians or [])):
+        rhs = _single_rhs(rhs, np.result_type(lindbladian.dtype, *[mtx.dtype for mtx in driving_lindbladians or []]))
+    if num_states is None:
+        return rhs
+    shape = (lindbladian.shape[0], num_states)
+
+    def block_rhs(time, state):
+        return rhs(time, state.reshape(shape)).ravel()
+
+    return block_rhs
+
+
+def _single_rhs(rhs, dtype):
+    # Double-precision state is rounded to data type of operators for products, result is returned in double precision
+    def single_rhs(time, state):
+        return rhs(time, state.astype(dtype)).astype(state.dtype)
+
+    return single_rhs
+
+
+def _canonical_csr(mtx):
+    mtx = csr_matrix(mtx)
+    if not mtx.has_canonical_format:
+        mtx = mtx.copy()
+        mtx.sum_duplicates()
+    return mtx
+
+
+class DrivenGenerator:
+    """
+    Time-dependent generator L(t) = L_0 + sum_k f_k(t) L_k on merged sparsity pattern.
+
+    CSR matrix with union pattern of all terms is built once. L_0 data is aligned to it,
+    and data of all L_k are aligned to entries of merged data array touched by driving,
+    so evaluation of L(t) rewrites these entries in place without allocation or index sorting.
+    Fused matvec computes L(t) x term by term without forming L(t), which is cheaper
+    when driving terms are much sparser than L_0 (scattered writes are avoided).
+    """
+
+    def __init__(self, lindbladian, driving_lindbladians):
+        """
+        :param lindbladian:
+            Lindbladian L_0 (CSR format).
+        :type lindbladian: csr_matrix
+
+        :param driving_lindbladians:
+            List of driving Lindbladians L_k (CSR format).
+        :type driving_lindbladians: list
+        """
+        terms = [_canonical_csr(lindbladian)] + [_canonical_csr(mtx) for mtx in driving_lindbladians]
+        self.shape = terms[0].shape
+        if not all(mtx.shape == self.shape for mtx in terms):
+            raise ValueError('Driving lindbladians must have the same shape as lindbladian.')
+        self.dtype = np.result_type(*[mtx.dtype for mtx in terms])
+        self.num_terms = len(terms) - 1
+
+        num_rows, num_cols = self.shape
+        term_keys = []
+        for mtx in terms:
+            rows = np.repeat(np.arange(num_rows, dtype=np.int64), np.diff(mtx.indptr))
+            term_keys.append(rows * num_cols + mtx.indices)
+        keys = np.unique(np.concatenate(term_keys))
+        index_dtype = np.int32 if max(keys.size, num_cols) < np.iinfo(np.int32).max else np.int64
+        indices = (keys % num_cols).astype(index_dtype)
+        indptr = np.searchsorted(keys // num_cols, np.arange(num_rows + 1)).astype(index_dtype)
+
+        # Positions of nonzeros of every term in merged data array (terms are in canonical format)
+        positions = [np.searchsorted(keys, term_key) for term_key in term_keys]
+        self.base_data = np.zeros(keys.size, dtype=self.dtype)
+        self.base_data[positions[0]] = terms[0].data
+        self.positions = positions[1:]
+        self.term_data = [mtx.data.astype(self.dtype, copy=False) for mtx in terms[1:]]
+        self.matrix = csr_matrix((self.base_data.copy(), indices, indptr), shape=self.shape)
+        # Only entries touched by driving terms differ from L_0: their L_0 values and data of all
+        # driving terms aligned to them (columns) give these entries by one product with driving values
+        if self.positions:
+            self.driving_positions = np.unique(np.concatenate(self.positions))
+        else:
+            self.driving_positions = np.zeros(0, dtype=np.intp)
+        self.driving_base = self.base_data[self.driving_positions]
+        self.driving_weights = np.zeros((self.driving_positions.size, self.num_terms), dtype=self.dtype)
+        for term_id, (positions_k, data_k) in enumerate(zip(self.positions, self.term_data)):
+            self.driving_weights[np.searchsorted(self.driving_positions, positions_k), term_id] = data_k
+
+        self.terms = [csr_matrix((mtx.data.astype(self.dtype, copy=False), mtx.indices, mtx.indptr), shape=self.shape)
+                      for mtx in terms]
+        self.__values = np.zeros(self.num_terms, dtype=self.dtype)
+        self.__driving_data = np.empty(self.driving_positions.size, dtype=self.dtype)
+        self.__state = np.empty(num_cols, dtype=self.dtype)
+
+    @property
+    def nnz(self):
+        """
+        Number of nonzeros of merged pattern.
+        """
+        return self.matrix.nnz
+
+    def evaluate(self, values):
+        """
+        L_0 + sum_k values[k] L_k written in place to data of merged matrix.
+
+        Only entries in patterns of driving terms are rewritten.
+
+        :param values:
+            Values of driving functions.
+        :type values: list
+
+        :return:
+            Merged matrix (CSR format), overwritten by next evaluation.
+        :rtype: csr_matrix
+        """
+        if self.num_terms > 0:
+            self.__values[:] = values
+            np.dot(self.driving_weights, self.__values, out=self.__driving_data)
+            self.__driving_data += self.driving_base
+            np.put(self.matrix.data, self.driving_positions, self.__driving_data)
+        return self.matrix
+
+    def matvec(self, state, values, out=None, fused=False):
+        """
+        (L_0 + sum_k values[k] L_k) applied to vector.
+
+        :param state:
+            Vector of size sys_size^2 or block of vectors (sys_size^2 x m).
+        :type state: numpy.ndarray
+
+        :param values:
+            Values of driving functions.
+        :type values: list
+
+        :param out:
+            Output array of the same shape as state (allocated if None).
+        :type out: numpy.ndarray
+
+        :param fused:
+            Accumulate products of individual terms instead of evaluating merged matrix.
+            Ignored for blocks: merged matrix is read once for all columns.
+        :type fused: bool
+
+        :return:
+            Product.
+        :rtype: numpy.ndarray
+        """
+        state = np.ascontiguousarray(state, dtype=self.dtype)
+        if out is None:
+            out = np.zeros((self.shape[0],) + state.shape[1:], dtype=self.dtype)
+        else:
+            out.fill(0.0)
+        if fused and state.ndim == 1:
+            # csr_matvec accumulates y += A x without temporaries
+            _csr_matvec_add(self.terms[0], state, out)
+            for value, term in zip(values, self.terms[1:]):
+                if value != 0.0:
+                    np.multiply(state, value, out=self.__state)
+                    _csr_matvec_add(term, self.__state, out)
+        else:
+            _csr_matvec_add(self.evaluate(values), state, out)
+        return out
+
+    def rhs(self, driving_functions, fused=True):
+        """
+        Right-hand side rhs(time, state) of master equation with given driving functions.
+        """
+        if len(driving_functions) != self.num_terms:
+            raise ValueError('Wrong number of driving functions.')
+        values = np.zeros(self.num_terms, dtype=self.dtype)
+
+        def rhs(time, state):
+            for term_id, function in enumerate(driving_functions):
+                values[term_id] = function(time)
+            return self.matvec(state, values, fused=fused)
+
+        return rhs
+
+
+class BatchedGenerator:
+    """
+    Family of generators L_j(t) = L_0 + sum_k f_k(t) w_kj L_k for p parameter points sharing the same terms.
+
+    Column j of propagated block belongs to parameter point j. Every term is applied once per evaluation
+    to the whole sys_size^2 x p block and its product is scaled column-wise by per-point weights,
+    so p operators are never built and p integrations run as one.
+    Terms without time dependence (e.g. dissipators in sweeps over dissipation rates) have driving function None.
+    """
+
+    def __init__(self, lindbladian, terms, weights):
+        """
+        :param lindbladian:
+            Common part L_0 (CSR format).
+        :type lindbladian: csr_matrix
+
+        :param terms:
+            List of terms L_k (CSR format).
+        :type terms: list
+
+        :param weights:
+            Weights w_kj of terms for parameter points (len(terms) x p).
+        :type weights: numpy.ndarray
+        """
+        self.lindbladian = _canonical_csr(lindbladian)
+        self.terms = [_canonical_csr(mtx) for mtx in terms]
+        self.shape = self.lindbladian.shape
+        if not all(mtx.shape == self.shape for mtx in self.terms):
+            raise ValueError('Terms must have the same shape as lindbladian.')
+        self.dtype = np.result_type(self.lindbladian.dtype, *[mtx.dtype for mtx in self.terms])
+        self.lindbladian = self.lindbladian.astype(self.dtype, copy=False)
+        self.terms = [mtx.astype(self.dtype, copy=False) for mtx in self.terms]
+        self.weights = np.atleast_2d(np.asarray(weights, dtype=self.dtype))
+        if self.weights.ndim != 2 or self.weights.shape[0] != len(self.terms):
+            raise ValueError('weights must have one row per term.')
+        self.num_terms, self.num_points = self.weights.shape
+        self.__product = np.empty((self.shape[0], self.num_points), dtype=self.dtype)
+        self.__scales = np.empty(self.num_points, dtype=self.dtype)
+
+    def matvec(self, block, values, out=None):
+        """
+        Columns of block multiplied by generators of their parameter points.
+
+        :param block:
+            Block of vectors (sys_size^2 x p).
+        :type block: numpy.ndarray
+
+        :param values:
+            Values of driving functions of terms.
+        :type values: list
+
+        :param out:
+            Output array (allocated if None).
+        :type out: numpy.ndarray
+
+        :return:
+            Product.
+        :rtype: numpy.ndarray
+        """
+        block = np.ascontiguousarray(block, dtype=self.dtype)
+        if block.shape != (self.shape[1], self.num_points):
+            raise ValueError('block must have one column per parameter point.')
+        if out is None:
+            out = np.zeros(block.shape, dtype=self.dtype)
+        else:
+            out.fill(0.0)
+        _csr_matvec_add(self.lindbladian, block, out)
+        for term_id, term in enumerate(self.terms):
+            np.multiply(self.weights[term_id], values[term_id], out=self.__scales)
+            self.__product.fill(0.0)
+            _csr_matvec_add(term, block, self.__product)
+            self.__product *= self.__scales
+            out += self.__product
+        return out
+
+    def rhs(self, driving_functions=None):
+        """
+        Right-hand side rhs(time, block) with given driving functions of terms (None is constant 1).
+        """
+        if driving_functions is None:
+            driving_functions = [None] * self.num_terms
+        if len(driving_functions) != self.num_terms:
+            raise ValueError('Wrong number of driving functions.')
+        values = np.ones(self.num_terms, dtype=self.dtype)
+
+        def rhs(time, block):
+            for term_id, function in enumerate(driving_functions):
+                if function is not None:
+                    values[term_id] = function(time)
+            return self.matvec(block, values)
+
+        return rhs
+
+
+_single_dtypes = [np.dtype(np.float32), np.dtype(np.complex64)]
+
+# Products with single-precision operators are accurate to about 1e-7 relative to state,
+# local errors below that cannot be resolved and adaptive steps stall
+_single_rtol = 1.0e-6
+_single_atol = 1.0e-8
+
+
+def _is_single(*operators):
+    return any(op.dtype in _single_dtypes for op in operators if op is not None)
+
+
+def _tolerances(rtol, atol, *operators):
+    """
+    Tolerances of propagation limited to accuracy of single-precision operators.
+    """
+    if _is_single(*operators):
+        return max(rtol, _single_rtol), max(atol, _single_atol)
+    return rtol, atol
+
+
+def _double_precision(mtx):
+    """
+    Double-precision copy of single-precision CSR matrix (used by exponential integrators).
+    """
+    if isspmatrix_csr(mtx) and mtx.dtype in _single_dtypes:
+        return mtx.astype(np.result_type(mtx.dtype, np.float64))
+    return mtx
+
+
+def _state_dtype(state, *operators):
+    """
+    Double precision dtype of propagated states: real if all operators are real (Hermitian basis, see oqspy.basis).
+
+    States of single-precision operators are kept in double precision as well,
+    only products with operators are computed in single precision.
+    """
+    operators = [op for op in operators if op is not None]
+    dtype = np.result_type(np.float64, *[op.dtype for op in operators])
+    if np.iscomplexobj(state) and not np.issubdtype(dtype, np.complexfloating):
+        raise ValueError('state must be real for real (Hermitian basis) generator.')
+    return np.result_type(dtype, np.asarray(state).dtype)
+
+
+def _csr_matvec_add(mtx, state, out):
+    # Row-major blocks: every nonzero of mtx is read once for all columns
+    csr_matvec_add(mtx, state, out)
+
+
+def propagate(lindbladian, state, time_start, time_finish, driving_lindbladians=None, driving_functions=None,
+              method='DOP853', rtol=1.0e-10, atol=1.0e-12, max_step=np.inf):
+    """
+    Propagation of vec(rho) from time_start to time_finish.
+
+    :param lindbladian:
+        Lindbladian (CSR format or LinearOperator) or BatchedGenerator (state is then block with column per parameter point).
+    :type lindbladian: csr_matrix
+
+    :param state:
+        Initial vec(rho) (column-major) or block of m initial states (sys_size^2 x m),
+        which are propagated together with common steps (see lindbladian_rhs);
+        local error is then controlled in norm over the whole block.
+    :type state: numpy.ndarray
+
+    :param time_start:
+        Initial time.
+    :type time_start: float
+
+    :param time_finish:
+        Final time.
+    :type time_finish: float
+
+    :param driving_lindbladians:
+        List of driving Lindbladians (CSR format or LinearOperator).
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param method:
+        Integration method of scipy.integrate.solve_ivp or 'CFM4' (commutator-free Magnus, see MagnusPropagator).
+    :type method: str
+
+    :param rtol:
+        Relative tolerance (at least 1e-6 for single-precision Lindbladians).
+    :type rtol: float
+
+    :param atol:
+        Absolute tolerance (at least 1e-8 for single-precision Lindbladians).
+    :type atol: float
+
+    :param max_step:
+        Maximum integration step.
+    :type max_step: float
+
+    :return:
+        vec(rho) (or block of states) at time_finish.
+    :rtype: numpy.ndarray
+    """
+    state = np.asarray(state, dtype=_state_dtype(state, lindbladian, *(driving_lindbladians or [])))
+    rtol, atol = _tolerances(rtol, atol, lindbladian, *(driving_lindbladians or []))
+    if time_finish == time_start:
+        return state.copy()
+    if method == 'CFM4':
+        propagator = MagnusPropagator(lindbladian, driving_lindbladians, driving_functions, rtol=rtol, atol=atol,
+                                      max_step=max_step)
+        return propagator.propagate(state, time_start, time_finish)
+    num_states = state.shape[1] if state.ndim == 2 else None
+    rhs = lindbladian_rhs(lindbladian, driving_lindbladians, driving_functions, num_states)
+    sol = solve_ivp(rhs, (time_start, time_finish), state.ravel(), method=method, rtol=rtol, atol=atol,
+                    max_step=max_step, t_eval=[time_finish])
+    if not sol.success:
+        raise RuntimeError('Propagation failed: ' + sol.message)
+    return sol.y[:, -1].reshape(state.shape)
+
+
+def observable_weights(observables, sys_size):
+    """
+    Weight vectors vec(A^T) of observables, so that Tr(A rho) = vec(A^T) . vec(rho).
+
+    :param observables:
+        List of observables (sys_size x sys_size, sparse or dense).
+    :type observables: list
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :return:
+        Weights matrix (CSR format) of size len(observables) x sys_size^2.
+    :rtype: csr_matrix
+    """
+    rows = []
+    cols = []
+    vals = []
+    for obs_id, obs in enumerate(observables):
+        if obs.shape != (sys_size, sys_size):
+            raise ValueError('Incorrect size of observable.')
+        obs = coo_matrix(obs)
+        rows.append(np.full(obs.nnz, obs_id, dtype=np.int64))
+        cols.append(obs.row.astype(np.int64) * sys_size + obs.col)
+        vals.append(obs.data.astype(np.complex128))
+    if not observables:
+        return csr_matrix((0, sys_size * sys_size), dtype=np.complex128)
+    return csr_matrix(
+        (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(observables), sys_size * sys_size)
+    )
+
+
+def iter_propagate(lindbladian, state, times, driving_lindbladians=None, driving_functions=None,
+                   method='DOP853', rtol=1.0e-10, atol=1.0e-12, max_step=np.inf):
+    """
+    Generator of (time, vec(rho)) at output times.
+
+    Integration is continuous across output times, states between integrator steps
+    are obtained by dense output of the current step only, so memory does not depend on number of output times.
+    Yielded array must be copied if it is kept.
+
+    :param lindbladian:
+        Lindbladian (CSR format or LinearOperator) or BatchedGenerator (state is then block with column per parameter point).
+    :type lindbladian: csr_matrix
+
+    :param state:
+        Initial vec(rho) (column-major) at times[0] or block of m initial states (sys_size^2 x m).
+        Block is yielded with the same shape, column per state.
+    :type state: numpy.ndarray
+
+    :param times:
+        Increasing output times.
+    :type times: numpy.ndarray
+
+    :param driving_lindbladians:
+        List of driving Lindbladians (CSR format or LinearOperator).
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param method:
+        Explicit Runge-Kutta method of scipy.integrate ('RK23', 'RK45' or 'DOP853')
+        or commutator-free Magnus method 'CFM4' (see MagnusPropagator).
+    :type method: str
+
+    :param rtol:
+        Relative tolerance (at least 1e-6 for single-precision Lindbladians).
+    :type rtol: float
+
+    :param atol:
+        Absolute tolerance (at least 1e-8 for single-precision Lindbladians).
+    :type atol: float
+
+    :param max_step:
+        Maximum integration step.
+    :type max_step: float
+    """
+    if method not in ['RK23', 'RK45', 'DOP853', 'CFM4']:
+        raise ValueError('Unknown propagation method.')
+    times = np.asarray(times, dtype=np.float64)
+    if times.ndim != 1 or times.size < 1 or np.any(np.diff(times) <= 0.0):
+        raise ValueError('times must be increasing one-dimensional array.')
+    state = np.asarray(state, dtype=_state_dtype(state, lindbladian, *(driving_lindbladians or [])))
+    rtol, atol = _tolerances(rtol, atol, lindbladian, *(driving_lindbladians or []))
+
+    if method == 'CFM4':
+        propagator = MagnusPropagator(lindbladian, driving_lindbladians, driving_functions, rtol=rtol, atol=atol,
+                                      max_step=max_step)
+        yield from propagator.iter_propagate(state, times)
+        return
+
+    yield times[0], state
+    if times.size == 1:
+        return
+
+    shape = state.shape
+    rhs = lindbladian_rhs(lindbladian, driving_lindbladians, driving_functions, shape[1] if state.ndim == 2 else None)
+    solver = getattr(integrate, method)(rhs, times[0], state.ravel(), times[-1], rtol=rtol, atol=atol, max_step=max_step)
+    time_id = 1
+    while time_id < times.size:
+        message = solver.step()
+        if solver.status == 'failed':
+            raise RuntimeError('Propagation failed: ' + str(message))
+        if times[time_id] <= solver.t:
+            interpolant = solver.dense_output()
+            while time_id < times.size and times[time_id] <= solver.t:
+                if times[time_id] == solver.t:
+                    yield times[time_id], solver.y.reshape(shape)
+                else:
+                    yield times[time_id], interpolant(times[time_id]).reshape(shape)
+                time_id += 1
+
+
+def propagate_observables(lindbladian, state, times, observables, driving_lindbladians=None, driving_functions=None,
+                          callback=None, out=None, basis='vec', **kwargs):
+    """
+    Expectation values of observables along propagation, computed on the fly.
+
+    Only current state is kept, expectation values Tr(A rho) are single products with precomputed
+    weights vec(A^T). Results are written row by row to NumPy memmap (.npy file) if out is specified.
+
+    :param lindbladian:
+        Lindbladian (CSR format or LinearOperator).
+    :type lindbladian: csr_matrix
+
+    :param state:
+        Initial vec(rho) (column-major) at times[0].
+    :type state: numpy.ndarray
+
+    :param times:
+        Increasing output times.
+    :type times: numpy.ndarray
+
+    :param observables:
+        List of observables (sys_size x sys_size).
+    :type observables: list
+
+    :param driving_lindbladians:
+        List of driving Lindbladians.
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param callback:
+        Function callback(time_id, time, values, state) called at every output time.
+    :type callback: function
+
+    :param out:
+        Path of .npy file for results.
+    :type out: str
+
+    :param basis:
+        Coordinates of states: 'vec' (vec(rho)) or 'hermitian' (see oqspy.basis.hermitian_basis).
+    :type basis: str
+
+    :param kwargs:
+        Additional arguments of iter_propagate.
+
+    :return:
+        Array (or memmap) of expectation values of shape (len(times), len(observables)).
+    :rtype: numpy.ndarray
+    """
+    sys_size = int(round(np.sqrt(lindbladian.shape[0])))
+    weights = observable_weights(observables, sys_size)
+    if basis == 'hermitian':
+        weights = (weights @ hermitian_basis(sys_size)).tocsr()
+    elif basis != 'vec':
+        raise ValueError('basis must be \'vec\' or \'hermitian\'.')
+    times = np.asarray(times, dtype=np.float64)
+    shape = (times.size, len(observables))
+    if out is None:
+        results = np.zeros(shape, dtype=np.complex128)
+    else:
+        results = np.lib.format.open_memmap(out, mode='w+', dtype=np.complex128, shape=shape)
+
+    for time_id, (time, curr_state) in enumerate(iter_propagate(lindbladian, state, times, driving_lindbladians,
+                                                                driving_functions, **kwargs)):
+        values = weights @ curr_state
+        results[time_id, :] = values
+        if callback is not None:
+            callback(time_id, time, values, curr_state)
+    if out is not None:
+        results.flush()
+    return results
+
+
+# Largest t * ||A||_1 for which truncated Taylor series of order m is accurate to double precision
+# (Al-Mohy & Higham, SIAM J. Sci. Comput. 33, 488 (2011), Table 3.1).
+_theta = {
+    1: 2.29e-16, 2: 2.58e-8, 3: 1.39e-5, 4: 3.40e-4, 5: 2.40e-3,
+    6: 9.07e-3, 7: 2.38e-2, 8: 5.00e-2, 9: 8.96e-2, 10: 1.44e-1,
+    11: 2.14e-1, 12: 3.00e-1, 13: 4.00e-1, 14: 5.14e-1, 15: 6.41e-1,
+    16: 7.81e-1, 17: 9.31e-1, 18: 1.09, 19: 1.26, 20: 1.44,
+    21: 1.62, 22: 1.82, 23: 2.01, 24: 2.22, 25: 2.43,
+    26: 2.64, 27: 2.86, 28: 3.08, 29: 3.31, 30: 3.54,
+    35: 4.7, 40: 6.0, 45: 7.2, 50: 8.5, 55: 9.9,
+}
+
+
+class ExpmAction:
+    """
+    Action of exp(time * generator) on vectors or blocks with precomputed Taylor parameters.
+
+    Shift, 1-norm, number of scaling steps s and Taylor degree m are computed once,
+    every application then costs at most s * m sparse products.
+    """
+
+    def __init__(self, generator, time, tol=2.0 ** -53):
+        """
+        :param generator:
+            Generator (CSR format).
+        :type generator: csr_matrix
+
+        :param time:
+            Propagation time.
+        :type time: float
+
+        :param tol:
+            Truncation tolerance of Taylor series.
+        :type tol: float
+        """
+        generator = _double_precision(generator)
+        size = generator.shape[0]
+        self.time = time
+        self.tol = tol
+        self.mu = generator.diagonal().sum() / float(size)
+        self.generator = (generator - self.mu * identity(size, dtype=generator.dtype, format='csr')).tocsr()
+
+        norm = abs(time) * _one_norm(self.generator)
+        if norm == 0.0:
+            self.m, self.s = 0, 1
+        else:
+            best = None
+            for m, theta in _theta.items():
+                s = int(np.ceil(norm / theta))
+                if best is None or m * s < best[0] * best[1]:
+                    best = (m, s)
+            self.m, self.s = best
+        self.eta = np.exp(self.time * self.mu / float(self.s))
+
+    def num_products(self):
+        """
+        Upper bound of sparse products per application.
+        """
+        return self.m * self.s
+
+    def apply(self, state):
+        """
+        exp(time * generator) applied to state.
+
+        :param state:
+            Vector or block of column vectors.
+        :type state: numpy.ndarray
+
+        :return:
+            Propagated state.
+        :rtype: numpy.ndarray
+        """
+        res = np.array(state, dtype=np.result_type(state, self.generator.dtype, self.eta))
+        if self.m == 0:
+            return self.eta * res
+        term = res
+        coeff_base = self.time / float(self.s)
+        for _ in range(self.s):
+            norm_prev = _inf_norm(term)
+            for j in range(self.m):
+                term = (coeff_base / float(j + 1)) * csr_matvec(self.generator, term)
+                norm_curr = _inf_norm(term)
+                res += term
+                if norm_prev + norm_curr <= self.tol * _inf_norm(res):
+                    break
+                norm_prev = norm_curr
+            res *= self.eta
+            term = res.copy()
+        return res
+
+
+def krylov_expm_action(generator, time, state, tol=1.0e-10, max_dim=30):
+    """
+    Action exp(time * generator) state by Arnoldi (Krylov) projection with adaptive sub-stepping.
+
+    Krylov subspace of dimension up to max_dim is built from current vector, small projected exponential
+    is computed densely. If a posteriori error estimate exceeds tol * ||state||, sub-step is halved
+    (reusing the same basis), so cost grows slowly with ||time * generator|| for dissipative generators.
+
+    :param generator:
+        Generator (CSR format or LinearOperator).
+    :type generator: csr_matrix
+
+    :param time:
+        Propagation time.
+    :type time: float
+
+    :param state:
+        Vector.
+    :type state: numpy.ndarray
+
+    :param tol:
+        Relative tolerance of each sub-step.
+    :type tol: float
+
+    :param max_dim:
+        Maximum dimension of Krylov subspace.
+    :type max_dim: int
+
+    :return:
+        Propagated vector and number of products with generator.
+    :rtype: tuple
+    """
+    generator = _double_precision(generator)
+    size = state.shape[0]
+    state = np.array(state, dtype=_state_dtype(state, generator))
+    basis = np.empty((max_dim + 1, size), dtype=state.dtype)
+    hessenberg = np.zeros((max_dim + 1, max_dim), dtype=state.dtype)
+    num_products = 0
+    remaining = time
+    sub_step = time
+    while remaining > 0.0:
+        beta = np.linalg.norm(state)
+        if beta == 0.0:
+            break
+        basis[0] = state / beta
+        hessenberg.fill(0.0)
+        dim = max_dim
+        breakdown = False
+        sub_step = min(sub_step, remaining)
+        for j in range(max_dim):
+            vec = csr_matvec(generator, basis[j]) if isspmatrix_csr(generator) else generator @ basis[j]
+            num_products += 1
+            # Classical Gram-Schmidt with reorthogonalization
+            for _ in range(2):
+                coeffs = basis[:j + 1].conj() @ vec
+                vec -= coeffs @ basis[:j + 1]
+                hessenberg[:j + 1, j] += coeffs
+            hessenberg[j + 1, j] = np.linalg.norm(vec)
+            if hessenberg[j + 1, j].real <= 1.0e-14 * beta * max(1.0, np.abs(hessenberg[:j + 1, j]).max()):
+                dim = j + 1
+                breakdown = True
+                break
+            basis[j + 1] = vec / hessenberg[j + 1, j].real
+            if j >= 3:
+                small = expm(sub_step * hessenberg[:j + 1, :j + 1])
+                error = beta * abs(hessenberg[j + 1, j]) * sub_step * abs(small[j, 0])
+                if error <= tol * beta:
+                    dim = j + 1
+                    break
+        while True:
+            small = expm(sub_step * hessenberg[:dim, :dim])
+            error = 0.0 if breakdown else beta * abs(hessenberg[dim, dim - 1]) * sub_step * abs(small[dim - 1, 0])
+            if error <= tol * beta:
+                break
+            sub_step *= 0.5
+        state = beta * (small[:, 0] @ basis[:dim])
+        remaining -= sub_step
+        if remaining <= 1.0e-14 * abs(time):
+            break
+        if dim < max_dim:
+            sub_step *= 2.0
+    return state, num_products
+
+
+def _one_norm(mtx):
+    return float(np.max(np.asarray(abs(mtx).sum(axis=0)))) if mtx.nnz > 0 else 0.0
+
+
+def _inf_norm(array):
+    return float(np.max(np.abs(array))) if array.size > 0 else 0.0
+
+
+def piecewise_segments(driving_functions):
+    """
+    Common constant segments of piecewise-constant driving functions within one period.
+
+    Driving function is considered piecewise-constant if it has attribute 'segments'
+    with increasing segment boundaries [0.0, ..., period].
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :return:
+        Period and list of (duration, [values of driving functions]) or None if any function is not piecewise-constant.
+    :rtype: tuple
+    """
+    if not driving_functions or not all(hasattr(f, 'segments') for f in driving_functions):
+        return None
+    period = driving_functions[0].segments[-1]
+    if not all(np.isclose(f.segments[-1], period) for f in driving_functions):
+        return None
+    boundaries = np.unique(np.concatenate([np.asarray(f.segments, dtype=np.float64) for f in driving_functions]))
+    boundaries = boundaries[boundaries <= period]
+    begins, ends = boundaries[:-1], boundaries[1:]
+    keep = ~np.isclose(begins, ends)
+    begins, ends = begins[keep], ends[keep]
+    # Values at all segment midpoints are computed by one call of every (vectorized) driving function
+    table = tabulate_driving(driving_functions, 0.5 * (begins + ends))
+    segments = [(end - begin, [float(value) for value in table[:, seg_id]]) for seg_id, (begin, end) in enumerate(zip(begins, ends))]
+    return period, segments
+
+
+class PiecewiseConstantPropagator:
+    """
+    Exact propagation of OQS with piecewise-constant periodic driving.
+
+    On each constant segment generator L_0 + sum_k v_k L_k does not depend on time,
+    so one period is a product of cached matrix exponential actions.
+    """
+
+    def __init__(self, lindbladian, driving_lindbladians, segments):
+        """
+        :param lindbladian:
+            Lindbladian (CSR format).
+        :type lindbladian: csr_matrix
+
+        :param driving_lindbladians:
+            List of driving Lindbladians (CSR format).
+        :type driving_lindbladians: list
+
+        :param segments:
+            List of (duration, [values of driving functions]) covering one period.
+        :type segments: list
+        """
+        if not segments:
+            raise ValueError('segments must be non-empty list.')
+        self.actions = []
+        merged = DrivenGenerator(lindbladian, driving_lindbladians)
+        for duration, values in segments:
+            if duration <= 0.0:
+                raise ValueError('Segment duration must be positive.')
+            if len(values) != len(driving_lindbladians):
+                raise ValueError('Wrong number of driving values in segment.')
+            self.actions.append(ExpmAction(merged.evaluate(values).copy(), duration))
+        self.dtype = merged.dtype
+        self.period = float(sum(duration for duration, _ in segments))
+
+    def num_products_per_period(self):
+        """
+        Upper bound of sparse products per period.
+        """
+        return sum(action.num_products() for action in self.actions)
+
+    def propagate(self, state, num_periods=1, return_all=False):
+        """
+        Propagation of vec(rho) (or block of states) over several periods.
+
+        :param state:
+            Initial vec(rho) at phase 0.
+        :type state: numpy.ndarray
+
+        :param num_periods:
+            Number of periods.
+        :type num_periods: int
+
+        :param return_all:
+            Return states after every period.
+        :type return_all: bool
+
+        :return:
+            State after num_periods or list of states after each period.
+        :rtype: numpy.ndarray
+        """
+        if not isinstance(num_periods, int) or num_periods < 0:
+            raise ValueError('num_periods must be non-negative integer.')
+        states = []
+        state = np.asarray(state, dtype=_state_dtype(state, self))
+        for _ in range(num_periods):
+            for action in self.actions:
+                state = action.apply(state)
+            if return_all:
+                states.append(state)
+        return states if return_all else state
+
+
+# Commutator-free Magnus integrator of order 4 with two exponentials (Blanes & Moan, Appl. Numer. Math. 56, 1519 (2006)):
+# Gauss-Legendre nodes and weights of exponentials exp(h (a_1 L(t + c_1 h) + a_2 L(t + c_2 h)))
+_cfm4_nodes = (0.5 - np.sqrt(3.0) / 6.0, 0.5 + np.sqrt(3.0) / 6.0)
+_cfm4_weights = ((3.0 + 2.0 * np.sqrt(3.0)) / 12.0, (3.0 - 2.0 * np.sqrt(3.0)) / 12.0)
+
+
+class MagnusPropagator:
+    """
+    Adaptive commutator-free Magnus propagator of order 4 (CFM4) for smoothly driven OQS.
+
+    Each step is a product of two exponential actions of generators L_0 / 2 + sum_k w_k L_k
+    evaluated in place on merged pattern (DrivenGenerator) and applied by Krylov projection (krylov_expm_action).
+    Local error is estimated by step doubling, step size is controlled as in embedded Runge-Kutta methods,
+    and more accurate (two half-steps) solution is kept. Steps are not limited by explicit stability,
+    so they can be a sizeable fraction of driving period. Steps end at boundaries of piecewise driving
+    functions (attribute 'segments'), where Magnus expansion is not valid.
+    """
+
+    def __init__(self, lindbladian, driving_lindbladians=None, driving_functions=None, rtol=1.0e-8, atol=1.0e-10,
+                 first_step=None, max_step=np.inf):
+        """
+        :param lindbladian:
+            Lindbladian (CSR format) or DrivenGenerator.
+        :type lindbladian: csr_matrix
+
+        :param driving_lindbladians:
+            List of driving Lindbladians (CSR format).
+        :type driving_lindbladians: list
+
+        :param driving_functions:
+            List of driving functions.
+        :type driving_functions: list
+
+        :param rtol:
+            Relative tolerance of local error.
+        :type rtol: float
+
+        :param atol:
+            Absolute tolerance of local error.
+        :type atol: float
+
+        :param first_step:
+            Initial step size (1/10 of first interval if None).
+        :type first_step: float
+
+        :param max_step:
+            Maximum step size.
+        :type max_step: float
+        """
+        if isinstance(lindbladian, DrivenGenerator):
+            self.generator = lindbladian
+        elif isspmatrix_csr(lindbladian) and all(isspmatrix_csr(mtx) for mtx in (driving_lindbladians or [])):
+            self.generator = DrivenGenerator(lindbladian, driving_lindbladians or [])
+        else:
+            raise ValueError('CFM4 method requires Lindbladians in CSR format.')
+        if self.generator.dtype in _single_dtypes:
+            # Exponential actions are computed with double-precision copy of merged generator
+            terms = [_double_precision(mtx) for mtx in self.generator.terms]
+            self.generator = DrivenGenerator(terms[0], terms[1:])
+        # Both nodes of step are evaluated by one call of vectorized driving functions
+        self.driving_functions = [vectorize_driving(f) for f in driving_functions or []]
+        if len(self.driving_functions) != self.generator.num_terms:
+            raise ValueError('Wrong number of driving functions.')
+        if rtol <= 0.0 or atol < 0.0:
+            raise ValueError('Tolerances must be positive.')
+        self.rtol = rtol
+        self.atol = atol
+        self.step_size = first_step
+        self.max_step = max_step
+        self.num_steps = 0
+        self.num_rejected = 0
+        self.num_products = 0
+        # Discontinuities of piecewise driving (periodic 'segments' boundaries) are never stepped over
+        self.__boundaries = [np.asarray(f.segments, dtype=np.float64) for f in self.driving_functions if hasattr(f, 'segments')]
+
+    def __breakpoints(self, time_start, time_finish):
+        points = []
+        for boundaries in self.__boundaries:
+            period = boundaries[-1]
+            first = np.floor(time_start / period)
+            last = np.ceil(time_finish / period)
+            shifts = np.arange(first, last + 1.0)[:, None] * period
+            points.append((shifts + boundaries[None, :]).ravel())
+        if not points:
+            return []
+        points = np.unique(np.concatenate(points))
+        return list(points[(points > time_start) & (points < time_finish)])
+
+    def __exponential(self, table, weights, step, state):
+        # sum of weights is 1/2: generator is (L_0 + sum_k values_k L_k) / 2
+        values = table @ (2.0 * np.asarray(weights))
+        state, num_products = krylov_expm_action(
+            self.generator.evaluate(values), 0.5 * step, state, tol=min(self.rtol, 1.0e-3) * 1.0e-2
+        )
+        self.num_products += num_products
+        return state
+
+    def step(self, time, state, step):
+        """
+        One CFM4 step (without error control).
+
+        :param time:
+            Initial time.
+        :type time: float
+
+        :param state:
+            vec(rho) at time.
+        :type state: numpy.ndarray
+
+        :param step:
+            Step size.
+        :type step: float
+
+        :return:
+            vec(rho) at time + step.
+        :rtype: numpy.ndarray
+        """
+        table = tabulate_driving(self.driving_functions, time + step * np.asarray(_cfm4_nodes))
+        state = self.__exponential(table, _cfm4_weights, step, state)
+        return self.__exponential(table, _cfm4_weights[::-1], step, state)
+
+    def propagate(self, state, time_start, time_finish):
+        """
+        Adaptive propagation of vec(rho) from time_start to time_finish.
+
+        :param state:
+            Initial vec(rho) (column-major).
+        :type state: numpy.ndarray
+
+        :param time_start:
+            Initial time.
+        :type time_start: float
+
+        :param time_finish:
+            Final time.
+        :type time_finish: float
+
+        :return:
+            vec(rho) at time_finish.
+        :rtype: numpy.ndarray
+        """
+        state = np.asarray(state, dtype=_state_dtype(state, self.generator))
+        if state.ndim != 1:
+            raise ValueError('CFM4 method propagates single state only.')
+        if self.step_size is None:
+            self.step_size = min(self.max_step, 0.01 * (time_finish - time_start))
+        times = [time_start] + self.__breakpoints(time_start, time_finish) + [time_finish]
+        for begin, end in zip(times[:-1], times[1:]):
+            state = self.__advance(state, begin, end)
+        return state
+
+    def __advance(self, state, time, time_finish):
+        while time < time_finish:
+            step = min(self.step_size, self.max_step, time_finish - time)
+            truncated = step < min(self.step_size, self.max_step)
+            full = self.step(time, state, step)
+            half = self.step(time, state, 0.5 * step)
+            half = self.step(time + 0.5 * step, half, 0.5 * step)
+
+            # Richardson estimate of local error of half-step solution
+            scale = self.atol + self.rtol * np.maximum(np.abs(full), np.abs(half))
+            error = np.sqrt(np.mean(np.abs((half - full) / (15.0 * scale)) ** 2))
+            factor = 2.0 if error == 0.0 else min(2.0, max(0.2, 0.9 * error ** -0.2))
+            if error <= 1.0:
+                time = time_finish if step >= time_finish - time else time + step
+                state = half
+                self.num_steps += 1
+                # Step shortened to hit time_finish does not limit further steps
+                if not truncated or factor < 1.0:
+                    self.step_size = step * factor
+            else:
+                self.num_rejected += 1
+                self.step_size = step * factor
+        return state
+
+    def iter_propagate(self, state, times):
+        """
+        Generator of (time, vec(rho)) at output times, steps are shortened to hit output times.
+        """
+        times = np.asarray(times, dtype=np.float64)
+        if times.ndim != 1 or times.size < 1 or np.any(np.diff(times) <= 0.0):
+            raise ValueError('times must be increasing one-dimensional array.')
+        state = np.asarray(state, dtype=_state_dtype(state, self.generator))
+        yield times[0], state
+        for time_start, time_finish in zip(times[:-1], times[1:]):
+            state = self.propagate(state, time_start, time_finish)
+            yield time_finish, state
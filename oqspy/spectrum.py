@@ -0,0 +1,170 @@
+from scipy.sparse import csr_matrix, csc_matrix, identity
+from scipy.sparse.linalg import LinearOperator, splu, eigs
+import numpy as np
+import time
+
+
+class ShiftInvert:
+    """
+    Reusable sparse LU factorization of L - sigma * I for shift-invert Arnoldi.
+
+    Factorization is the expensive part of shift-invert eigensolver, so it can be kept
+    and passed to several liouvillian_spectrum calls (e.g. with different number of eigenvalues).
+    """
+
+    def __init__(self, lindbladian, sigma):
+        """
+        :param lindbladian:
+            Lindbladian (CSR format).
+        :type lindbladian: csr_matrix
+
+        :param sigma:
+            Shift.
+        :type sigma: complex
+        """
+        super_size = lindbladian.shape[0]
+        self.sigma = sigma
+        self.shape = lindbladian.shape
+        shifted = csr_matrix(lindbladian, dtype=np.complex128) - sigma * identity(super_size, dtype=np.complex128, format='csr')
+        self.lu = splu(csc_matrix(shifted))
+        self.num_solves = 0
+
+    def solve(self, vec):
+        """
+        (L - sigma * I)^-1 vec.
+        """
+        self.num_solves += 1
+        return self.lu.solve(np.asarray(vec, dtype=np.complex128))
+
+    @property
+    def operator(self):
+        """
+        (L - sigma * I)^-1 as LinearOperator (OPinv argument of scipy.sparse.linalg.eigs).
+        """
+        return LinearOperator(self.shape, matvec=self.solve, dtype=np.complex128)
+
+
+def default_shift(lindbladian):
+    """
+    Small positive real shift: all eigenvalues of Lindbladian have non-positive real part,
+    so L - sigma * I is non-singular and eigenvalues nearest to sigma are the ones nearest to zero.
+    """
+    scale = np.max(np.abs(lindbladian.diagonal()), initial=0.0)
+    return 1.0e-6 * scale if scale > 0.0 else 1.0e-6
+
+
+def liouvillian_spectrum(lindbladian, k=6, method=None, sigma=None, factorization=None, tol=0.0, maxiter=None,
+                         v0=None, return_modes=True):
+    """
+    Eigenvalues of Lindbladian nearest to zero (slowest relaxation modes).
+
+    'shift-invert' method runs ARPACK on (L - sigma * I)^-1 with sparse LU factorization (see ShiftInvert),
+    converging in few iterations. Eigenvalues are the ones nearest to sigma in modulus, so coherent
+    modes with large imaginary part may be missed if k is small.
+    Matrix-free 'arnoldi' method runs ARPACK on L itself for eigenvalues with largest real part:
+    no factorization is needed, but convergence is much slower.
+
+    :param lindbladian:
+        Lindbladian (CSR format) or matrix-free Lindbladian (LinearOperator, 'arnoldi' method only).
+    :type lindbladian: csr_matrix or LinearOperator
+
+    :param k:
+        Number of eigenvalues.
+    :type k: int
+
+    :param method:
+        'shift-invert' or 'arnoldi'. Selected by type of lindbladian if None.
+    :type method: str
+
+    :param sigma:
+        Shift of 'shift-invert' method (see default_shift if None).
+    :type sigma: complex
+
+    :param factorization:
+        Previously computed factorization (ShiftInvert) of the same Lindbladian to reuse.
+    :type factorization: ShiftInvert
+
+    :param tol:
+        Relative accuracy of eigenvalues (0 is machine precision).
+    :type tol: float
+
+    :param maxiter:
+        Maximum number of Arnoldi iterations.
+    :type maxiter: int
+
+    :param v0:
+        Starting vector of Arnoldi iterations.
+    :type v0: numpy.ndarray
+
+    :param return_modes:
+        Compute eigenvectors (vec(rho), column-major).
+    :type return_modes: bool
+
+    :return:
+        Eigenvalues sorted by decreasing real part, matrix of modes (columns, None if return_modes is False)
+        and dictionary with solver statistics ('method', 'sigma', 'factorization', 'num_solves',
+        'residuals', 'time_setup', 'time_solve').
+    :rtype: tuple
+    """
+    is_matrix_free = not isinstance(lindbladian, csr_matrix)
+    if method is None:
+        method = 'arnoldi' if is_matrix_free else 'shift-invert'
+    if method not in ['shift-invert', 'arnoldi']:
+        raise ValueError('Unknown spectrum method.')
+    if is_matrix_free and method == 'shift-invert':
+        raise ValueError('Shift-invert method requires lindbladian in CSR format.')
+    super_size = lindbladian.shape[0]
+    if not isinstance(k, int) or k <= 0 or k >= super_size - 1:
+        raise ValueError('k must be positive integer less than sys_size^2 - 1.')
+
+    info = {'method': method, 'sigma': None, 'factorization': None, 'num_solves': 0}
+    time_start = time.perf_counter()
+    if method == 'shift-invert':
+        if factorization is not None:
+            if factorization.shape != lindbladian.shape or (sigma is not None and sigma != factorization.sigma):
+                raise ValueError('factorization does not match lindbladian or sigma.')
+        else:
+            factorization = ShiftInvert(lindbladian, default_shift(lindbladian) if sigma is None else sigma)
+        info['sigma'] = factorization.sigma
+        info['factorization'] = factorization
+        num_solves = factorization.num_solves
+        info['time_setup'] = time.perf_counter() - time_start
+
+        time_start = time.perf_counter()
+        result = eigs(csr_matrix(lindbladian, dtype=np.complex128), k=k, sigma=factorization.sigma,
+                      OPinv=factorization.operator, tol=tol, maxiter=maxiter, v0=v0, return_eigenvectors=return_modes)
+        info['num_solves'] = factorization.num_solves - num_solves
+    else:
+        info['time_setup'] = time.perf_counter() - time_start
+        time_start = time.perf_counter()
+        result = eigs(lindbladian, k=k, which='LR', tol=tol, maxiter=maxiter, v0=v0, return_eigenvectors=return_modes)
+    info['time_solve'] = time.perf_counter() - time_start
+
+    eigenvalues, modes = result if return_modes else (result, None)
+    order = np.argsort(-eigenvalues.real, kind='stable')
+    eigenvalues = eigenvalues[order]
+    if modes is not None:
+        modes = modes[:, order]
+        residuals = lindbladian @ modes - modes * eigenvalues[np.newaxis, :]
+        info['residuals'] = np.linalg.norm(residuals, axis=0)
+    return eigenvalues, modes, info
+
+
+def spectral_gap(eigenvalues):
+    """
+    Liouvillian gap: minimal decay rate -Re(lambda) over eigenvalues except steady state
+    (eigenvalue with largest real part). Inverse of gap is asymptotic relaxation time.
+
+    :param eigenvalues:
+        Eigenvalues of Lindbladian (at least two).
+    :type eigenvalues: numpy.ndarray
+
+    :return:
+        Spectral gap (zero if steady state is not unique).
+    :rtype: float
+    """
+    eigenvalues = np.asarray(eigenvalues)
+    if eigenvalues.size < 2:
+        raise ValueError('At least two eigenvalues are required.')
+    rates = np.sort(-eigenvalues.real)
+    return float(max(rates[1] - rates[0], 0.0))
@@ -0,0 +1,237 @@
+from scipy.sparse import csr_matrix, csc_matrix
+from scipy.sparse.linalg import LinearOperator, splu, spilu, gmres, bicgstab
+from oqspy.parallel import threaded_operator
+from oqspy.basis import from_hermitian_basis
+import numpy as np
+import scipy
+import time
+
+
+# Relative tolerance keyword of Krylov solvers was renamed from 'tol' to 'rtol' in SciPy 1.12 ('tol' removed in 1.14)
+_rtol_keyword = 'rtol' if tuple(int(part) for part in scipy.__version__.split('.')[:2]) >= (1, 12) else 'tol'
+
+
+def trace_row(sys_size, dtype=np.complex128):
+    """
+    Row vector of trace functional on vec(rho) (column-major).
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :return:
+        Dense vector t such that t.dot(vec(rho)) = Tr(rho).
+    :rtype: numpy.ndarray
+    """
+    row = np.zeros(sys_size * sys_size, dtype=dtype)
+    row[np.arange(sys_size) * (sys_size + 1)] = 1.0
+    return row
+
+
+def _replace_first_row_with_trace(lindbladian, sys_size):
+    """
+    Lindbladian with its first row replaced by trace functional.
+    """
+    lindbladian = csr_matrix(lindbladian)
+    super_size = sys_size * sys_size
+    diag_ids = np.arange(sys_size, dtype=lindbladian.indices.dtype) * (sys_size + 1)
+
+    begin = lindbladian.indptr[1]
+    indptr = np.concatenate(([0], lindbladian.indptr[1:] - begin + sys_size)).astype(lindbladian.indptr.dtype)
+    indices = np.concatenate((diag_ids, lindbladian.indices[begin:]))
+    data = np.concatenate((np.ones(sys_size, dtype=lindbladian.dtype), lindbladian.data[begin:]))
+    return csr_matrix((data, indices, indptr), shape=(super_size, super_size))
+
+
+def _trace_row_operator(lindbladian, sys_size):
+    """
+    Matrix-free version of trace-row replaced Lindbladian.
+    """
+    super_size = sys_size * sys_size
+    diag_ids = np.arange(sys_size) * (sys_size + 1)
+
+    def matvec(vec):
+        res = np.array(lindbladian.matvec(vec), dtype=lindbladian.dtype).ravel()
+        res[0] = np.sum(np.ravel(vec)[diag_ids])
+        return res
+
+    return LinearOperator((super_size, super_size), matvec=matvec, dtype=lindbladian.dtype)
+
+
+def _preconditioner(system, preconditioner, drop_tol, fill_factor, drop_rule):
+    if preconditioner is None or isinstance(preconditioner, LinearOperator):
+        return preconditioner
+    if not isinstance(system, csr_matrix):
+        raise ValueError('Only user-defined preconditioner is supported for matrix-free lindbladian.')
+    if preconditioner == 'ilu':
+        ilu = spilu(csc_matrix(system), drop_tol=drop_tol, fill_factor=fill_factor, drop_rule=drop_rule)
+        return LinearOperator(system.shape, matvec=ilu.solve, dtype=system.dtype)
+    if preconditioner == 'jacobi':
+        diag = system.diagonal()
+        diag[diag == 0.0] = 1.0
+        inv_diag = 1.0 / diag
+        return LinearOperator(system.shape, matvec=lambda x: inv_diag * np.ravel(x), dtype=system.dtype)
+    raise ValueError('Unknown preconditioner.')
+
+
+def _solve(system, rhs, method, precond, tol, maxiter, x0, callback):
+    # Krylov iterations are dominated by products with system, which use all configured threads
+    system = threaded_operator(system)
+    if method == 'gmres':
+        vec, exit_code = gmres(system, rhs, x0=x0, atol=0.0, maxiter=maxiter, M=precond,
+                               callback=callback, callback_type='pr_norm', **{_rtol_keyword: tol})
+    else:
+        vec, exit_code = bicgstab(system, rhs, x0=x0, atol=0.0, maxiter=maxiter, M=precond,
+                                  callback=callback, **{_rtol_keyword: tol})
+    return vec, exit_code == 0
+
+
+def steady_state(lindbladian, sys_size, method='direct', preconditioner='ilu', tol=1.0e-10, maxiter=None,
+                 drop_tol=1.0e-5, fill_factor=10.0, x0=None, precision='double', max_refinements=10, basis='vec',
+                 drop_rule='basic'):
+    """
+    Stationary density matrix of autonomous Open Quantum System (OQS).
+
+    Solves L vec(rho) = 0 with Tr(rho) = 1 by replacing the first row of L with trace functional.
+
+    In 'mixed' precision, factorization (or iterative solve) runs in complex64
+    and solution is improved by iterative refinement with residuals computed in complex128.
+    Real Lindbladians (Hermitian basis) are solved in float32 / float64 instead.
+
+    :param lindbladian:
+        Lindbladian (CSR format) or matrix-free Lindbladian (LinearOperator, iterative methods only).
+    :type lindbladian: csr_matrix or LinearOperator
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :param method:
+        Solver: 'direct' (sparse LU), 'gmres' or 'bicgstab'.
+    :type method: str
+
+    :param preconditioner:
+        Preconditioner of iterative solvers: 'ilu', 'jacobi', None or user-defined LinearOperator.
+    :type preconditioner: str
+
+    :param tol:
+        Relative tolerance of iterative solvers and of mixed-precision refinement.
+    :type tol: float
+
+    :param maxiter:
+        Maximum number of iterations of iterative solvers.
+    :type maxiter: int
+
+    :param drop_tol:
+        Drop tolerance of ILU preconditioner.
+    :type drop_tol: float
+
+    :param fill_factor:
+        Fill factor of ILU preconditioner (used only by 'area' drop rule).
+    :type fill_factor: float
+
+    :param x0:
+        Initial guess of vec(rho) for iterative solvers.
+    :type x0: numpy.ndarray
+
+    :param precision:
+        Arithmetic: 'double' (complex128), 'single' (complex64) or 'mixed'.
+    :type precision: str
+
+    :param max_refinements:
+        Maximum number of refinement steps in 'mixed' precision.
+    :type max_refinements: int
+
+    :param basis:
+        Coordinates of lindbladian: 'vec' (vec(rho)) or 'hermitian' (see oqspy.basis.hermitian_basis).
+    :type basis: str
+
+    :param drop_rule:
+        Drop rule of ILU preconditioner (see scipy.sparse.linalg.spilu). Default 'basic' drops by tolerance only:
+        'area' rule capping fill by fill_factor leaves zero pivots in trace-row replaced dimer Lindbladians
+        from sys_size ~ 100 on.
+    :type drop_rule: str
+
+    :return:
+        Density matrix (sys_size x sys_size) and dictionary with solver statistics
+        ('method', 'precision', 'iterations', 'refinements', 'residual', 'time_setup', 'time_solve').
+    :rtype: tuple
+    """
+    if method not in ['direct', 'gmres', 'bicgstab']:
+        raise ValueError('Unknown steady state method.')
+    if precision not in ['double', 'single', 'mixed']:
+        raise ValueError('Unknown precision.')
+    if basis not in ['vec', 'hermitian']:
+        raise ValueError('basis must be \'vec\' or \'hermitian\'.')
+    if lindbladian.shape != (sys_size * sys_size, sys_size * sys_size):
+        raise ValueError('Incorrect size of lindbladian.')
+    is_matrix_free = not isinstance(lindbladian, csr_matrix)
+    if is_matrix_free and method == 'direct':
+        raise ValueError('Direct method requires lindbladian in CSR format.')
+    if is_matrix_free and precision == 'mixed':
+        raise ValueError('Mixed precision requires lindbladian in CSR format.')
+
+    super_size = sys_size * sys_size
+    if np.issubdtype(lindbladian.dtype, np.complexfloating):
+        dtype_high, dtype_low = np.complex128, np.complex64
+    else:
+        dtype_high, dtype_low = np.float64, np.float32
+    info = {'method': method, 'precision': precision, 'iterations': 0, 'refinements': 0}
+
+    def count(_):
+        info['iterations'] += 1
+
+    time_start = time.perf_counter()
+    if is_matrix_free:
+        system = _trace_row_operator(lindbladian, sys_size)
+        system_low = system
+    else:
+        if precision == 'single':
+            lindbladian = csr_matrix(lindbladian, dtype=dtype_low)
+        system = _replace_first_row_with_trace(lindbladian, sys_size)
+        system_low = csr_matrix(system, dtype=dtype_low) if precision == 'mixed' else system
+
+    rhs = np.zeros(super_size, dtype=system_low.dtype)
+    rhs[0] = 1.0
+
+    if method == 'direct':
+        lu = splu(csc_matrix(system_low))
+        info['time_setup'] = time.perf_counter() - time_start
+        time_start = time.perf_counter()
+        solve = lu.solve
+        vec = solve(rhs)
+    else:
+        precond = _preconditioner(system_low, preconditioner, drop_tol, fill_factor, drop_rule)
+        info['time_setup'] = time.perf_counter() - time_start
+        time_start = time.perf_counter()
+        # Single-precision residual stalls around 1e-5 for large systems (N = 200),
+        # so inner solves only reduce residual moderately and refinement does the rest
+        inner_tol = max(tol, 1.0e-3) if precision == 'mixed' else tol
+
+        def solve(res):
+            return _solve(system_low, res, method, precond, inner_tol, maxiter, None, count)[0]
+
+        vec, info['converged'] = _solve(system_low, rhs, method, precond, inner_tol, maxiter, x0, count)
+
+    if precision == 'mixed':
+        # Iterative refinement: corrections are solved in single, residuals are accumulated in double
+        vec = vec.astype(dtype_high)
+        rhs = rhs.astype(dtype_high)
+        for _ in range(max_refinements):
+            res = rhs - system @ vec
+            if np.linalg.norm(res) <= tol * np.linalg.norm(rhs):
+                break
+            vec += solve(res.astype(dtype_low))
+            info['refinements'] += 1
+        if method != 'direct':
+            info['converged'] = bool(np.linalg.norm(rhs - system @ vec) <= tol * np.linalg.norm(rhs))
+    info['time_solve'] = time.perf_counter() - time_start
+
+    info['residual'] = float(np.linalg.norm(lindbladian @ vec))
+
+    if basis == 'hermitian':
+        vec = from_hermitian_basis(vec, sys_size)
+    rho = vec.reshape((sys_size, sys_size), order='F')
+    rho = rho / np.trace(rho)
+
+    return rho, info
@@ -0,0 +1,281 @@
+from oqspy.parallel import get_context
+from oqspy.lindbladian import LindbladianPattern, assemble_lindbladian, assemble_driving_lindbladian
+from oqspy.steady_state import steady_state
+from oqspy.floquet import monodromy, asymptotic_state
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+import functools
+import hashlib
+import itertools
+import numpy as np
+import os
+import re
+import time
+
+
+dimer_params = ['num_particles', 'gamma', 'E', 'U', 'J', 'drv_type', 'drv_ampl', 'drv_freq', 'drv_phas']
+
+_shared = {}
+
+
+def parameter_grid(**axes):
+    """
+    Cartesian product of parameter axes.
+
+    :param axes:
+        Parameter names with lists of values.
+
+    :return:
+        List of dictionaries, one per grid point.
+    :rtype: list
+    """
+    names = list(axes.keys())
+    return [dict(zip(names, values)) for values in itertools.product(*[list(axes[name]) for name in names])]
+
+
+def _exact_value(value):
+    if isinstance(value, (bool, np.bool_)):
+        return repr(bool(value))
+    if isinstance(value, (int, np.integer)):
+        return repr(int(value))
+    if isinstance(value, (float, np.floating)):
+        return float(value).hex()
+    if isinstance(value, (complex, np.complexfloating)):
+        return complex(value).real.hex() + ',' + complex(value).imag.hex()
+    return type(value).__name__ + ':' + repr(value)
+
+
+def point_label(point, precision=4):
+    """
+    Human-readable label of sweep point, in the same manner as fixtures suffix.
+
+    Float parameters are rounded, so different points may share label.
+
+    :param point:
+        Parameters of point.
+    :type point: dict
+
+    :param precision:
+        Number of decimals of float parameters.
+    :type precision: int
+
+    :return:
+        Label string.
+    :rtype: str
+    """
+    parts = []
+    for name in sorted(point.keys()):
+        value = point[name]
+        if isinstance(value, (bool, np.bool_, int, np.integer)):
+            parts.append(f'{name}({value})')
+        elif isinstance(value, (float, np.floating)):
+            parts.append(f'{name}({value:.{precision}f})')
+        else:
+            parts.append(f'{name}(' + re.sub(r'[^0-9A-Za-z.+-]', '-', str(value)) + ')')
+    return '_'.join(parts)
+
+
+def point_key(point, precision=4):
+    """
+    File name key of sweep point.
+
+    Key is readable label (see point_label) followed by hash of exact parameter values,
+    so points differing beyond rounding of label never share result file.
+
+    :param point:
+        Parameters of point.
+    :type point: dict
+
+    :param precision:
+        Number of decimals of float parameters in label.
+    :type precision: int
+
+    :return:
+        Key string.
+    :rtype: str
+    """
+    sha = hashlib.sha256()
+    for name in sorted(point.keys()):
+        sha.update((name + '=' + _exact_value(point[name]) + ';').encode())
+    return point_label(point, precision) + '_' + sha.hexdigest()[:16]
+
+
+def _init_worker(task, output_dir):
+    _shared['task'] = task
+    _shared['output_dir'] = output_dir
+
+
+def _run_point(point):
+    key = point_key(point)
+    time_start = time.perf_counter()
+    result = _shared['task'](point)
+    result = dict(result)
+    result['time'] = time.perf_counter() - time_start
+    for name, value in point.items():
+        result['param_' + name] = value
+
+    fn = os.path.join(_shared['output_dir'], key + '.npz')
+    fn_tmp = os.path.join(_shared['output_dir'], key + f'.{os.getpid()}.tmp.npz')
+    np.savez(fn_tmp, **result)
+    os.replace(fn_tmp, fn)
+    return key
+
+
+def run_sweep(points, task, output_dir, num_workers=1, chunk_size=1):
+    """
+    Parameter sweep with results streamed to disk.
+
+    Each finished point is stored as separate .npz file (written atomically) in output_dir,
+    points with existing result files are skipped, so interrupted sweep can be restarted.
+
+    :param points:
+        List of parameters dictionaries.
+    :type points: list
+
+    :param task:
+        Function of point dictionary returning dictionary of arrays.
+    :type task: function
+
+    :param output_dir:
+        Directory for results.
+    :type output_dir: str
+
+    :param num_workers:
+        Number of worker processes. Points are processed in current process if 1.
+    :type num_workers: int
+
+    :param chunk_size:
+        Number of points per task sent to worker.
+    :type chunk_size: int
+
+    :return:
+        List of keys of points computed in this run.
+    :rtype: list
+    """
+    if not isinstance(num_workers, int) or num_workers <= 0:
+        raise ValueError('num_workers must be positive integer.')
+    os.makedirs(output_dir, exist_ok=True)
+
+    pending = [p for p in points if not os.path.exists(os.path.join(output_dir, point_key(p) + '.npz'))]
+
+    keys = []
+    if num_workers == 1:
+        _init_worker(task, output_dir)
+        try:
+            for point in pending:
+                keys.append(_run_point(point))
+        finally:
+            _shared.clear()
+    else:
+        with get_context().Pool(num_workers, initializer=_init_worker, initargs=(task, output_dir)) as pool:
+            for key in pool.imap_unordered(_run_point, pending, chunksize=chunk_size):
+                keys.append(key)
+    return keys
+
+
+def load_sweep(output_dir):
+    """
+    Results of parameter sweep.
+
+    :param output_dir:
+        Directory with results.
+    :type output_dir: str
+
+    :return:
+        Dictionary of point keys and dictionaries of stored arrays.
+    :rtype: dict
+    """
+    results = {}
+    for fn in sorted(os.listdir(output_dir)):
+        if fn.endswith('.npz') and not fn.endswith('.tmp.npz'):
+            with np.load(os.path.join(output_dir, fn)) as data:
+                results[fn[:-4]] = {name: data[name] for name in data.files}
+    return results
+
+
+# Number of system sizes whose structures are kept by every process of dimer sweep
+_dimer_cache_size = 4
+
+
+@functools.lru_cache(maxsize=_dimer_cache_size)
+def _dimer_structure(num_particles):
+    # Hamiltonian pattern does not depend on E, U, J: zero entries are stored explicitly
+    dissipators = dimer_get_dissipators(num_particles)
+    pattern = LindbladianPattern(dimer_get_hamiltonian(num_particles, 1.0, 1.0, 1.0), dissipators)
+    return dissipators, pattern
+
+
+@functools.lru_cache(maxsize=_dimer_cache_size)
+def _dimer_driving_lindbladians(num_particles):
+    return [assemble_driving_lindbladian(h) for h in dimer_get_driving_hamiltonias(num_particles)]
+
+
+def dimer_task(point):
+    """
+    Asymptotic density matrix of dimer for one sweep point.
+
+    Autonomous points (drv_ampl = 0) are solved by steady-state solver,
+    driven ones by Floquet monodromy. Quantities independent of E, U, J, gamma and drive
+    (dissipators, Lindbladian pattern and driving Lindbladians) are cached per process
+    for a few last system sizes, Lindbladian of every point is then refilled on cached pattern.
+
+    :param point:
+        Dictionary with keys of dimer_params.
+    :type point: dict
+
+    :return:
+        Dictionary with density matrix 'rho'.
+    :rtype: dict
+    """
+    num_particles = point['num_particles']
+    sys_size = dimer_get_sys_size(num_particles)
+
+    hamiltonian = dimer_get_hamiltonian(num_particles, point['E'], point['U'], point['J'])
+    dissipators, pattern = _dimer_structure(num_particles)
+    gammas = [point['gamma']]
+    if pattern.matches(hamiltonian, dissipators):
+        lindbladian = pattern.assemble(hamiltonian, dissipators, gammas)
+    else:
+        lindbladian = assemble_lindbladian(hamiltonian, dissipators, gammas)
+
+    if point['drv_ampl'] == 0.0:
+        rho, _ = steady_state(lindbladian, sys_size)
+    else:
+        driving_lindbladians = _dimer_driving_lindbladians(num_particles)
+        functions = dimer_get_driving_functions(point['drv_type'], point['drv_ampl'], point['drv_freq'], point['drv_phas'])
+        period = dimer_get_periods(point['drv_freq'])[0]
+        monodromy_mtx = monodromy(lindbladian, driving_lindbladians, functions, period)
+        rho, _ = asymptotic_state(monodromy_mtx, sys_size)
+    return {'rho': rho}
+
+
+def dimer_sweep(points, output_dir, num_workers=1):
+    """
+    Parameter sweep of dimer asymptotic states.
+
+    :param points:
+        List of dictionaries with keys of dimer_params.
+    :type points: list
+
+    :param output_dir:
+        Directory for results.
+    :type output_dir: str
+
+    :param num_workers:
+        Number of worker processes.
+    :type num_workers: int
+
+    :return:
+        List of keys of points computed in this run.
+    :rtype: list
+    """
+    for point in points:
+        missing = [name for name in dimer_params if name not in point]
+        if missing:
+            raise ValueError('Missing dimer parameters: ' + ', '.join(missing) + '.')
+    return run_sweep(points, dimer_task, output_dir, num_workers=num_workers)
@@ -0,0 +1,460 @@
+from scipy.sparse import csr_matrix, csc_matrix, diags, kron
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import splu
+from scipy.linalg import qr
+from oqspy.spectrum import liouvillian_spectrum
+from oqspy.propagation import propagate
+from oqspy.steady_state import trace_row
+from oqspy.basis import from_hermitian_basis
+from oqspy.parallel import get_context
+import numpy as np
+import time
+
+
+_shared = {}
+
+
+class Sector:
+    """
+    Invariant subspace of superoperators spanned by orthonormal columns of basis Q (sys_size^2 x dim).
+
+    Superoperator S restricted to sector is Q^H S Q, states are projected by Q^H and embedded back by Q.
+    """
+
+    def __init__(self, basis, label):
+        """
+        :param basis:
+            Orthonormal basis of sector (CSR format).
+        :type basis: csr_matrix
+
+        :param label:
+            Label of sector (component id or eigenvalue of symmetry superoperator).
+        :type label: int or complex
+        """
+        self.basis = csr_matrix(basis)
+        self.label = label
+        self.__adjoint = self.basis.conj().T.tocsr()
+
+    @property
+    def dim(self):
+        """
+        Dimension of sector.
+        """
+        return self.basis.shape[1]
+
+    def project(self, state):
+        """
+        Coordinates Q^H state of vec(rho) (or block of states) in sector.
+        """
+        return self.__adjoint @ state
+
+    def embed(self, coords):
+        """
+        vec(rho) (or block of states) Q coords of sector coordinates.
+        """
+        return self.basis @ coords
+
+    def block(self, superoperator):
+        """
+        Superoperator restricted to sector, Q^H S Q (CSR format).
+        """
+        result = (self.__adjoint @ superoperator @ self.basis).tocsr()
+        result.sort_indices()
+        return result
+
+
+def connected_sectors(superoperators):
+    """
+    Sectors of connected components of common sparsity graph of superoperators.
+
+    Elements of vec(rho) (or of Hermitian coordinates) coupled by none of superoperators, directly
+    or through other elements, evolve independently, so every component is an invariant subspace
+    spanned by unit vectors. Conserved quantities of Hamiltonian and dissipators appear as components.
+
+    :param superoperators:
+        Superoperator or list of superoperators (CSR format), e.g. Lindbladian and driving Lindbladians.
+    :type superoperators: list
+
+    :return:
+        List of sectors ordered by their first element.
+    :rtype: list
+    """
+    if not isinstance(superoperators, list):
+        superoperators = [superoperators]
+    if not superoperators:
+        raise ValueError('superoperators must be non-empty list.')
+    shape = superoperators[0].shape
+    if not all(mtx.shape == shape for mtx in superoperators):
+        raise ValueError('superoperators must have the same shape.')
+    graph = csr_matrix(shape, dtype=np.int8)
+    for mtx in superoperators:
+        graph = graph + csr_matrix((np.ones(mtx.nnz, dtype=np.int8), mtx.indices, mtx.indptr), shape=shape)
+    num_components, component_ids = connected_components(graph, directed=True, connection='weak')
+
+    order = np.argsort(component_ids, kind='stable')
+    bounds = np.searchsorted(component_ids[order], np.arange(num_components + 1))
+    firsts = order[bounds[:-1]]
+    sectors = []
+    for label, component_id in enumerate(np.argsort(firsts)):
+        ids = order[bounds[component_id]:bounds[component_id + 1]]
+        basis = csr_matrix((np.ones(ids.size), (ids, np.arange(ids.size))), shape=(shape[0], ids.size))
+        sectors.append(Sector(basis, label))
+    return sectors
+
+
+def _eigenspace_basis(vectors, tol):
+    """
+    Sparse orthonormal basis of span of vectors: reduced echelon form (unit entries at pivot rows)
+    orthonormalized by Gram-Schmidt, exact zeros of overlaps of disjoint columns keep it sparse.
+    """
+    _, _, pivots = qr(vectors.T, pivoting=True, mode='economic')
+    pivots = np.sort(pivots[:vectors.shape[1]])
+    basis = vectors @ np.linalg.inv(vectors[pivots, :])
+    basis[np.abs(basis) < tol] = 0.0
+    for col in range(basis.shape[1]):
+        for prev in range(col):
+            overlap = np.vdot(basis[:, prev], basis[:, col])
+            if overlap != 0.0:
+                basis[:, col] -= overlap * basis[:, prev]
+        basis[:, col] /= np.linalg.norm(basis[:, col])
+    basis[np.abs(basis) < tol] = 0.0
+    return basis
+
+
+def symmetry_sectors(symmetry, sys_size, tol=1.0e-8):
+    """
+    Sectors of weak symmetry: unitary U commuting with Hamiltonian and mapping set of dissipators
+    onto itself (up to phases), so that Lindbladian commutes with superoperator rho -> U rho U^H.
+
+    Eigenvectors |a> of U with eigenvalues u_a give basis |a><b| of eigenvalue u_a conj(u_b) of symmetry superoperator,
+    sector is eigenspace of one eigenvalue. Eigenvectors are chosen sparse for (signed) permutation symmetries
+    such as parity, so sector bases are sparse too. Invariance is verified by split_superoperator.
+
+    :param symmetry:
+        Unitary symmetry operator (sys_size x sys_size, sparse or dense).
+    :type symmetry: csr_matrix
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :param tol:
+        Tolerance of unitarity and of grouping of eigenvalues.
+    :type tol: float
+
+    :return:
+        List of sectors labelled by eigenvalues of symmetry superoperator, ordered by decreasing dimension.
+    :rtype: list
+    """
+    symmetry = csr_matrix(symmetry).toarray()
+    if symmetry.shape != (sys_size, sys_size):
+        raise ValueError('Incorrect size of symmetry.')
+    if np.max(np.abs(symmetry @ symmetry.conj().T - np.eye(sys_size))) > tol:
+        raise ValueError('symmetry must be unitary.')
+
+    eigenvalues, eigenvectors = np.linalg.eig(symmetry)
+    eigenvalues = eigenvalues / np.abs(eigenvalues)
+    groups = _group(eigenvalues, tol)
+    vectors = np.zeros((sys_size, sys_size), dtype=np.complex128)
+    values = np.zeros(sys_size, dtype=np.complex128)
+    col = 0
+    for ids in groups:
+        vectors[:, col:col + ids.size] = _eigenspace_basis(eigenvectors[:, ids], 1.0e-12)
+        values[col:col + ids.size] = np.mean(eigenvalues[ids])
+        col += ids.size
+    vectors = csr_matrix(vectors)
+
+    # Column b * sys_size + a of kron(conj(V), V) is vec(|a><b|)
+    transform = csc_matrix(kron(vectors.conj(), vectors, format='csc'))
+    labels = np.kron(values.conj(), values)
+    sectors = []
+    for ids in sorted(_group(labels, tol), key=lambda ids: -ids.size):
+        sectors.append(Sector(transform[:, ids], complex(np.mean(labels[ids]))))
+    return sectors
+
+
+def _group(values, tol):
+    """
+    Index arrays of values equal within tolerance.
+    """
+    keys = np.round(values.real / tol) + 1.0j * np.round(values.imag / tol)
+    _, inverse = np.unique(keys, return_inverse=True)
+    return [np.flatnonzero(inverse == key_id) for key_id in range(inverse.max() + 1)]
+
+
+def split_superoperator(superoperator, sectors, tol=1.0e-10):
+    """
+    Blocks Q^H S Q of superoperator in sectors.
+
+    :param superoperator:
+        Superoperator (CSR format).
+    :type superoperator: csr_matrix
+
+    :param sectors:
+        List of sectors.
+    :type sectors: list
+
+    :param tol:
+        Relative tolerance of coupling between sectors.
+    :type tol: float
+
+    :return:
+        List of blocks (CSR format).
+    :rtype: list
+    """
+    if sum(sector.dim for sector in sectors) != superoperator.shape[0]:
+        raise ValueError('sectors must cover the whole space.')
+    scale = max(np.max(np.abs(superoperator.data), initial=0.0), 1.0)
+    blocks = []
+    for sector in sectors:
+        block = sector.block(superoperator)
+        coupling = superoperator @ sector.basis - sector.basis @ block
+        if np.max(np.abs(coupling.data), initial=0.0) > tol * scale:
+            raise ValueError('sectors are not invariant subspaces of superoperator.')
+        blocks.append(block)
+    return blocks
+
+
+def _init_worker(shared):
+    _shared.update(shared)
+
+
+def _map_sectors(function, shared, num_sectors, num_workers):
+    """
+    function(sector_id) for all sectors, in current process or in process pool
+    (blocks and driving closures are passed to workers once at start-up).
+    """
+    if not isinstance(num_workers, int) or num_workers <= 0:
+        raise ValueError('num_workers must be positive integer.')
+    if num_workers == 1 or num_sectors <= 1:
+        _init_worker(shared)
+        try:
+            return [function(sector_id) for sector_id in range(num_sectors)]
+        finally:
+            _shared.clear()
+    with get_context().Pool(min(num_workers, num_sectors), initializer=_init_worker, initargs=(shared,)) as pool:
+        return pool.map(function, range(num_sectors), chunksize=1)
+
+
+def _sector_steady_state(sector_id):
+    block = _shared['blocks'][sector_id]
+    weights = _shared['weights'][sector_id]
+    # Trace functional annihilates range of block, so any row with nonzero weight is redundant
+    row_id = int(np.argmax(np.abs(weights)))
+    mask = np.ones(block.shape[0])
+    mask[row_id] = 0.0
+    row = csr_matrix((weights[weights != 0.0], (np.full(np.count_nonzero(weights), row_id), np.flatnonzero(weights))),
+                     shape=block.shape)
+    system = diags(mask) @ block + row
+    rhs = np.zeros(block.shape[0], dtype=system.dtype)
+    rhs[row_id] = 1.0
+    time_start = time.perf_counter()
+    lu = splu(csc_matrix(system))
+    time_setup = time.perf_counter() - time_start
+    time_start = time.perf_counter()
+    coords = lu.solve(rhs)
+    time_solve = time.perf_counter() - time_start
+    return coords, float(np.linalg.norm(block @ coords)), time_setup, time_solve
+
+
+def sector_steady_states(lindbladian, sectors, sys_size, num_workers=1, basis='vec'):
+    """
+    Stationary density matrices of autonomous OQS solved independently in sectors (sparse LU of blocks).
+
+    Only sectors overlapping with trace functional carry stationary states, so one density matrix
+    is returned for unique steady state and one per sector for conserved quantities split by connected_sectors.
+
+    :param lindbladian:
+        Lindbladian (CSR format).
+    :type lindbladian: csr_matrix
+
+    :param sectors:
+        List of sectors (see connected_sectors and symmetry_sectors).
+    :type sectors: list
+
+    :param sys_size:
+        Number of states in OQS.
+    :type sys_size: int
+
+    :param num_workers:
+        Number of worker processes, sectors are solved in current process if 1.
+    :type num_workers: int
+
+    :param basis:
+        Coordinates of lindbladian: 'vec' (vec(rho)) or 'hermitian' (see oqspy.basis.hermitian_basis).
+    :type basis: str
+
+    :return:
+        List of density matrices (sys_size x sys_size) and dictionary with solver statistics
+        ('labels', 'dims', 'residuals', 'time_setup', 'time_solve').
+    :rtype: tuple
+    """
+    if basis not in ['vec', 'hermitian']:
+        raise ValueError('basis must be \'vec\' or \'hermitian\'.')
+    if lindbladian.shape != (sys_size * sys_size, sys_size * sys_size):
+        raise ValueError('Incorrect size of lindbladian.')
+    blocks = split_superoperator(lindbladian, sectors)
+    # Trace of embedded state: t . (Q x) = (Q^T t) . x
+    trace = trace_row(sys_size, np.float64)
+    weights = [sector.basis.T @ trace for sector in sectors]
+    carrying = [sector_id for sector_id, weight in enumerate(weights) if np.max(np.abs(weight), initial=0.0) > 0.0]
+
+    shared = {'blocks': [blocks[i] for i in carrying], 'weights': [weights[i] for i in carrying]}
+    results = _map_sectors(_sector_steady_state, shared, len(carrying), num_workers)
+
+    rhos = []
+    info = {'labels': [], 'dims': [], 'residuals': [], 'time_setup': 0.0, 'time_solve': 0.0}
+    for sector_id, (coords, residual, time_setup, time_solve) in zip(carrying, results):
+        vec = sectors[sector_id].embed(coords)
+        if basis == 'hermitian':
+            vec = from_hermitian_basis(vec, sys_size)
+        rho = vec.reshape((sys_size, sys_size), order='F')
+        rhos.append(rho / np.trace(rho))
+        info['labels'].append(sectors[sector_id].label)
+        info['dims'].append(sectors[sector_id].dim)
+        info['residuals'].append(residual)
+        info['time_setup'] += time_setup
+        info['time_solve'] += time_solve
+    return rhos, info
+
+
+def _sector_spectrum(sector_id):
+    block = _shared['blocks'][sector_id]
+    k = _shared['k']
+    if block.shape[0] <= max(2 * k + 2, 64):
+        # Small sectors are diagonalized densely, eigenvalues nearest to zero are kept as by shift-invert
+        eigenvalues = np.linalg.eigvals(block.toarray())
+        return eigenvalues[np.argsort(np.abs(eigenvalues), kind='stable')[:k]]
+    eigenvalues, _, _ = liouvillian_spectrum(block, k, return_modes=False, **_shared['kwargs'])
+    return eigenvalues
+
+
+def sector_spectrum(lindbladian, sectors, k=6, num_workers=1, **kwargs):
+    """
+    Eigenvalues of Lindbladian nearest to zero, k per sector (see oqspy.spectrum.liouvillian_spectrum).
+
+    Eigenvalues of different sectors are found independently, so modes of every symmetry class are resolved
+    (shift-invert on the whole Lindbladian may miss sectors whose eigenvalues are farther from zero).
+
+    :param lindbladian:
+        Lindbladian (CSR format).
+    :type lindbladian: csr_matrix
+
+    :param sectors:
+        List of sectors.
+    :type sectors: list
+
+    :param k:
+        Number of eigenvalues per sector.
+    :type k: int
+
+    :param num_workers:
+        Number of worker processes.
+    :type num_workers: int
+
+    :param kwargs:
+        Additional arguments of oqspy.spectrum.liouvillian_spectrum.
+
+    :return:
+        Eigenvalues sorted by decreasing real part, array of sector ids of eigenvalues
+        and dictionary with statistics ('labels', 'dims', 'time').
+    :rtype: tuple
+    """
+    if not isinstance(k, int) or k <= 0:
+        raise ValueError('k must be positive integer.')
+    time_start = time.perf_counter()
+    blocks = split_superoperator(lindbladian, sectors)
+    results = _map_sectors(_sector_spectrum, {'blocks': blocks, 'k': k, 'kwargs': kwargs}, len(blocks), num_workers)
+    eigenvalues = np.concatenate(results)
+    sector_ids = np.concatenate([np.full(values.size, sector_id) for sector_id, values in enumerate(results)])
+    order = np.argsort(-eigenvalues.real, kind='stable')
+    info = {
+        'labels': [sector.label for sector in sectors],
+        'dims': [sector.dim for sector in sectors],
+        'time': time.perf_counter() - time_start
+    }
+    return eigenvalues[order], sector_ids[order], info
+
+
+def _sector_propagate(sector_id):
+    return propagate(
+        _shared['blocks'][sector_id],
+        _shared['states'][sector_id],
+        _shared['time_start'],
+        _shared['time_finish'],
+        _shared['driving_blocks'][sector_id],
+        _shared['driving_functions'],
+        **_shared['kwargs']
+    )
+
+
+def propagate_sectors(lindbladian, state, time_start, time_finish, sectors, driving_lindbladians=None,
+                      driving_functions=None, num_workers=1, **kwargs):
+    """
+    Propagation of vec(rho) from time_start to time_finish independently in sectors.
+
+    Sectors must be invariant for Lindbladian and for all driving Lindbladians.
+    Sectors without overlap with initial state are skipped.
+
+    :param lindbladian:
+        Lindbladian (CSR format).
+    :type lindbladian: csr_matrix
+
+    :param state:
+        Initial vec(rho) (column-major, or Hermitian coordinates for real Lindbladians).
+    :type state: numpy.ndarray
+
+    :param time_start:
+        Initial time.
+    :type time_start: float
+
+    :param time_finish:
+        Final time.
+    :type time_finish: float
+
+    :param sectors:
+        List of sectors.
+    :type sectors: list
+
+    :param driving_lindbladians:
+        List of driving Lindbladians (CSR format).
+    :type driving_lindbladians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param num_workers:
+        Number of worker processes.
+    :type num_workers: int
+
+    :param kwargs:
+        Additional arguments of oqspy.propagation.propagate.
+
+    :return:
+        vec(rho) at time_finish.
+    :rtype: numpy.ndarray
+    """
+    driving_lindbladians = driving_lindbladians or []
+    blocks = split_superoperator(lindbladian, sectors)
+    driving_blocks = list(zip(*[split_superoperator(mtx, sectors) for mtx in driving_lindbladians]))
+    if not driving_blocks:
+        driving_blocks = [[] for _ in sectors]
+
+    states = [sector.project(state) for sector in sectors]
+    active = [sector_id for sector_id, coords in enumerate(states) if np.any(coords != 0.0)]
+    shared = {
+        'blocks': [blocks[i] for i in active],
+        'states': [states[i] for i in active],
+        'driving_blocks': [list(driving_blocks[i]) for i in active],
+        'driving_functions': driving_functions,
+        'time_start': time_start,
+        'time_finish': time_finish,
+        'kwargs': kwargs
+    }
+    results = _map_sectors(_sector_propagate, shared, len(active), num_workers)
+
+    result = np.zeros(lindbladian.shape[0], dtype=np.result_type(np.asarray(state).dtype, *[block.dtype for block in blocks]))
+    for sector_id, coords in zip(active, results):
+        result += sectors[sector_id].embed(coords)
+    return result
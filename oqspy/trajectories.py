@@ -0,0 +1,267 @@
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import norm as sparse_norm
+from oqspy.parallel import get_context
+from oqspy.driving import vectorize_driving
+import numpy as np
+
+
+_shared = {}
+
+# Steps with step * ||H(t)||_1 <= _rk4_radius keep -i step H(t) inside RK4 stability region (radius ~2.6 in left half-plane)
+_rk4_radius = 2.5
+# Norm of state may only decrease between jumps, larger growth means unstable integration
+_norm_tol = 1.0e-6
+# Stage times of RK4 step (in units of step), driving functions are evaluated at all of them in one call
+_rk4_nodes = np.array([0.0, 0.5, 1.0])
+
+
+def effective_hamiltonian(hamiltonian, dissipators, gammas):
+    """
+    Non-Hermitian effective Hamiltonian H - i/2 sum gamma D^+ D of quantum trajectories.
+
+    :param hamiltonian:
+        Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dissipators:
+        List of dissipators (CSR format).
+    :type dissipators: list
+
+    :param gammas:
+        List of dissipation rates.
+    :type gammas: list
+
+    :return:
+        Effective Hamiltonian (CSR format).
+    :rtype: csr_matrix
+    """
+    h_eff = csr_matrix(hamiltonian, dtype=np.complex128)
+    for diss, gamma in zip(dissipators, gammas):
+        h_eff = h_eff - 0.5j * gamma * (diss.getH() * diss)
+    return h_eff.tocsr()
+
+
+def _init_worker(system, psi_init, times, observables, dt):
+    _shared['system'] = system
+    _shared['psi_init'] = psi_init
+    _shared['times'] = times
+    _shared['observables'] = observables
+    _shared['dt'] = dt
+
+
+def _rhs(h_eff, driving, values, psi):
+    res = h_eff @ psi
+    for value, (_, hamiltonian) in zip(values, driving):
+        res += value * (hamiltonian @ psi)
+    return -1.0j * res
+
+
+def _rk4_step(h_eff, driving, time, psi, step):
+    nodes = time + step * _rk4_nodes
+    values = [function(nodes) for function, _ in driving]
+    k1 = _rhs(h_eff, driving, [value[0] for value in values], psi)
+    k2 = _rhs(h_eff, driving, [value[1] for value in values], psi + 0.5 * step * k1)
+    k3 = _rhs(h_eff, driving, [value[1] for value in values], psi + 0.5 * step * k2)
+    k4 = _rhs(h_eff, driving, [value[2] for value in values], psi + step * k3)
+    return psi + (step / 6.0) * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+
+
+def _max_step(norms, driving, time, dt):
+    h_norm = norms[0] + sum(abs(function(time)) * norm for (function, _), norm in zip(driving, norms[1:]))
+    return dt if h_norm == 0.0 else min(dt, _rk4_radius / h_norm)
+
+
+def _expectations(observables, psi):
+    norm = np.vdot(psi, psi).real
+    return np.array([np.vdot(psi, obs @ psi) / norm for obs in observables])
+
+
+def _run_trajectory(seed_sequence):
+    h_eff, driving, jumps, norms = _shared['system']
+    times = _shared['times']
+    observables = _shared['observables']
+    dt = _shared['dt']
+
+    rng = np.random.default_rng(seed_sequence)
+    psi = _shared['psi_init'].copy()
+    threshold = rng.random()
+
+    values = np.zeros((len(observables), len(times)), dtype=np.complex128)
+    values[:, 0] = _expectations(observables, psi)
+    num_jumps = 0
+    for time_id in range(1, len(times)):
+        time = times[time_id - 1]
+        num_steps = 1
+        while num_steps > 0:
+            # Remaining interval is split into equal steps within dt and stability limit
+            remaining = times[time_id] - time
+            num_steps = max(1, int(np.ceil(remaining / _max_step(norms, driving, time, dt) - 1.0e-12)))
+            step = remaining / num_steps
+            psi = _rk4_step(h_eff, driving, time, psi, step)
+            num_steps -= 1
+            time = times[time_id] if num_steps == 0 else time + step
+            norm_sq = np.vdot(psi, psi).real
+            if not norm_sq <= 1.0 + _norm_tol:
+                raise RuntimeError('Trajectory norm grows: integration is unstable, decrease dt.')
+            if norm_sq < threshold:
+                jumped = [np.sqrt(gamma) * (diss @ psi) for diss, gamma in jumps]
+                weights = np.array([np.vdot(j, j).real for j in jumped])
+                jump_id = rng.choice(len(jumped), p=weights / np.sum(weights))
+                psi = jumped[jump_id] / np.sqrt(weights[jump_id])
+                threshold = rng.random()
+                num_jumps += 1
+        values[:, time_id] = _expectations(observables, psi)
+    return values, num_jumps
+
+
+def _run_batch(seed_sequences):
+    sums = None
+    sums_sq = None
+    num_jumps = 0
+    for seed_sequence in seed_sequences:
+        values, jumps = _run_trajectory(seed_sequence)
+        if sums is None:
+            sums = np.zeros_like(values)
+            sums_sq = np.zeros(values.shape, dtype=np.float64)
+        sums += values
+        sums_sq += np.abs(values) ** 2
+        num_jumps += jumps
+    return len(seed_sequences), sums, sums_sq, num_jumps
+
+
+def run_trajectories(hamiltonian, dissipators, gammas, psi_init, times, observables, num_trajectories,
+                     driving_hamiltonians=None, driving_functions=None, num_workers=1, batch_size=None, seed=None, dt=1.0e-2):
+    """
+    Monte Carlo wavefunction (quantum trajectories) solver.
+
+    Each trajectory evolves sys_size state vector with effective Hamiltonian (4th order Runge-Kutta)
+    and quantum jumps. Steps are limited by dt and by RK4 stability, step * ||H(t)||_1 <= 2.5,
+    RuntimeError is raised if norm of state nevertheless grows. Trajectories are split into batches over a process pool, every trajectory
+    has its own random stream spawned from one seed, so results do not depend on num_workers.
+    Observables are averaged on the fly, only sums over trajectories are kept.
+
+    :param hamiltonian:
+        Hamiltonian CSR matrix.
+    :type hamiltonian: csr_matrix
+
+    :param dissipators:
+        List of dissipators (CSR format).
+    :type dissipators: list
+
+    :param gammas:
+        List of dissipation rates.
+    :type gammas: list
+
+    :param psi_init:
+        Initial state vector.
+    :type psi_init: numpy.ndarray
+
+    :param times:
+        Output times (increasing, starting from initial time).
+    :type times: numpy.ndarray
+
+    :param observables:
+        List of observables (sys_size x sys_size matrices).
+    :type observables: list
+
+    :param num_trajectories:
+        Number of trajectories.
+    :type num_trajectories: int
+
+    :param driving_hamiltonians:
+        List of driving Hamiltonians (CSR format).
+    :type driving_hamiltonians: list
+
+    :param driving_functions:
+        List of driving functions.
+    :type driving_functions: list
+
+    :param num_workers:
+        Number of worker processes. Trajectories are computed in current process if 1.
+    :type num_workers: int
+
+    :param batch_size:
+        Number of trajectories per task.
+    :type batch_size: int
+
+    :param seed:
+        Seed of random streams.
+    :type seed: int
+
+    :param dt:
+        Maximum integration step (further reduced for stability of RK4).
+    :type dt: float
+
+    :return:
+        Dictionary with 'times', 'mean' and 'std_error' of observables (num_observables x num_times),
+        'num_trajectories', 'num_jumps' and 'convergence' (list of (num_trajectories, max std_error) after every batch).
+    :rtype: dict
+    """
+    if not isinstance(num_trajectories, int) or num_trajectories <= 0:
+        raise ValueError('num_trajectories must be positive integer.')
+    if not isinstance(num_workers, int) or num_workers <= 0:
+        raise ValueError('num_workers must be positive integer.')
+    times = np.asarray(times, dtype=np.float64)
+    if times.ndim != 1 or times.size < 1 or np.any(np.diff(times) <= 0.0):
+        raise ValueError('times must be increasing one-dimensional array.')
+    psi_init = np.asarray(psi_init, dtype=np.complex128)
+    if psi_init.shape != (hamiltonian.shape[0],):
+        raise ValueError('Incorrect size of psi_init.')
+    psi_init = psi_init / np.linalg.norm(psi_init)
+
+    h_eff = effective_hamiltonian(hamiltonian, dissipators, gammas)
+    # Driving values at all stages of a step are computed by one call of vectorized function
+    driving = list(zip([vectorize_driving(f) for f in driving_functions], driving_hamiltonians)) if driving_hamiltonians else []
+    jumps = list(zip(dissipators, gammas))
+    norms = [sparse_norm(h_eff, 1)] + [sparse_norm(csr_matrix(hamiltonian), 1) for _, hamiltonian in driving]
+    system = (h_eff, driving, jumps, norms)
+
+    if batch_size is None:
+        batch_size = max(1, num_trajectories // (4 * num_workers))
+    seed_sequences = np.random.SeedSequence(seed).spawn(num_trajectories)
+    batches = [seed_sequences[begin:begin + batch_size] for begin in range(0, num_trajectories, batch_size)]
+
+    init_args = (system, psi_init, times, observables, dt)
+    count = 0
+    sums = np.zeros((len(observables), times.size), dtype=np.complex128)
+    sums_sq = np.zeros((len(observables), times.size), dtype=np.float64)
+    num_jumps = 0
+    convergence = []
+
+    def accumulate(batch_result):
+        nonlocal count, sums, sums_sq, num_jumps
+        batch_count, batch_sums, batch_sums_sq, batch_jumps = batch_result
+        count += batch_count
+        sums += batch_sums
+        sums_sq += batch_sums_sq
+        num_jumps += batch_jumps
+        convergence.append((count, float(np.max(_std_error(sums, sums_sq, count), initial=0.0))))
+
+    if num_workers == 1:
+        _init_worker(*init_args)
+        try:
+            for batch in batches:
+                accumulate(_run_batch(batch))
+        finally:
+            _shared.clear()
+    else:
+        with get_context().Pool(num_workers, initializer=_init_worker, initargs=init_args) as pool:
+            for batch_result in pool.imap(_run_batch, batches):
+                accumulate(batch_result)
+
+    return {
+        'times': times,
+        'mean': sums / count,
+        'std_error': _std_error(sums, sums_sq, count),
+        'num_trajectories': count,
+        'num_jumps': num_jumps,
+        'convergence': convergence
+    }
+
+
+def _std_error(sums, sums_sq, count):
+    if count < 2:
+        return np.full(sums.shape, np.inf)
+    mean = sums / count
+    variance = np.maximum(sums_sq / count - np.abs(mean) ** 2, 0.0) * count / (count - 1)
+    return np.sqrt(variance / count)
@@ -14,9 +14,9 @@ def load_sparse_matrix(fn, size):
 
     num_lines = num_lines_in_file(fn)
 
-    rows = np.zeros(num_lines, dtype=np.int)
-    cols = np.zeros(num_lines, dtype=np.int)
-    data = np.zeros(num_lines, dtype=np.complex)
+    rows = np.zeros(num_lines, dtype=int)
+    cols = np.zeros(num_lines, dtype=int)
+    data = np.zeros(num_lines, dtype=complex)
 
     f = open(fn)
     for line_id, line in enumerate(f):
@@ -34,7 +34,7 @@ def load_sparse_matrix(fn, size):
 def load_dense_matrix(fn, size):
     num_lines = num_lines_in_file(fn)
 
-    data = np.zeros(num_lines, dtype=np.complex)
+    data = np.zeros(num_lines, dtype=complex)
     f = open(fn)
     for line_id, line in enumerate(f):
         m = re.match(r'\((?P<real>.*),(?P<imag>.*)\)', line)
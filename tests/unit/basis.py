@@ -0,0 +1,138 @@
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix
+from oqspy.oqs import oqs
+from oqspy.basis import \
+    hermitian_basis, \
+    to_hermitian_basis, \
+    from_hermitian_basis, \
+    hermitian_superoperator
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+
+
+def get_system(dimer, basis, precision='double'):
+    sys = oqs(dimer_get_sys_size(dimer.num_particles), 1, 1, precision=precision, basis=basis)
+    sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+    sys.init_driving(
+        dimer_get_driving_hamiltonias(dimer.num_particles),
+        dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+    )
+    sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+    return sys
+
+
+def random_rho(sys_size, seed=0):
+    rng = np.random.default_rng(seed)
+    mtx = rng.standard_normal((sys_size, sys_size)) + 1.0j * rng.standard_normal((sys_size, sys_size))
+    rho = mtx @ mtx.conj().T
+    return rho / np.trace(rho)
+
+
+class TestBasis(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer_1 = DimerModel(1)
+        self.dimer_2 = DimerModel(2)
+
+    def tearDown(self):
+        pass
+
+    def test_hermitian_basis(self):
+        sys_size = 5
+        transform = hermitian_basis(sys_size).toarray()
+        self.assertTrue(np.allclose(transform.conj().T @ transform, np.eye(sys_size * sys_size), atol=1.0e-14))
+
+        rho = random_rho(sys_size)
+        vec = rho.ravel(order='F')
+        coords = to_hermitian_basis(vec, sys_size)
+        self.assertEqual(coords.dtype, np.float64)
+        self.assertTrue(np.allclose(coords, transform.conj().T @ vec, atol=1.0e-14))
+        self.assertTrue(np.allclose(from_hermitian_basis(coords, sys_size), vec, atol=1.0e-14))
+        self.assertAlmostEqual(np.linalg.norm(coords), np.linalg.norm(vec))
+        # Trace functional is unchanged
+        self.assertAlmostEqual(np.sum(coords[np.arange(sys_size) * (sys_size + 1)]), 1.0)
+
+        block = np.stack([vec, random_rho(sys_size, 1).ravel(order='F')], axis=1)
+        self.assertTrue(np.allclose(from_hermitian_basis(to_hermitian_basis(block, sys_size), sys_size), block, atol=1.0e-14))
+        with self.assertRaises(ValueError):
+            to_hermitian_basis(vec[1:], sys_size)
+
+    def test_hermitian_superoperator(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys = get_system(dimer, 'vec')
+            sys_size = dimer_get_sys_size(dimer.num_particles)
+            vec = random_rho(sys_size).ravel(order='F')
+            coords = to_hermitian_basis(vec, sys_size)
+            for superoperator in [sys.lindbladian, sys.driving_lindbladians[0]]:
+                real = hermitian_superoperator(superoperator, sys_size)
+                self.assertEqual(real.dtype, np.float64)
+                self.assertTrue(real.has_sorted_indices)
+                self.assertTrue(np.allclose(from_hermitian_basis(real @ coords, sys_size), superoperator @ vec, atol=1.0e-12))
+
+            operator = hermitian_superoperator(sys.get_lindbladian_operator(), sys_size, np.float32)
+            self.assertEqual(operator.dtype, np.float32)
+            self.assertTrue(np.allclose(operator.matvec(coords), hermitian_superoperator(sys.lindbladian, sys_size) @ coords, atol=1.0e-5))
+
+        # Superoperator rho -> i rho does not map Hermitian matrices to Hermitian ones
+        identity = csr_matrix(1.0j * np.eye(4))
+        with self.assertRaises(ValueError):
+            hermitian_superoperator(identity, 2)
+        with self.assertRaises(ValueError):
+            hermitian_superoperator(identity, 3)
+
+    def test_oqs_hermitian(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys_vec = get_system(dimer, 'vec')
+            sys_real = get_system(dimer, 'hermitian')
+            sys_size = dimer_get_sys_size(dimer.num_particles)
+            self.assertEqual(sys_real.basis, 'hermitian')
+            self.assertEqual(sys_real.lindbladian.dtype, np.float64)
+            self.assertEqual(sys_real.driving_lindbladians[0].dtype, np.float64)
+            self.assertEqual(sys_real.driven_generator.dtype, np.float64)
+
+            rho_vec, _ = sys_vec.steady_state()
+            rho_real, info = sys_real.steady_state()
+            self.assertLess(np.max(np.abs(rho_real - rho_vec)), 1.0e-10)
+            self.assertLess(info['residual'], 1.0e-10)
+            rho_real, _ = sys_real.steady_state(method='gmres', preconditioner='ilu', tol=1.0e-12)
+            self.assertLess(np.max(np.abs(rho_real - rho_vec)), 1.0e-8)
+            rho_real, _ = sys_real.steady_state(precision='mixed')
+            self.assertLess(np.max(np.abs(rho_real - rho_vec)), 1.0e-10)
+
+            eigenvalues_vec, _, _ = sys_vec.spectrum(k=4)
+            eigenvalues_real, modes, _ = sys_real.spectrum(k=4)
+            self.assertTrue(np.allclose(np.sort_complex(eigenvalues_real), np.sort_complex(eigenvalues_vec), atol=1.0e-10))
+            self.assertLess(np.linalg.norm(sys_vec.lindbladian @ modes[:, 0]), 1.0e-10)
+
+            rho_init = random_rho(sys_size)
+            times = np.linspace(0.0, 0.25 * dimer_get_periods(dimer.drv_freq)[0], 3)
+            states_vec = [state.copy() for _, state in sys_vec.iter_propagate(rho_init.ravel(order='F'), times)]
+            coords = to_hermitian_basis(rho_init.ravel(order='F'), sys_size)
+            states_real = [state.copy() for _, state in sys_real.iter_propagate(coords, times)]
+            self.assertEqual(states_real[-1].dtype, np.float64)
+            for state_vec, state_real in zip(states_vec, states_real):
+                self.assertLess(np.max(np.abs(from_hermitian_basis(state_real, sys_size) - state_vec)), 1.0e-9)
+            with self.assertRaises(ValueError):
+                next(sys_real.iter_propagate(rho_init.ravel(order='F'), times))
+
+            observables = [np.diag(np.arange(sys_size, dtype=np.float64)), np.eye(sys_size, k=1)]
+            values_vec = sys_vec.propagate_observables(rho_init.ravel(order='F'), times, observables)
+            values_real = sys_real.propagate_observables(coords, times, observables)
+            self.assertTrue(np.allclose(values_real, values_vec, atol=1.0e-9))
+
+    def test_oqs_hermitian_precision(self):
+        sys = get_system(self.dimer_1, 'hermitian', precision='single')
+        self.assertEqual(sys.lindbladian.dtype, np.float32)
+        self.assertEqual(sys.get_lindbladian_operator().dtype, np.float32)
+        rho_vec, _ = get_system(self.dimer_1, 'vec').steady_state()
+        rho, _ = sys.steady_state()
+        self.assertLess(np.max(np.abs(rho - rho_vec)), 1.0e-4)
+        with self.assertRaises(ValueError):
+            oqs(10, 1, 1, basis='aaa')
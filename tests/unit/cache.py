@@ -0,0 +1,110 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from scipy.sparse.linalg import norm as sps_mtx_norm
+from oqspy.oqs import oqs
+from oqspy.cache import LindbladianCache, operators_key
+from oqspy.lindbladian import assemble_lindbladian
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+from tests.unit.models.dimer import DimerModel
+
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.hamiltonian = dimer_get_hamiltonian(self.dimer.num_particles, self.dimer.E, self.dimer.U, self.dimer.J)
+        self.dissipators = dimer_get_dissipators(self.dimer.num_particles)
+        self.gammas = [self.dimer.diss_gamma]
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_key(self):
+        key = operators_key('lindbladian', [self.hamiltonian] + self.dissipators, self.gammas)
+        self.assertEqual(key, operators_key('lindbladian', [self.hamiltonian.copy()] + self.dissipators, list(self.gammas)))
+        self.assertNotEqual(key, operators_key('lindbladian', [self.hamiltonian] + self.dissipators, [0.2]))
+        self.assertNotEqual(key, operators_key('lindbladian', [2.0 * self.hamiltonian] + self.dissipators, self.gammas))
+        self.assertNotEqual(key, operators_key('driving_lindbladian', [self.hamiltonian] + self.dissipators, self.gammas))
+
+    def test_get_put(self):
+        cache = LindbladianCache(self.tmp_dir)
+        key = operators_key('lindbladian', [self.hamiltonian] + self.dissipators, self.gammas)
+        self.assertIsNone(cache.get(key))
+
+        lindbladian = assemble_lindbladian(self.hamiltonian, self.dissipators, self.gammas)
+        cache.put(key, lindbladian)
+        cached = cache.get(key)
+        self.assertAlmostEqual(sps_mtx_norm(cached - lindbladian), 0.0, places=14)
+        self.assertFalse(cached.data.flags.writeable)
+        self.assertEqual([entry[0] for entry in cache.entries()], [key])
+        self.assertFalse(any(fn.endswith('.tmp') for fn in os.listdir(self.tmp_dir)))
+
+        calls = []
+        cache.get_or_build(key, lambda: calls.append(1))
+        self.assertEqual(calls, [])
+
+        cache.clear()
+        self.assertIsNone(cache.get(key))
+
+    def test_eviction(self):
+        lindbladian = assemble_lindbladian(self.hamiltonian, self.dissipators, self.gammas)
+        cache = LindbladianCache(self.tmp_dir)
+        cache.put('a', lindbladian)
+        entry_size = cache.size()
+        cache.clear()
+
+        with self.assertRaises(ValueError):
+            LindbladianCache(self.tmp_dir, max_bytes=0)
+        cache = LindbladianCache(self.tmp_dir, max_bytes=2 * entry_size)
+        cache.put('a', lindbladian)
+        cache.put('b', lindbladian)
+        os.utime(cache.path('a'), (1.0, 1.0))
+        os.utime(cache.path('b'), (2.0, 2.0))
+        cache.get('a')
+        cache.put('c', lindbladian)
+        self.assertEqual(sorted(entry[0] for entry in cache.entries()), ['a', 'c'])
+        self.assertLessEqual(cache.size(), 2 * entry_size)
+
+    def test_oqs(self):
+        sys_size = dimer_get_sys_size(self.dimer.num_particles)
+        functions = dimer_get_driving_functions(
+            self.dimer.drv_type,
+            self.dimer.drv_ampl,
+            self.dimer.drv_freq,
+            self.dimer.drv_phas
+        )
+        systems = []
+        for _ in range(2):
+            sys = oqs(sys_size, 1, 1)
+            with self.assertRaises(TypeError):
+                sys.use_cache(1)
+            sys.use_cache(self.tmp_dir)
+            sys.init_hamiltonian(self.hamiltonian)
+            sys.init_dissipation(self.dissipators, self.gammas)
+            sys.init_driving(dimer_get_driving_hamiltonias(self.dimer.num_particles), functions)
+            sys._oqs__calc_lindbladian()
+            sys._oqs__calc_driving_lindbladians()
+            systems.append(sys)
+        self.assertEqual(len(LindbladianCache(self.tmp_dir).entries()), 2)
+
+        expected = assemble_lindbladian(self.hamiltonian, self.dissipators, self.gammas)
+        first, second = systems
+        self.assertAlmostEqual(sps_mtx_norm(first._oqs__lindbladian - expected), 0.0, places=14)
+        self.assertAlmostEqual(sps_mtx_norm(second._oqs__lindbladian - expected), 0.0, places=14)
+        self.assertFalse(second._oqs__lindbladian.data.flags.writeable)
+        self.assertAlmostEqual(
+            sps_mtx_norm(second._oqs__driving_lindbladians[0] - first._oqs__driving_lindbladians[0]), 0.0, places=14
+        )
+
+        rho_first, _ = first.steady_state()
+        rho_second, _ = second.steady_state()
+        self.assertTrue(np.allclose(rho_first, rho_second, atol=1e-12))
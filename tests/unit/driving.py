@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from oqspy.oqs import oqs
+from oqspy.driving import vectorize_driving, tabulate_driving
+from oqspy.propagation import MagnusPropagator, piecewise_segments
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+
+
+class TestDriving(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer_1 = DimerModel(1)
+        self.dimer_2 = DimerModel(2)
+
+    def tearDown(self):
+        pass
+
+    def test_dimer_driving_functions_vectorized(self):
+        period = dimer_get_periods(self.dimer_1.drv_freq)[0]
+        times = np.linspace(start=0.0, stop=3.0 * period, num=101)
+        for dimer in [self.dimer_1, self.dimer_2]:
+            function = dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)[0]
+            self.assertTrue(function.vectorized)
+            self.assertIs(vectorize_driving(function), function)
+            values = function(times)
+            self.assertEqual(values.shape, times.shape)
+            self.assertListEqual(list(values), [function(time) for time in times])
+
+    def test_vectorize_scalar_function(self):
+        def driving(time):
+            return 2.0 * time if time < 1.0 else -1.0
+        driving.segments = [0.0, 1.0, 2.0]
+
+        vectorized = vectorize_driving(driving)
+        self.assertTrue(vectorized.vectorized)
+        self.assertEqual(vectorized.segments, driving.segments)
+        self.assertEqual(vectorized(0.5), 1.0)
+        times = np.array([[0.0, 0.5], [1.0, 1.5]])
+        self.assertListEqual(vectorized(times).tolist(), [[0.0, 1.0], [-1.0, -1.0]])
+
+    def test_tabulate_driving(self):
+        functions = dimer_get_driving_functions(
+            self.dimer_1.drv_type,
+            self.dimer_1.drv_ampl,
+            self.dimer_1.drv_freq,
+            self.dimer_1.drv_phas
+        )
+        times = np.linspace(start=0.0, stop=1.0, num=11)
+        table = tabulate_driving(functions + [lambda time: time], times)
+        self.assertEqual(table.shape, (2, 11))
+        self.assertLess(np.max(np.abs(table[0] - functions[0](times))), 1.0e-15)
+        self.assertLess(np.max(np.abs(table[1] - times)), 1.0e-15)
+        with self.assertRaises(ValueError):
+            tabulate_driving(functions, np.zeros((2, 2)))
+
+    def test_integrators_use_vectorized(self):
+        calls = []
+
+        def recorded(function):
+            def driving(time):
+                calls.append(np.shape(time))
+                return function(time)
+            driving.vectorized = True
+            if hasattr(function, 'segments'):
+                driving.segments = function.segments
+            return driving
+
+        dimer = self.dimer_1
+        dimer.num_particles = 4
+        functions = dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+        sys = oqs(dimer_get_sys_size(dimer.num_particles), 1, 1)
+        sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+        sys.init_driving(dimer_get_driving_hamiltonias(dimer.num_particles), [recorded(functions[0])])
+        sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1])
+        psi_init = np.zeros(dimer.num_particles + 1, dtype=np.complex128)
+        psi_init[0] = 1.0
+
+        # CFM4 evaluates both nodes of a step by one call
+        propagator = MagnusPropagator(sys.lindbladian, sys.driving_lindbladians, [recorded(functions[0])])
+        state = np.zeros(sys.lindbladian.shape[0], dtype=np.complex128)
+        state[0] = 1.0
+        propagator.step(0.0, state, 0.1)
+        self.assertListEqual(calls, [(2,)])
+
+        # Trajectories evaluate all RK4 stages of a step by one call
+        del calls[:]
+        sys.trajectories(psi_init, [0.0, 0.05], [], 1, seed=1, dt=1.0e-2)
+        self.assertEqual(calls.count((3,)), 5)
+        # Besides one scalar value per step for stability limit
+        self.assertEqual(len(calls), 10)
+
+        # Midpoints of all constant segments are computed by one call
+        square = dimer_get_driving_functions(0, 1.5, 1.0, 0.0)
+        del calls[:]
+        _, segments = piecewise_segments([recorded(square[0])])
+        self.assertEqual(len(segments), 2)
+        self.assertListEqual(calls, [(2,)])
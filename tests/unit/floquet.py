@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+from unittest import mock
+from scipy.linalg import expm
+from oqspy.oqs import oqs
+from oqspy.floquet import monodromy, asymptotic_state
+from oqspy.propagation import propagate, DrivenGenerator
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+
+
+class TestFloquet(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+        self.dimer.num_particles = 4
+        self.dimer.sys_size = 5
+
+    def tearDown(self):
+        pass
+
+    def get_system(self, dimer, basis='vec'):
+        sys = oqs(dimer_get_sys_size(dimer.num_particles), 1, 1, basis=basis)
+        sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+        sys.init_driving(
+            dimer_get_driving_hamiltonias(dimer.num_particles),
+            dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+        )
+        sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+        return sys
+
+    def test_monodromy_autonomous(self):
+        sys = self.get_system(self.dimer)
+        sys._oqs__calc_lindbladian()
+        lindbladian = sys._oqs__lindbladian
+        m_actual = monodromy(lindbladian, [], [], 1.5, rtol=1.0e-12, atol=1.0e-13)
+        m_expected = expm(1.5 * lindbladian.toarray())
+        self.assertLess(np.linalg.norm(m_actual - m_expected), 1.0e-9)
+
+    def test_floquet_driven(self):
+        sys = self.get_system(self.dimer)
+        period = dimer_get_periods(self.dimer.drv_freq)[0]
+        m_serial, rho_serial = sys.floquet(period, rtol=1.0e-10, atol=1.0e-12)
+        m_parallel, rho_parallel = sys.floquet(period, num_workers=2, chunk_size=3, rtol=1.0e-10, atol=1.0e-12)
+        self.assertLess(np.linalg.norm(m_serial - m_parallel), 1.0e-12)
+        self.assertLess(np.linalg.norm(rho_serial - rho_parallel), 1.0e-12)
+
+        rho, eigenvalue = asymptotic_state(m_serial, self.dimer.sys_size)
+        self.assertAlmostEqual(eigenvalue, 1.0, places=10)
+        self.assertAlmostEqual(np.trace(rho), 1.0, places=12)
+        self.assertLess(np.linalg.norm(rho - rho.conj().T), 1.0e-8)
+
+        state = propagate(
+            sys._oqs__lindbladian,
+            rho.ravel(order='F'),
+            0.0,
+            period,
+            sys._oqs__driving_lindbladians,
+            sys._oqs__driving_functions
+        )
+        self.assertLess(np.linalg.norm(state - rho.ravel(order='F')), 1.0e-8)
+
+    def test_floquet_generator_reuse(self):
+        sys = self.get_system(self.dimer)
+        period = dimer_get_periods(self.dimer.drv_freq)[0]
+        lindbladian = sys.lindbladian
+        driving_lindbladians = sys.driving_lindbladians
+        functions = sys._oqs__driving_functions
+        with mock.patch.object(DrivenGenerator, '__init__', autospec=True, side_effect=DrivenGenerator.__init__) as init:
+            # Merged generator is built once for all columns of monodromy
+            m_expected = monodromy(lindbladian, driving_lindbladians, functions, period, rtol=1.0e-10, atol=1.0e-12)
+            self.assertEqual(init.call_count, 1)
+            generator = sys.driven_generator
+            self.assertEqual(init.call_count, 2)
+            # Generator cached by OQS is reused by floquet
+            m_actual, _ = sys.floquet(period, rtol=1.0e-10, atol=1.0e-12)
+            m_generator = monodromy(generator, None, functions, period, rtol=1.0e-10, atol=1.0e-12)
+            self.assertEqual(init.call_count, 2)
+        self.assertTrue(np.array_equal(m_actual, m_expected))
+        self.assertTrue(np.array_equal(m_generator, m_expected))
+
+    def test_floquet_hermitian(self):
+        period = dimer_get_periods(self.dimer.drv_freq)[0]
+        _, rho_expected = self.get_system(self.dimer).floquet(period, rtol=1.0e-10, atol=1.0e-12)
+        m_real, rho = self.get_system(self.dimer, 'hermitian').floquet(period, rtol=1.0e-10, atol=1.0e-12)
+        self.assertEqual(m_real.dtype, np.float64)
+        self.assertLess(np.linalg.norm(rho - rho_expected), 1.0e-8)
+
+    def test_floquet_errors(self):
+        sys = self.get_system(self.dimer)
+        with self.assertRaises(ValueError):
+            sys.floquet(1.0, num_workers=0)
+        with self.assertRaises(ValueError):
+            sys.floquet(-1.0)
+        with self.assertRaises(ValueError):
+            asymptotic_state(np.eye(4), 3)
@@ -0,0 +1,122 @@
+import unittest
+import json
+import time
+import tracemalloc
+import numpy as np
+from scipy.sparse import csr_matrix
+from oqspy.oqs import oqs
+from oqspy.instrumentation import Instrumentation, operator_stats, null_instrumentation
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_dissipators
+from tests.unit.models.dimer import DimerModel
+
+
+class TestInstrumentation(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+
+    def tearDown(self):
+        pass
+
+    def get_system(self):
+        sys = oqs(dimer_get_sys_size(self.dimer.num_particles), 0, 1)
+        return sys
+
+    def init_system(self, sys):
+        sys.init_hamiltonian(dimer_get_hamiltonian(self.dimer.num_particles, self.dimer.E, self.dimer.U, self.dimer.J))
+        sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.1 / float(self.dimer.num_particles)])
+
+    def test_operator_stats(self):
+        mtx = csr_matrix(np.array([[1.0, 0.0, 2.0], [0.0, 3.0, 0.0], [0.0, 0.0, 4.0]]))
+        stats = operator_stats(mtx)
+        self.assertEqual(stats['shape'], (3, 3))
+        self.assertEqual(stats['nnz'], 4)
+        self.assertAlmostEqual(stats['fill'], 4.0 / 9.0)
+        self.assertEqual(stats['bandwidth'], 2)
+
+    def test_stages(self):
+        events = []
+        instrumentation = Instrumentation(hooks=[events.append])
+        with instrumentation.stage('outer'):
+            with instrumentation.stage('inner'):
+                buffer = np.ones(2 ** 20)
+                self.assertTrue(tracemalloc.is_tracing())
+            del buffer
+            time.sleep(0.01)
+        # Tracing started by outermost stage is stopped after it
+        self.assertFalse(tracemalloc.is_tracing())
+        report = instrumentation.report()
+        self.assertEqual([stage['name'] for stage in report.stages], ['outer/inner', 'outer'])
+        self.assertEqual([stage['depth'] for stage in report.stages], [1, 0])
+        self.assertGreater(report.stages[1]['time'], report.stages[0]['time'])
+        self.assertGreaterEqual(report.stages[0]['memory_peak'], 8 * 2 ** 20)
+        self.assertGreaterEqual(report.stages[1]['memory_peak'], 8 * 2 ** 20)
+        self.assertEqual([event['type'] for event in events], ['stage', 'stage'])
+
+    def test_tracing_ownership(self):
+        first = Instrumentation()
+        second = Instrumentation()
+        with first.stage('first'):
+            with second.stage('second'):
+                pass
+            # Tracing is stopped only when the last outermost stage ends
+            self.assertTrue(tracemalloc.is_tracing())
+        self.assertFalse(tracemalloc.is_tracing())
+
+        # Tracing started outside of oqspy is never stopped
+        tracemalloc.start()
+        try:
+            with first.stage('first'):
+                pass
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(len(first.report().stages), 2)
+        self.assertIsNotNone(first.report().stages[1]['memory_peak'])
+
+    def test_oqs(self):
+        sys = self.get_system()
+        self.assertIs(sys.instrumentation, null_instrumentation)
+        events = []
+        instrumentation = sys.instrument(hooks=[events.append], track_memory=False)
+        self.init_system(sys)
+        sys.steady_state()
+        sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.2 / float(self.dimer.num_particles)])
+        sys.steady_state()
+
+        report = instrumentation.report()
+        totals = report.totals()
+        for name in ['init_hamiltonian', 'init_dissipation', 'steady_state', 'steady_state/calc_lindbladian',
+                     'steady_state/calc_lindbladian/pattern', 'steady_state/calc_lindbladian/assemble',
+                     'steady_state/calc_lindbladian/refill']:
+            self.assertIn(name, totals)
+        self.assertEqual(totals['steady_state']['calls'], 2)
+        self.assertEqual(totals['init_dissipation']['calls'], 2)
+        self.assertIsNone(totals['steady_state']['memory_peak'])
+        self.assertEqual(report.operators['lindbladian']['nnz'], 1357)
+        self.assertEqual([name for name, _ in report.infos], ['steady_state', 'steady_state'])
+        self.assertTrue(any(event['type'] == 'operator' for event in events))
+        self.assertTrue(any(event['type'] == 'info' for event in events))
+        json.dumps(report.as_dict())
+        self.assertIn('calc_lindbladian', str(report))
+
+        sys.instrument(enabled=False)
+        self.assertEqual(len(sys.instrumentation.report().stages), 0)
+        sys.steady_state()
+        self.assertEqual(len(instrumentation.report().stages), len(report.stages))
+
+    def test_disabled(self):
+        sys = self.get_system()
+        self.init_system(sys)
+        # Disabled instrumentation is shared null object: stages reuse one empty context and nothing is recorded
+        self.assertIs(sys.instrumentation, null_instrumentation)
+        self.assertIs(null_instrumentation.stage('a'), null_instrumentation.stage('b'))
+        sys.steady_state()
+        report = sys.instrumentation.report()
+        self.assertEqual(report.stages, [])
+        self.assertEqual(report.operators, {})
+        self.assertEqual(report.infos, [])
+        self.assertFalse(tracemalloc.is_tracing())
@@ -0,0 +1,87 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import norm as sps_mtx_norm
+from oqspy.io import \
+    read_sparse_text, \
+    read_dense_text, \
+    write_sparse_text, \
+    write_dense_text, \
+    save_sparse_binary, \
+    load_sparse_binary, \
+    save_dense_binary, \
+    load_dense_binary
+from tests.infrastructure.load import load_sparse_matrix, load_dense_matrix
+from tests.unit.models.dimer import DimerModel
+
+
+class TestIO(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_text_round_trip(self):
+        fn = self.dimer.get_path() + 'lindbladian_mtx' + self.dimer.get_suffix()
+        super_size = self.dimer.sys_size * self.dimer.sys_size
+        mtx = read_sparse_text(fn, super_size)
+        self.assertEqual(mtx.shape, (super_size, super_size))
+        self.assertEqual(mtx.nnz, 1357)
+        self.assertEqual(mtx[1, 0], 3.4785054261852177e-01 + 3.1622776601683795e+00j)
+
+        fn_out = os.path.join(self.tmp_dir, 'mtx.txt')
+        write_sparse_text(fn_out, mtx)
+        with open(fn) as f_expected, open(fn_out) as f_actual:
+            self.assertEqual(f_expected.readline(), f_actual.readline())
+        self.assertEqual(sps_mtx_norm(read_sparse_text(fn_out, super_size) - mtx), 0.0)
+
+        fn = self.dimer.get_path() + 'rho_mtx' + self.dimer.get_suffix()
+        rho = read_dense_text(fn, self.dimer.sys_size)
+        self.assertEqual(rho[0, 0], 6.9378200577997984e-02 - 2.4684138464906506e-17j)
+        write_dense_text(fn_out, rho)
+        self.assertTrue(np.array_equal(read_dense_text(fn_out, self.dimer.sys_size), rho))
+        with self.assertRaises(ValueError):
+            read_dense_text(fn_out, self.dimer.sys_size + 1)
+
+    def test_text_reference(self):
+        # Vectorised readers agree with independent line-by-line reader of test fixtures
+        for dimer in [DimerModel(1), DimerModel(2)]:
+            super_size = dimer.sys_size * dimer.sys_size
+            for name, size in [('hamiltonian_mtx', dimer.sys_size), ('hamiltonian_drv_mtx', dimer.sys_size),
+                               ('diss_0_mtx', dimer.sys_size), ('lindbladian_mtx', super_size),
+                               ('lindbladian_drv_mtx', super_size)]:
+                fn = dimer.get_path() + name + dimer.get_suffix()
+                self.assertEqual(sps_mtx_norm(read_sparse_text(fn, size) - load_sparse_matrix(fn, size)), 0.0)
+            fn = dimer.get_path() + 'rho_mtx' + dimer.get_suffix()
+            self.assertTrue(np.array_equal(read_dense_text(fn, dimer.sys_size), load_dense_matrix(fn, dimer.sys_size)))
+
+    def test_binary_round_trip(self):
+        rng = np.random.RandomState(2)
+        mtx = csr_matrix(rng.rand(30, 20) * (rng.rand(30, 20) > 0.8) * (1.0 + 2.0j))
+        fn = os.path.join(self.tmp_dir, 'mtx.bin')
+        save_sparse_binary(fn, mtx)
+        for mmap in [True, False]:
+            loaded = load_sparse_binary(fn, mmap=mmap)
+            self.assertEqual(loaded.shape, mtx.shape)
+            self.assertEqual(loaded.dtype, mtx.dtype)
+            self.assertEqual(sps_mtx_norm(loaded - mtx), 0.0)
+            self.assertEqual(loaded.data.flags.writeable, not mmap)
+
+        save_sparse_binary(fn, csr_matrix((5, 5)))
+        self.assertEqual(load_sparse_binary(fn).nnz, 0)
+
+        with open(fn, 'wb') as f:
+            f.write(b'aaa')
+        with self.assertRaises(ValueError):
+            load_sparse_binary(fn)
+
+        fn = os.path.join(self.tmp_dir, 'rho.npy')
+        rho = rng.rand(4, 4) + 1.0j * rng.rand(4, 4)
+        save_dense_binary(fn, rho)
+        self.assertTrue(np.array_equal(load_dense_binary(fn), rho))
@@ -0,0 +1,152 @@
+import unittest
+import numpy as np
+from scipy import sparse
+from scipy.sparse.linalg import norm as sps_mtx_norm
+from tests.unit.models.dimer import DimerModel
+from tests.infrastructure.load import load_sparse_matrix
+from oqspy.oqs import oqs
+from oqspy.lindbladian import \
+    LindbladianPattern, \
+    assemble_lindbladian, \
+    assemble_driving_lindbladian, \
+    lindbladian_operator, \
+    driving_lindbladian_operator
+from oqspy.models.dimer import \
+    dimer_get_hamiltonian, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_dissipators
+
+
+def kron_lindbladian(hamiltonian, dissipators, gammas):
+    sys_size = hamiltonian.shape[0]
+    eye = sparse.eye(sys_size, sys_size, dtype=np.complex128, format='csr')
+    lindbladian = -1.0j * (sparse.kron(eye, hamiltonian) - sparse.kron(hamiltonian.transpose(copy=True), eye))
+    for diss, gamma in zip(dissipators, gammas):
+        tmp_1 = diss.getH().transpose(copy=True)
+        tmp_2 = diss.getH() * diss
+        tmp_3 = tmp_2.transpose(copy=True)
+        lindbladian += 0.5 * gamma * (
+            2.0 * sparse.kron(eye, diss) * sparse.kron(tmp_1, eye) - sparse.kron(tmp_3, eye) - sparse.kron(eye, tmp_2)
+        )
+    return lindbladian
+
+
+def random_sparse(size, density, seed):
+    rng = np.random.RandomState(seed)
+    mtx = sparse.random(size, size, density=density, format='csr', random_state=rng)
+    mtx.data = mtx.data + 1.0j * rng.rand(mtx.nnz)
+    return mtx
+
+
+class TestLindbladian(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer_1 = DimerModel(1)
+        self.dimer_2 = DimerModel(2)
+
+    def tearDown(self):
+        pass
+
+    def test_assemble_lindbladian_fixtures(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            hamiltonian = dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J)
+            dissipators = dimer_get_dissipators(dimer.num_particles)
+            fn = dimer.get_path() + 'lindbladian_mtx' + dimer.get_suffix()
+            l_expected = load_sparse_matrix(fn, dimer.sys_size * dimer.sys_size)
+            l_actual = assemble_lindbladian(hamiltonian, dissipators, [0.1 / float(dimer.num_particles)])
+            self.assertLess(sps_mtx_norm(l_expected - l_actual), 1.0e-14)
+
+            fn = dimer.get_path() + 'lindbladian_drv_mtx' + dimer.get_suffix()
+            l_expected = load_sparse_matrix(fn, dimer.sys_size * dimer.sys_size)
+            l_actual = assemble_driving_lindbladian(dimer_get_driving_hamiltonias(dimer.num_particles)[0])
+            self.assertLess(sps_mtx_norm(l_expected - l_actual), 1.0e-14)
+
+    def test_assemble_lindbladian_random(self):
+        hamiltonian = random_sparse(7, 0.4, 1)
+        hamiltonian = hamiltonian + hamiltonian.getH()
+        dissipators = [random_sparse(7, 0.3, 2), random_sparse(7, 0.3, 3)]
+        gammas = [0.3, 1.2]
+        l_expected = kron_lindbladian(hamiltonian, dissipators, gammas)
+        l_actual = assemble_lindbladian(hamiltonian, dissipators, gammas)
+        self.assertEqual(l_actual.shape, (49, 49))
+        self.assertLess(sps_mtx_norm(l_expected - l_actual), 1.0e-13)
+
+    def test_lindbladian_operator(self):
+        rng = np.random.RandomState(4)
+        for dimer in [self.dimer_1, self.dimer_2]:
+            hamiltonian = dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J)
+            dissipators = dimer_get_dissipators(dimer.num_particles)
+            gammas = [0.1 / float(dimer.num_particles)]
+            l_mtx = assemble_lindbladian(hamiltonian, dissipators, gammas)
+            l_op = lindbladian_operator(hamiltonian, dissipators, gammas)
+            vec = rng.rand(dimer.sys_size ** 2) + 1.0j * rng.rand(dimer.sys_size ** 2)
+            self.assertLess(np.linalg.norm(l_op.matvec(vec) - l_mtx @ vec), 1.0e-12)
+            self.assertLess(np.linalg.norm(l_op.rmatvec(vec) - l_mtx.getH() @ vec), 1.0e-12)
+
+            h_drv = dimer_get_driving_hamiltonias(dimer.num_particles)[0]
+            l_drv_mtx = assemble_driving_lindbladian(h_drv)
+            l_drv_op = driving_lindbladian_operator(h_drv)
+            self.assertLess(np.linalg.norm(l_drv_op.matvec(vec) - l_drv_mtx @ vec), 1.0e-12)
+
+        hamiltonian = random_sparse(6, 0.5, 5)
+        dissipators = [random_sparse(6, 0.4, 6)]
+        l_mtx = assemble_lindbladian(hamiltonian, dissipators, [0.7])
+        l_op = lindbladian_operator(hamiltonian, dissipators, [0.7])
+        vec = rng.rand(36) + 1.0j * rng.rand(36)
+        self.assertLess(np.linalg.norm(l_op.matvec(vec) - l_mtx @ vec), 1.0e-12)
+        self.assertLess(np.linalg.norm(l_op.rmatvec(vec) - l_mtx.getH() @ vec), 1.0e-12)
+
+    def test_lindbladian_pattern_refill(self):
+        dimer = self.dimer_1
+        hamiltonian = dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J)
+        dissipators = dimer_get_dissipators(dimer.num_particles)
+        pattern = LindbladianPattern(hamiltonian, dissipators)
+        lindbladian = pattern.assemble(hamiltonian, dissipators, [0.1])
+        data = lindbladian.data
+        indices = lindbladian.indices.copy()
+
+        hamiltonian_new = dimer_get_hamiltonian(dimer.num_particles, 2.0, 0.3, 1.5)
+        self.assertTrue(pattern.matches(hamiltonian_new, dissipators))
+        pattern.refill(lindbladian, hamiltonian_new, dissipators, [0.7])
+        self.assertIs(lindbladian.data, data)
+        self.assertTrue(np.array_equal(lindbladian.indices, indices))
+        l_expected = kron_lindbladian(hamiltonian_new, dissipators, [0.7])
+        self.assertLess(sps_mtx_norm(l_expected - lindbladian), 1.0e-12)
+
+        self.assertFalse(pattern.matches(random_sparse(dimer.sys_size, 0.3, 7), dissipators))
+        self.assertFalse(pattern.matches(hamiltonian_new, []))
+        with self.assertRaises(ValueError):
+            pattern.refill(kron_lindbladian(hamiltonian_new, dissipators, [0.7])[:, :-1], hamiltonian_new, dissipators, [0.7])
+
+    def test_oqs_lindbladian_rebuild(self):
+        dimer = self.dimer_2
+        hamiltonian = dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J)
+        dissipators = dimer_get_dissipators(dimer.num_particles)
+        sys = oqs(dimer.sys_size, 0, 1)
+        sys.init_hamiltonian(hamiltonian)
+        sys.init_dissipation(dissipators, [0.1])
+        sys._oqs__calc_lindbladian()
+        pattern = sys._oqs__lindbladian_pattern
+        lindbladian = sys._oqs__lindbladian
+        l_old = lindbladian.copy()
+
+        hamiltonian_new = dimer_get_hamiltonian(dimer.num_particles, 0.0, 1.0, 2.0)
+        sys.init_hamiltonian(hamiltonian_new)
+        sys.init_dissipation(dissipators, [0.3])
+        sys._oqs__calc_lindbladian()
+        self.assertIs(sys._oqs__lindbladian_pattern, pattern)
+        # Refill shares structure and does not touch data of previously returned Lindbladian
+        self.assertIsNot(sys._oqs__lindbladian, lindbladian)
+        self.assertTrue(np.shares_memory(sys._oqs__lindbladian.indices, lindbladian.indices))
+        self.assertTrue(np.shares_memory(sys._oqs__lindbladian.indptr, lindbladian.indptr))
+        self.assertFalse(np.shares_memory(sys._oqs__lindbladian.data, lindbladian.data))
+        self.assertEqual(sps_mtx_norm(lindbladian - l_old), 0.0)
+        l_expected = kron_lindbladian(hamiltonian_new, dissipators, [0.3])
+        self.assertLess(sps_mtx_norm(l_expected - sys._oqs__lindbladian), 1.0e-12)
+
+        hamiltonian_new = random_sparse(dimer.sys_size, 0.3, 8)
+        sys.init_hamiltonian(hamiltonian_new)
+        sys._oqs__calc_lindbladian()
+        self.assertIsNot(sys._oqs__lindbladian_pattern, pattern)
+        l_expected = kron_lindbladian(hamiltonian_new, dissipators, [0.3])
+        self.assertLess(sps_mtx_norm(l_expected - sys._oqs__lindbladian), 1.0e-12)
@@ -159,3 +159,41 @@ class TestDimerModel(unittest.TestCase):
         diss_actual = dimer_get_dissipators(self.dimer_2.num_particles)[0]
         norm_diff = sps_mtx_norm(diss_expected - diss_actual)
         self.assertLess(norm_diff, 1.0e-14)
+
+    def test_dtype(self):
+        for dtype in [np.float32, np.complex64, np.complex128]:
+            hamiltonian = dimer_get_hamiltonian(
+                self.dimer_1.num_particles,
+                self.dimer_1.E,
+                self.dimer_1.U,
+                self.dimer_1.J,
+                dtype=dtype
+            )
+            self.assertEqual(hamiltonian.dtype, dtype)
+            self.assertEqual(dimer_get_driving_hamiltonias(self.dimer_1.num_particles, dtype=dtype)[0].dtype, dtype)
+            self.assertEqual(dimer_get_dissipators(self.dimer_1.num_particles, dtype=dtype)[0].dtype, dtype)
+
+        fn = self.dimer_2.get_path() + 'hamiltonian_mtx' + self.dimer_2.get_suffix()
+        h_expected = load_sparse_matrix(fn, self.dimer_2.sys_size)
+        h_actual = dimer_get_hamiltonian(
+            self.dimer_2.num_particles,
+            self.dimer_2.E,
+            self.dimer_2.U,
+            self.dimer_2.J,
+            dtype=np.complex128
+        )
+        norm_diff = sps_mtx_norm(h_expected - h_actual)
+        self.assertLess(norm_diff, 1.0e-14)
+
+    def test_large_num_particles(self):
+        num_particles = 100000
+        sys_size = dimer_get_sys_size(num_particles)
+        hamiltonian = dimer_get_hamiltonian(num_particles, 1.0, 0.5, 1.0)
+        self.assertEqual(hamiltonian.shape, (sys_size, sys_size))
+        self.assertEqual(hamiltonian.nnz, 3 * sys_size - 2)
+        self.assertEqual((hamiltonian - hamiltonian.transpose()).nnz, 0)
+        self.assertAlmostEqual(hamiltonian.diagonal().sum() / float(sys_size), 0.0, places=6)
+
+        dissipator = dimer_get_dissipators(num_particles)[0]
+        self.assertEqual(dissipator.nnz, 3 * sys_size - 2)
+        self.assertEqual(dissipator[1, 0], -np.sqrt(float(num_particles)))
@@ -8,6 +8,7 @@ from scipy.sparse.linalg import norm as sps_mtx_norm
 from oqspy.models.dimer import \
     dimer_get_sys_size,\
     dimer_get_hamiltonian,\
+    dimer_get_periods, \
     dimer_get_driving_hamiltonias, \
     dimer_get_driving_functions, \
     dimer_get_dissipators
@@ -320,3 +321,108 @@ class TestOQS(unittest.TestCase):
         l_actual = sys._oqs__driving_lindbladians[0]
         norm_diff = sps_mtx_norm(l_expected - l_actual)
         self.assertLess(norm_diff, 1.0e-14)
+
+    def test_lazy_lindbladians(self):
+        sys_size = dimer_get_sys_size(self.dimer_1.num_particles)
+        hamiltonian = dimer_get_hamiltonian(
+            self.dimer_1.num_particles,
+            self.dimer_1.E,
+            self.dimer_1.U,
+            self.dimer_1.J
+        )
+        dissipators = dimer_get_dissipators(self.dimer_1.num_particles)
+        gamma = 0.1 / float(self.dimer_1.num_particles)
+        hamiltonians = dimer_get_driving_hamiltonias(self.dimer_1.num_particles)
+        functions = dimer_get_driving_functions(
+            self.dimer_1.drv_type,
+            self.dimer_1.drv_ampl,
+            self.dimer_1.drv_freq,
+            self.dimer_1.drv_phas
+        )
+        sys = oqs(sys_size, 1, 1)
+        with self.assertRaises(ValueError):
+            sys.lindbladian
+        with self.assertRaises(ValueError):
+            sys.driving_lindbladians
+
+        sys.init_hamiltonian(hamiltonian)
+        sys.init_dissipation(dissipators, [gamma])
+        sys.init_driving(hamiltonians, functions)
+        self.assertIsNone(sys._oqs__lindbladian)
+        self.assertIsNone(sys._oqs__driving_lindbladians)
+
+        fn = self.dimer_1.get_path() + 'lindbladian_mtx' + self.dimer_1.get_suffix()
+        l_expected = load_sparse_matrix(fn, self.dimer_1.sys_size * self.dimer_1.sys_size)
+        self.assertLess(sps_mtx_norm(l_expected - sys.lindbladian), 1.0e-14)
+        self.assertIs(sys.lindbladian, sys._oqs__lindbladian)
+        driving_lindbladians = sys.driving_lindbladians
+        self.assertIs(sys.driving_lindbladians, driving_lindbladians)
+
+        # Dissipation change invalidates only Lindbladian
+        lindbladian = sys.lindbladian
+        sys.init_dissipation(dissipators, [2.0 * gamma])
+        self.assertIsNone(sys._oqs__lindbladian)
+        self.assertIs(sys._oqs__driving_lindbladians, driving_lindbladians)
+        self.assertGreater(sps_mtx_norm(l_expected - sys.lindbladian), 1.0e-3)
+        # Previously returned Lindbladian is independent of rebuilt one
+        self.assertIsNot(sys.lindbladian, lindbladian)
+        self.assertLess(sps_mtx_norm(l_expected - lindbladian), 1.0e-14)
+
+        # Driving change invalidates only driving Lindbladians
+        lindbladian = sys.lindbladian
+        sys.init_driving(hamiltonians, functions)
+        self.assertIs(sys._oqs__lindbladian, lindbladian)
+        self.assertIsNone(sys._oqs__driving_lindbladians)
+        self.assertIsNot(sys.driving_lindbladians, driving_lindbladians)
+
+    def test_precision(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys_size = dimer_get_sys_size(dimer.num_particles)
+            fn = dimer.get_path() + 'lindbladian_mtx' + dimer.get_suffix()
+            l_expected = load_sparse_matrix(fn, dimer.sys_size * dimer.sys_size)
+            fn = dimer.get_path() + 'lindbladian_drv_mtx' + dimer.get_suffix()
+            l_drv_expected = load_sparse_matrix(fn, dimer.sys_size * dimer.sys_size)
+
+            sys = oqs(sys_size, 1, 1, precision='single')
+            sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+            sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+            sys.init_driving(
+                dimer_get_driving_hamiltonias(dimer.num_particles),
+                dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+            )
+            self.assertEqual(sys.precision, 'single')
+            self.assertEqual(sys.lindbladian.dtype, np.complex64)
+            self.assertEqual(sys.driving_lindbladians[0].dtype, np.complex64)
+            self.assertEqual(sys.get_lindbladian_operator().dtype, np.complex64)
+            self.assertLess(sps_mtx_norm(l_expected - sys.lindbladian) / sps_mtx_norm(l_expected), 1.0e-6)
+            self.assertLess(sps_mtx_norm(l_drv_expected - sys.driving_lindbladians[0]) / sps_mtx_norm(l_drv_expected), 1.0e-6)
+
+            # Propagation keeps double-precision states with tolerances limited to single precision
+            sys_double = oqs(sys_size, 1, 1)
+            sys_double.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+            sys_double.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+            sys_double.init_driving(
+                dimer_get_driving_hamiltonias(dimer.num_particles),
+                dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+            )
+            state = np.zeros(sys_size * sys_size, dtype=np.complex128)
+            state[0] = 1.0
+            times = [0.0, 0.5, 1.0]
+            for method in ['DOP853', 'CFM4']:
+                states = [s.copy() for _, s in sys.iter_propagate(state, times, method=method)]
+                states_double = [s.copy() for _, s in sys_double.iter_propagate(state, times, method=method)]
+                self.assertEqual(states[-1].dtype, np.complex128)
+                self.assertLess(np.max(np.abs(states[-1] - states_double[-1])), 1.0e-5)
+
+        dimer = self.dimer_1
+        rhos = []
+        for precision in ['single', 'double']:
+            sys = oqs(dimer_get_sys_size(3), 1, 1, precision=precision)
+            sys.init_hamiltonian(dimer_get_hamiltonian(3, dimer.E, dimer.U, dimer.J))
+            sys.init_dissipation(dimer_get_dissipators(3), [0.1])
+            sys.init_driving(
+                dimer_get_driving_hamiltonias(3),
+                dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+            )
+            rhos.append(sys.floquet(dimer_get_periods(dimer.drv_freq)[0])[1])
+        self.assertLess(np.max(np.abs(rhos[0] - rhos[1])), 1.0e-5)
@@ -0,0 +1,108 @@
+import unittest
+import numpy as np
+from unittest import mock
+from scipy.sparse import csr_matrix
+from scipy.sparse.linalg import LinearOperator
+import oqspy.parallel as parallel
+from oqspy.parallel import csr_matvec, set_num_threads, get_num_threads, threaded_operator
+from oqspy.propagation import propagate
+from oqspy.oqs import oqs
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+from tests.unit.models.dimer import DimerModel
+
+
+class TestParallel(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(2)
+        self.num_threads = get_num_threads()
+        self.min_nnz_per_thread = parallel.min_nnz_per_thread
+        # Split even small test matrices across threads
+        parallel.min_nnz_per_thread = 1
+
+    def tearDown(self):
+        set_num_threads(self.num_threads)
+        parallel.min_nnz_per_thread = self.min_nnz_per_thread
+
+    def get_system(self):
+        sys = oqs(dimer_get_sys_size(self.dimer.num_particles), 1, 1)
+        sys.init_hamiltonian(dimer_get_hamiltonian(self.dimer.num_particles, self.dimer.E, self.dimer.U, self.dimer.J))
+        sys.init_driving(
+            dimer_get_driving_hamiltonias(self.dimer.num_particles),
+            dimer_get_driving_functions(self.dimer.drv_type, self.dimer.drv_ampl, self.dimer.drv_freq, self.dimer.drv_phas)
+        )
+        sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.1 / float(self.dimer.num_particles)])
+        return sys
+
+    def test_num_threads(self):
+        set_num_threads(3)
+        self.assertEqual(get_num_threads(), 3)
+        set_num_threads()
+        self.assertGreaterEqual(get_num_threads(), 1)
+        with self.assertRaises(ValueError):
+            set_num_threads(0)
+
+    def test_csr_matvec(self):
+        lindbladian = self.get_system().lindbladian
+        rng = np.random.default_rng(0)
+        state = rng.random(lindbladian.shape[0]) + 1.0j * rng.random(lindbladian.shape[0])
+        block = rng.random((lindbladian.shape[0], 5)) + 0.0j
+        for num_threads in [1, 2, 4, 64]:
+            self.assertTrue(np.array_equal(csr_matvec(lindbladian, state, num_threads), lindbladian @ state))
+            self.assertTrue(np.array_equal(csr_matvec(lindbladian, block, num_threads), lindbladian @ block))
+        real = csr_matrix(lindbladian.real)
+        self.assertTrue(np.array_equal(csr_matvec(real, state, 4), real @ state))
+        # Narrower matrix is not applied by threaded kernel silently
+        single = csr_matrix(lindbladian, dtype=np.complex64)
+        with self.assertWarns(RuntimeWarning):
+            self.assertTrue(np.array_equal(csr_matvec(single, state, 4), single @ state))
+
+        out = np.zeros((lindbladian.shape[0], 5), dtype=np.complex128)
+        with self.assertRaises(ValueError):
+            parallel.csr_matvec_add(lindbladian, block, np.asfortranarray(out), 4)
+        with self.assertRaises(ValueError):
+            parallel.csr_matvec_add(lindbladian, block.astype(np.complex64), out, 4)
+        with self.assertRaises(ValueError):
+            parallel.csr_matvec_add(lindbladian, block, out[:, :4], 4)
+        self.assertTrue(np.array_equal(parallel.csr_matvec_add(lindbladian, np.asfortranarray(block), out, 4), lindbladian @ block))
+
+        operator = threaded_operator(lindbladian, 4)
+        self.assertIsInstance(operator, LinearOperator)
+        self.assertTrue(np.array_equal(operator.matvec(state), lindbladian @ state))
+        self.assertIs(threaded_operator(lindbladian, 1), lindbladian)
+
+    def test_sparsetools_fallback(self):
+        sys = self.get_system()
+        lindbladian = sys.lindbladian
+        rng = np.random.default_rng(0)
+        state = rng.random(lindbladian.shape[0]) + 1.0j * rng.random(lindbladian.shape[0])
+        block = rng.random((lindbladian.shape[0], 5)) + 0.0j
+        final = propagate(lindbladian, state, 0.0, 1.0, sys.driving_lindbladians, sys._oqs__driving_functions)
+        # Without private SciPy kernels products are computed by mtx @ state
+        with mock.patch.object(parallel, '_sparsetools', None):
+            for num_threads in [1, 4]:
+                self.assertTrue(np.array_equal(csr_matvec(lindbladian, state, num_threads), lindbladian @ state))
+                self.assertTrue(np.array_equal(csr_matvec(lindbladian, block, num_threads), lindbladian @ block))
+            out = np.ones(lindbladian.shape[0], dtype=np.complex128)
+            self.assertIs(parallel.csr_matvec_add(lindbladian, state, out, 4), out)
+            self.assertTrue(np.allclose(out, 1.0 + lindbladian @ state, rtol=1.0e-14, atol=1.0e-14))
+            final_fallback = propagate(lindbladian, state, 0.0, 1.0, sys.driving_lindbladians, sys._oqs__driving_functions)
+        self.assertLess(np.max(np.abs(final_fallback - final)), 1.0e-12)
+
+    def test_solvers(self):
+        sys = self.get_system()
+        state = np.zeros(sys.lindbladian.shape[0], dtype=np.complex128)
+        state[0] = 1.0
+        results = []
+        for num_threads in [1, 3]:
+            set_num_threads(num_threads)
+            rho, _ = sys.steady_state(method='gmres', preconditioner='jacobi', maxiter=2000)
+            final = propagate(sys.lindbladian, state, 0.0, 1.0, sys.driving_lindbladians, sys._oqs__driving_functions)
+            results.append((rho, final))
+        self.assertTrue(np.array_equal(results[0][0], results[1][0]))
+        self.assertTrue(np.array_equal(results[0][1], results[1][1]))
@@ -0,0 +1,329 @@
+import unittest
+import os
+import tempfile
+import numpy as np
+from scipy.linalg import expm
+from oqspy.oqs import oqs
+from oqspy.propagation import \
+    propagate, \
+    observable_weights, \
+    piecewise_segments, \
+    ExpmAction, \
+    PiecewiseConstantPropagator, \
+    DrivenGenerator, \
+    BatchedGenerator, \
+    MagnusPropagator, \
+    krylov_expm_action
+from scipy.sparse.linalg import aslinearoperator
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_periods, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+
+
+def get_system(dimer):
+    sys = oqs(dimer_get_sys_size(dimer.num_particles), 1, 1)
+    sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+    sys.init_driving(
+        dimer_get_driving_hamiltonias(dimer.num_particles),
+        dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+    )
+    sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+    sys._oqs__calc_lindbladian()
+    sys._oqs__calc_driving_lindbladians()
+    return sys
+
+
+def get_initial_state(sys_size):
+    rho = np.zeros((sys_size, sys_size), dtype=np.complex128)
+    rho[0, 0] = 1.0
+    return rho.ravel(order='F')
+
+
+class TestPropagation(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer_1 = DimerModel(1)
+        self.dimer_2 = DimerModel(2)
+
+    def tearDown(self):
+        pass
+
+    def test_propagate_autonomous(self):
+        sys = get_system(self.dimer_1)
+        lindbladian = sys._oqs__lindbladian
+        state = get_initial_state(self.dimer_1.sys_size)
+        s_expected = expm(2.0 * lindbladian.toarray()) @ state
+        s_actual = propagate(lindbladian, state, 0.0, 2.0)
+        self.assertLess(np.linalg.norm(s_expected - s_actual), 1.0e-9)
+
+    def test_expm_action(self):
+        sys = get_system(self.dimer_2)
+        lindbladian = sys._oqs__lindbladian
+        state = get_initial_state(self.dimer_2.sys_size)
+        for time in [0.0, 0.1, 3.0]:
+            action = ExpmAction(lindbladian, time)
+            s_expected = expm(time * lindbladian.toarray()) @ state
+            self.assertLess(np.linalg.norm(s_expected - action.apply(state)), 1.0e-12)
+
+        block = np.eye(lindbladian.shape[0], 3, dtype=np.complex128)
+        action = ExpmAction(lindbladian, 0.7)
+        b_expected = expm(0.7 * lindbladian.toarray()) @ block
+        self.assertLess(np.linalg.norm(b_expected - action.apply(block)), 1.0e-12)
+
+    def test_piecewise_segments(self):
+        functions = dimer_get_driving_functions(
+            self.dimer_2.drv_type,
+            self.dimer_2.drv_ampl,
+            self.dimer_2.drv_freq,
+            self.dimer_2.drv_phas
+        )
+        period = dimer_get_periods(self.dimer_2.drv_freq)[0]
+        detected_period, segments = piecewise_segments(functions)
+        self.assertAlmostEqual(detected_period, period)
+        self.assertEqual(len(segments), 2)
+        self.assertAlmostEqual(segments[0][0], 0.5 * period)
+        self.assertEqual(segments[0][1], [self.dimer_2.drv_ampl])
+        self.assertEqual(segments[1][1], [-self.dimer_2.drv_ampl])
+
+        functions = dimer_get_driving_functions(
+            self.dimer_1.drv_type,
+            self.dimer_1.drv_ampl,
+            self.dimer_1.drv_freq,
+            self.dimer_1.drv_phas
+        )
+        self.assertIsNone(piecewise_segments(functions))
+
+    def test_piecewise_constant_propagator(self):
+        sys = get_system(self.dimer_2)
+        lindbladian = sys._oqs__lindbladian.toarray()
+        driving_lindbladian = sys._oqs__driving_lindbladians[0].toarray()
+        period = dimer_get_periods(self.dimer_2.drv_freq)[0]
+        ampl = self.dimer_2.drv_ampl
+        period_expected = expm(0.5 * period * (lindbladian - ampl * driving_lindbladian)) @ \
+            expm(0.5 * period * (lindbladian + ampl * driving_lindbladian))
+
+        state = get_initial_state(self.dimer_2.sys_size)
+        states = sys.propagate_periods(state, 3, return_all=True)
+        s_expected = state
+        for s_actual in states:
+            s_expected = period_expected @ s_expected
+            self.assertLess(np.linalg.norm(s_expected - s_actual), 1.0e-11)
+        self.assertLess(np.linalg.norm(sys.propagate_periods(states[-1], 2) - period_expected @ period_expected @ states[-1]), 1.0e-11)
+
+        s_reference = propagate(
+            sys._oqs__lindbladian,
+            state,
+            0.0,
+            period,
+            sys._oqs__driving_lindbladians,
+            sys._oqs__driving_functions
+        )
+        self.assertLess(np.linalg.norm(s_reference - states[0]), 1.0e-7)
+
+        with self.assertRaises(ValueError):
+            PiecewiseConstantPropagator(sys._oqs__lindbladian, sys._oqs__driving_lindbladians, [])
+        with self.assertRaises(ValueError):
+            PiecewiseConstantPropagator(sys._oqs__lindbladian, sys._oqs__driving_lindbladians, [(1.0, [1.0, 2.0])])
+        with self.assertRaises(ValueError):
+            get_system(self.dimer_1).propagate_periods(state)
+
+    def test_driven_generator(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys = get_system(dimer)
+            lindbladian = sys._oqs__lindbladian
+            driving_lindbladian = sys._oqs__driving_lindbladians[0]
+            generator = DrivenGenerator(lindbladian, [driving_lindbladian, 2.0 * driving_lindbladian])
+            self.assertEqual(generator.nnz, (abs(lindbladian) + abs(driving_lindbladian)).nnz)
+
+            state = np.random.default_rng(0).random(lindbladian.shape[0]) + 0.0j
+            data = generator.matrix.data
+            for values in [[1.5, -0.5], [0.0, 0.0], [0.3, 0.7]]:
+                expected = lindbladian + (values[0] + 2.0 * values[1]) * driving_lindbladian
+                self.assertLess(abs(generator.evaluate(values) - expected).max(), 1.0e-14)
+                self.assertIs(generator.matrix.data, data)
+                for fused in [False, True]:
+                    self.assertLess(np.max(np.abs(generator.matvec(state, values, fused=fused) - expected @ state)), 1.0e-12)
+
+            functions = sys._oqs__driving_functions
+            rhs = generator.rhs(functions + functions)
+            expected = (lindbladian + 3.0 * functions[0](0.3) * driving_lindbladian) @ state
+            self.assertLess(np.max(np.abs(rhs(0.3, state) - expected)), 1.0e-12)
+            with self.assertRaises(ValueError):
+                generator.rhs(functions)
+
+        sys = get_system(self.dimer_1)
+        self.assertIs(sys.driven_generator, sys.driven_generator)
+        generator = sys.driven_generator
+        sys.init_dissipation(dimer_get_dissipators(self.dimer_1.num_particles), [0.2 / float(self.dimer_1.num_particles)])
+        self.assertIsNot(sys.driven_generator, generator)
+
+    def test_propagate_block(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys = get_system(dimer)
+            lindbladian = sys._oqs__lindbladian
+            driving_lindbladians = sys._oqs__driving_lindbladians
+            functions = sys._oqs__driving_functions
+            super_size = lindbladian.shape[0]
+            block = np.zeros((super_size, 3), dtype=np.complex128)
+            block[[0, dimer.sys_size + 1, 1], [0, 1, 2]] = 1.0
+
+            cases = [
+                (lindbladian, None, None),
+                (lindbladian, driving_lindbladians, functions),
+                (sys.driven_generator, None, functions)
+            ]
+            for generator, drivings, drv_functions in cases:
+                b_actual = propagate(generator, block, 0.0, 1.5, drivings, drv_functions)
+                self.assertEqual(b_actual.shape, block.shape)
+                for state_id in range(block.shape[1]):
+                    s_expected = propagate(generator, block[:, state_id], 0.0, 1.5, drivings, drv_functions)
+                    self.assertLess(np.max(np.abs(b_actual[:, state_id] - s_expected)), 1.0e-8)
+
+            times = [0.0, 0.5, 1.5]
+            results = [(time, states.copy()) for time, states in sys.iter_propagate(block, times)]
+            self.assertEqual([time for time, _ in results], times)
+            self.assertTrue(all(states.shape == block.shape for _, states in results))
+            s_expected = propagate(lindbladian, block[:, 1], 0.0, 1.5, driving_lindbladians, functions)
+            self.assertLess(np.max(np.abs(results[-1][1][:, 1] - s_expected)), 1.0e-8)
+
+            generator = sys.driven_generator
+            values = [0.7]
+            b_expected = generator.evaluate(values) @ block
+            for fused in [False, True]:
+                self.assertLess(np.max(np.abs(generator.matvec(block, values, fused=fused) - b_expected)), 1.0e-12)
+
+        with self.assertRaises(ValueError):
+            propagate(lindbladian, block, 0.0, 1.0, driving_lindbladians, functions, method='CFM4')
+
+    def test_batched_generator(self):
+        sys = get_system(self.dimer_1)
+        lindbladian = sys._oqs__lindbladian
+        driving_lindbladian = sys._oqs__driving_lindbladians[0]
+        weights = np.array([[0.0, 1.0, -2.0]])
+        generator = BatchedGenerator(lindbladian, [driving_lindbladian], weights)
+        block = np.random.default_rng(1).random((lindbladian.shape[0], 3)) + 0.0j
+        product = generator.matvec(block, [0.5])
+        for point_id in range(3):
+            expected = (lindbladian + 0.5 * weights[0, point_id] * driving_lindbladian) @ block[:, point_id]
+            self.assertLess(np.max(np.abs(product[:, point_id] - expected)), 1.0e-12)
+        with self.assertRaises(ValueError):
+            generator.matvec(block[:, :2], [0.5])
+        with self.assertRaises(ValueError):
+            BatchedGenerator(lindbladian, [driving_lindbladian], np.ones((2, 3)))
+
+        state = get_initial_state(self.dimer_1.sys_size)
+        gamma = 0.1 / float(self.dimer_1.num_particles)
+        times = [0.0, 0.5, 1.5]
+        expected = [states.copy() for _, states in sys.iter_propagate(state, times)]
+        cases = [
+            ({'driving_amplitudes': [0.0, 1.0]}, 1),
+            ({'dissipation_rates': [2.0 * gamma, gamma]}, 1),
+            ({'driving_amplitudes': [1.0, 3.0], 'dissipation_rates': [gamma, 0.5 * gamma]}, 0)
+        ]
+        for kwargs, point_id in cases:
+            results = [(time, block.copy()) for time, block in sys.iter_propagate_batch(state, times, **kwargs)]
+            self.assertEqual([time for time, _ in results], times)
+            for (_, block), states in zip(results, expected):
+                self.assertEqual(block.shape, (state.size, 2))
+                self.assertLess(np.max(np.abs(block[:, point_id] - states)), 1.0e-8)
+        s_autonomous = propagate(lindbladian, state, 0.0, 1.5)
+        block = list(sys.iter_propagate_batch(state, [0.0, 1.5], driving_amplitudes=[0.0, 1.0]))[-1][1]
+        self.assertLess(np.max(np.abs(block[:, 0] - s_autonomous)), 1.0e-8)
+
+        with self.assertRaises(ValueError):
+            sys.batched_generator()
+        with self.assertRaises(ValueError):
+            sys.batched_generator(driving_amplitudes=[1.0, 2.0], dissipation_rates=[gamma])
+        with self.assertRaises(ValueError):
+            sys.batched_generator(dissipation_rates=np.ones((2, 3)))
+
+    def test_krylov_expm_action(self):
+        sys = get_system(self.dimer_2)
+        lindbladian = sys._oqs__lindbladian
+        state = get_initial_state(self.dimer_2.sys_size)
+        for time in [0.0, 0.1, 3.0, 20.0]:
+            s_expected = expm(time * lindbladian.toarray()) @ state
+            s_actual, num_products = krylov_expm_action(lindbladian, time, state, tol=1.0e-12)
+            self.assertLess(np.linalg.norm(s_expected - s_actual), 1.0e-10)
+        self.assertLess(num_products, ExpmAction(lindbladian, 20.0).num_products())
+
+    def test_magnus_propagator(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys = get_system(dimer)
+            lindbladian = sys._oqs__lindbladian
+            driving_lindbladians = sys._oqs__driving_lindbladians
+            functions = sys._oqs__driving_functions
+            period = dimer_get_periods(dimer.drv_freq)[0]
+            state = get_initial_state(dimer.sys_size)
+            s_expected = propagate(lindbladian, state, 0.0, period, driving_lindbladians, functions, rtol=1.0e-12, atol=1.0e-14)
+
+            propagator = MagnusPropagator(lindbladian, driving_lindbladians, functions, rtol=1.0e-8, atol=1.0e-10)
+            s_actual = propagator.propagate(state, 0.0, period)
+            self.assertLess(np.max(np.abs(s_expected - s_actual)), 1.0e-7)
+            self.assertGreater(propagator.num_steps, 1)
+
+            s_actual = propagate(lindbladian, state, 0.0, period, driving_lindbladians, functions, method='CFM4', rtol=1.0e-8)
+            self.assertLess(np.max(np.abs(s_expected - s_actual)), 1.0e-7)
+
+        times = np.linspace(0.0, period, 4)
+        results = list(sys.iter_propagate(state, times, method='CFM4', rtol=1.0e-8))
+        self.assertTrue(np.allclose([time for time, _ in results], times))
+        self.assertLess(np.max(np.abs(results[-1][1] - s_expected)), 1.0e-7)
+
+        with self.assertRaises(ValueError):
+            MagnusPropagator(aslinearoperator(lindbladian), driving_lindbladians, functions)
+        with self.assertRaises(ValueError):
+            MagnusPropagator(lindbladian, driving_lindbladians, [])
+
+    def test_observable_weights(self):
+        rng = np.random.RandomState(3)
+        obs = rng.rand(4, 4) + 1.0j * rng.rand(4, 4)
+        rho = rng.rand(4, 4) + 1.0j * rng.rand(4, 4)
+        weights = observable_weights([obs, np.eye(4)], 4)
+        values = weights @ rho.ravel(order='F')
+        self.assertAlmostEqual(values[0], np.trace(obs @ rho), places=12)
+        self.assertAlmostEqual(values[1], np.trace(rho), places=12)
+        with self.assertRaises(ValueError):
+            observable_weights([np.eye(3)], 4)
+
+    def test_propagate_observables(self):
+        sys = get_system(self.dimer_1)
+        sys_size = self.dimer_1.sys_size
+        state = get_initial_state(sys_size)
+        times = np.linspace(0.0, 3.0, 7)
+        observables = [dimer_get_dissipators(self.dimer_1.num_particles)[0], np.eye(sys_size)]
+
+        states = [s.copy() for _, s in sys.iter_propagate(state, times)]
+        self.assertEqual(len(states), times.size)
+
+        calls = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fn = os.path.join(tmp_dir, 'observables.npy')
+            values = sys.propagate_observables(state, times, observables, callback=lambda *args: calls.append(args[0]), out=fn)
+            stored = np.load(fn)
+        self.assertListEqual(calls, list(range(times.size)))
+        self.assertLess(np.max(np.abs(stored - values)), 1.0e-15)
+        self.assertLess(np.max(np.abs(values[:, 1] - 1.0)), 1.0e-9)
+
+        for time_id, time in enumerate(times):
+            s_expected = state if time_id == 0 else propagate(
+                sys._oqs__lindbladian,
+                state,
+                0.0,
+                time,
+                sys._oqs__driving_lindbladians,
+                sys._oqs__driving_functions
+            )
+            self.assertLess(np.linalg.norm(states[time_id] - s_expected), 1.0e-8)
+            rho = s_expected.reshape((sys_size, sys_size), order='F')
+            self.assertLess(abs(values[time_id, 0] - np.trace(observables[0] @ rho)), 1.0e-8)
+
+        with self.assertRaises(ValueError):
+            list(sys.iter_propagate(state, [1.0, 0.0]))
+        with self.assertRaises(ValueError):
+            list(sys.iter_propagate(state, times, method='aaa'))
@@ -0,0 +1,73 @@
+import unittest
+import numpy as np
+from oqspy.oqs import oqs
+from oqspy.spectrum import liouvillian_spectrum, spectral_gap, ShiftInvert
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_dissipators
+from tests.unit.models.dimer import DimerModel
+
+
+class TestSpectrum(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(2)
+        self.sys = oqs(dimer_get_sys_size(self.dimer.num_particles), 0, 1)
+        self.sys.init_hamiltonian(dimer_get_hamiltonian(self.dimer.num_particles, self.dimer.E, self.dimer.U, self.dimer.J))
+        self.sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.1 / float(self.dimer.num_particles)])
+        eigenvalues = np.linalg.eigvals(self.sys.lindbladian.toarray())
+        self.expected = eigenvalues[np.argsort(np.abs(eigenvalues))]
+
+    def tearDown(self):
+        pass
+
+    def test_shift_invert(self):
+        lindbladian = self.sys.lindbladian
+        eigenvalues, modes, info = liouvillian_spectrum(lindbladian, k=4)
+        self.assertTrue(np.allclose(np.sort_complex(eigenvalues), np.sort_complex(self.expected[:4]), atol=1.0e-10))
+        self.assertLess(abs(eigenvalues[0]), 1.0e-10)
+        self.assertTrue(np.all(np.diff(eigenvalues.real) <= 0.0))
+        self.assertLess(np.max(info['residuals']), 1.0e-10)
+        self.assertIsInstance(info['factorization'], ShiftInvert)
+
+        # Steady state mode is density matrix up to normalization
+        rho = modes[:, 0].reshape((self.dimer.sys_size, self.dimer.sys_size), order='F')
+        rho = rho / np.trace(rho)
+        self.assertLess(np.max(np.abs(rho - rho.conj().T)), 1.0e-10)
+        self.assertLess(np.linalg.norm(lindbladian @ rho.ravel(order='F')), 1.0e-10)
+
+        factorization = info['factorization']
+        eigenvalues_reused, modes, info = liouvillian_spectrum(lindbladian, k=2, factorization=factorization, return_modes=False)
+        self.assertIsNone(modes)
+        self.assertTrue(np.allclose(eigenvalues_reused, eigenvalues[:2], atol=1.0e-10))
+        self.assertIs(info['factorization'], factorization)
+        with self.assertRaises(ValueError):
+            liouvillian_spectrum(lindbladian, k=2, factorization=factorization, sigma=1.0)
+
+    def test_matrix_free(self):
+        eigenvalues, _, info = liouvillian_spectrum(self.sys.get_lindbladian_operator(), k=4, return_modes=False)
+        self.assertEqual(info['method'], 'arnoldi')
+        expected = self.expected[np.argsort(-self.expected.real, kind='stable')]
+        self.assertTrue(np.allclose(eigenvalues.real, expected[:4].real, atol=1.0e-8))
+        with self.assertRaises(ValueError):
+            liouvillian_spectrum(self.sys.get_lindbladian_operator(), method='shift-invert')
+        with self.assertRaises(ValueError):
+            liouvillian_spectrum(self.sys.lindbladian, k=0)
+
+    def test_spectral_gap(self):
+        self.assertAlmostEqual(spectral_gap([0.0, -0.5 + 1.0j, -0.1 - 2.0j]), 0.1)
+        self.assertAlmostEqual(spectral_gap([0.0, -1.0e-14, -1.0]), 0.0, places=12)
+        with self.assertRaises(ValueError):
+            spectral_gap([0.0])
+
+        # Shift-invert gap is taken over k eigenvalues nearest to zero in modulus
+        rates = np.sort(-self.expected[:4].real)
+        self.assertAlmostEqual(self.sys.spectral_gap(k=4), rates[1] - rates[0], places=10)
+        rates = np.sort(-self.expected.real)
+        self.assertAlmostEqual(self.sys.spectral_gap(k=4, matrix_free=True), rates[1] - rates[0], places=8)
+        eigenvalues, _, info = self.sys.spectrum(k=3)
+        self.assertGreater(info['num_solves'], 0)
+        self.assertIs(self.sys.spectrum(k=3)[2]['factorization'], info['factorization'])
+        self.sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.2 / float(self.dimer.num_particles)])
+        self.assertIsNot(self.sys.spectrum(k=3)[2]['factorization'], info['factorization'])
@@ -0,0 +1,109 @@
+import unittest
+import numpy as np
+from oqspy.oqs import oqs
+from oqspy.lindbladian import assemble_lindbladian
+from oqspy.steady_state import steady_state, trace_row
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_dissipators
+
+
+class TestSteadyState(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer_1 = DimerModel(1)
+        self.dimer_2 = DimerModel(2)
+
+    def tearDown(self):
+        pass
+
+    def get_system(self, dimer, precision='double'):
+        sys = oqs(dimer_get_sys_size(dimer.num_particles), 0, 1, precision=precision)
+        sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+        sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [0.1 / float(dimer.num_particles)])
+        return sys
+
+    def test_trace_row(self):
+        rho = np.arange(9, dtype=np.complex128).reshape((3, 3))
+        self.assertEqual(trace_row(3).dot(rho.ravel(order='F')), np.trace(rho))
+
+    def test_steady_state_direct(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            hamiltonian = dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J)
+            dissipators = dimer_get_dissipators(dimer.num_particles)
+            lindbladian = assemble_lindbladian(hamiltonian, dissipators, [0.1 / float(dimer.num_particles)])
+
+            rho, info = steady_state(lindbladian, dimer.sys_size)
+            self.assertEqual(info['method'], 'direct')
+            self.assertLess(info['residual'], 1.0e-12)
+            self.assertAlmostEqual(np.trace(rho), 1.0, places=12)
+            self.assertLess(np.linalg.norm(rho - rho.conj().T), 1.0e-12)
+
+            evals, evecs = np.linalg.eig(lindbladian.toarray())
+            vec = evecs[:, np.argmin(np.abs(evals))]
+            rho_expected = vec.reshape((dimer.sys_size, dimer.sys_size), order='F')
+            rho_expected /= np.trace(rho_expected)
+            self.assertLess(np.linalg.norm(rho - rho_expected), 1.0e-10)
+
+    def test_steady_state_iterative(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            sys = self.get_system(dimer)
+            rho_direct, _ = sys.steady_state()
+            for method, preconditioner in [('gmres', 'ilu'), ('bicgstab', 'ilu'), ('bicgstab', 'jacobi')]:
+                rho, info = sys.steady_state(method=method, preconditioner=preconditioner, tol=1.0e-12, maxiter=5000)
+                self.assertTrue(info['converged'])
+                self.assertGreater(info['iterations'], 0)
+                self.assertLess(np.linalg.norm(rho - rho_direct), 1.0e-8)
+
+            rho, info = sys.steady_state(method='bicgstab', matrix_free=True, preconditioner=None, tol=1.0e-12, maxiter=5000)
+            self.assertTrue(info['converged'])
+            self.assertLess(np.linalg.norm(rho - rho_direct), 1.0e-8)
+
+    def test_steady_state_iterative_large(self):
+        # ILU of trace-row replaced Lindbladian of 101 x 101 dimer must not break down
+        dimer = DimerModel(2)
+        dimer.num_particles = 100
+        sys = self.get_system(dimer)
+        rho_direct, _ = sys.steady_state()
+        for method in ['gmres', 'bicgstab']:
+            rho, info = sys.steady_state(method=method, preconditioner='ilu', tol=1.0e-12, maxiter=100)
+            self.assertTrue(info['converged'])
+            self.assertLess(np.max(np.abs(rho - rho_direct)), 1.0e-10)
+
+    def test_steady_state_precision(self):
+        for dimer in [self.dimer_1, self.dimer_2]:
+            rho_double, _ = self.get_system(dimer).steady_state()
+
+            sys = self.get_system(dimer, 'single')
+            self.assertEqual(sys.lindbladian.dtype, np.complex64)
+            rho, info = sys.steady_state()
+            self.assertEqual(rho.dtype, np.complex64)
+            self.assertEqual(info['precision'], 'single')
+            self.assertLess(np.linalg.norm(rho - rho_double), 1.0e-4)
+
+            sys = self.get_system(dimer, 'mixed')
+            self.assertEqual(sys.lindbladian.dtype, np.complex128)
+            for method, kwargs in [('direct', {}), ('gmres', {'tol': 1.0e-12, 'maxiter': 5000})]:
+                rho, info = sys.steady_state(method=method, **kwargs)
+                self.assertEqual(rho.dtype, np.complex128)
+                self.assertGreater(info['refinements'], 0)
+                self.assertLess(info['residual'], 1.0e-10)
+                self.assertLess(np.linalg.norm(rho - rho_double), 1.0e-10)
+            with self.assertRaises(ValueError):
+                sys.steady_state(method='gmres', matrix_free=True)
+
+        with self.assertRaises(ValueError):
+            oqs(10, 0, 1, precision='half')
+
+    def test_steady_state_errors(self):
+        sys = self.get_system(self.dimer_1)
+        with self.assertRaises(ValueError):
+            sys.steady_state(method='aaa')
+        with self.assertRaises(ValueError):
+            sys.steady_state(method='direct', matrix_free=True)
+        with self.assertRaises(ValueError):
+            sys.steady_state(method='gmres', matrix_free=True, preconditioner='ilu')
+        with self.assertRaises(ValueError):
+            steady_state(sys.get_lindbladian_operator(), 5)
@@ -0,0 +1,110 @@
+import unittest
+import os
+import shutil
+import tempfile
+import numpy as np
+from oqspy.oqs import oqs
+import oqspy.sweep as sweep
+from oqspy.sweep import parameter_grid, point_label, point_key, run_sweep, load_sweep, dimer_sweep
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_dissipators
+
+
+def square_task(point):
+    return {'value': np.array([point['x'] ** 2])}
+
+
+class TestSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+    def test_parameter_grid(self):
+        grid = parameter_grid(E=[0.0, 1.0], J=[1.0], num_particles=[2, 3])
+        self.assertEqual(len(grid), 4)
+        self.assertDictEqual(grid[1], {'E': 0.0, 'J': 1.0, 'num_particles': 3})
+        self.assertEqual(point_label(grid[1]), 'E(0.0000)_J(1.0000)_num_particles(3)')
+        self.assertTrue(point_key(grid[1]).startswith(point_label(grid[1]) + '_'))
+        self.assertEqual(point_key(grid[1]), point_key({'num_particles': np.int64(3), 'J': np.float64(1.0), 'E': 0.0}))
+
+    def test_point_key(self):
+        # Points equal after rounding of label have different keys
+        self.assertNotEqual(point_key({'gamma': 1.0e-5}), point_key({'gamma': 1.1e-5}))
+        self.assertEqual(point_label({'gamma': 1.0e-5}), point_label({'gamma': 1.1e-5}))
+        self.assertNotEqual(point_key({'x': 1}), point_key({'x': 1.0}))
+        key = point_key({'method': 'gmres/ilu', 'drive': None, 'x': 2.0})
+        self.assertEqual(key.split('_')[:3], ['drive(None)', 'method(gmres-ilu)', 'x(2.0000)'])
+        self.assertNotIn('/', key)
+        self.assertNotEqual(key, point_key({'method': 'gmres-ilu', 'drive': None, 'x': 2.0}))
+
+    def test_run_sweep_restart(self):
+        points = parameter_grid(x=[1.0, 2.0, 3.0])
+        keys = run_sweep(points[:2], square_task, self.output_dir)
+        self.assertEqual(len(keys), 2)
+        keys = run_sweep(points, square_task, self.output_dir, num_workers=2)
+        self.assertListEqual(keys, [point_key(points[2])])
+        results = load_sweep(self.output_dir)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[point_key(points[2])]['value'][0], 9.0)
+        self.assertEqual(results[point_key(points[2])]['param_x'], 3.0)
+        self.assertFalse(any(fn.endswith('.tmp.npz') for fn in os.listdir(self.output_dir)))
+        with self.assertRaises(ValueError):
+            run_sweep(points, square_task, self.output_dir, num_workers=0)
+
+    def test_dimer_sweep(self):
+        points = parameter_grid(
+            num_particles=[3],
+            gamma=[0.1],
+            E=[0.0, 1.0],
+            U=[0.5],
+            J=[1.0],
+            drv_type=[0],
+            drv_ampl=[0.0, 1.5],
+            drv_freq=[1.0],
+            drv_phas=[0.0]
+        )
+        keys = dimer_sweep(points, self.output_dir, num_workers=2)
+        self.assertEqual(len(keys), 4)
+        results = load_sweep(self.output_dir)
+        for point in points:
+            rho = results[point_key(point)]['rho']
+            self.assertAlmostEqual(np.trace(rho), 1.0, places=10)
+            if point['drv_ampl'] == 0.0:
+                sys = oqs(dimer_get_sys_size(3), 0, 1)
+                sys.init_hamiltonian(dimer_get_hamiltonian(3, point['E'], point['U'], point['J']))
+                sys.init_dissipation(dimer_get_dissipators(3), [point['gamma']])
+                rho_expected, _ = sys.steady_state()
+                self.assertLess(np.linalg.norm(rho - rho_expected), 1.0e-12)
+        with self.assertRaises(ValueError):
+            dimer_sweep([{'E': 0.0}], self.output_dir)
+
+    def test_dimer_task_cache(self):
+        sweep._dimer_structure.cache_clear()
+        points = parameter_grid(
+            num_particles=list(range(1, 8)),
+            gamma=[0.1, 0.2],
+            E=[0.0, 1.0],
+            U=[0.5],
+            J=[1.0],
+            drv_type=[0],
+            drv_ampl=[0.0],
+            drv_freq=[1.0],
+            drv_phas=[0.0]
+        )
+        for point in points:
+            rho = sweep.dimer_task(point)['rho']
+            sys = oqs(dimer_get_sys_size(point['num_particles']), 0, 1)
+            sys.init_hamiltonian(dimer_get_hamiltonian(point['num_particles'], point['E'], point['U'], point['J']))
+            sys.init_dissipation(dimer_get_dissipators(point['num_particles']), [point['gamma']])
+            rho_expected, _ = sys.steady_state()
+            self.assertLess(np.linalg.norm(rho - rho_expected), 1.0e-12)
+        # Pattern is reused for points of the same size, only a few sizes are kept
+        info = sweep._dimer_structure.cache_info()
+        self.assertEqual(info.misses, 7)
+        self.assertEqual(info.hits, len(points) - 7)
+        self.assertEqual(info.currsize, sweep._dimer_cache_size)
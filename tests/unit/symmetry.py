@@ -0,0 +1,114 @@
+import unittest
+import numpy as np
+from scipy.sparse import csr_matrix, block_diag
+from oqspy.oqs import oqs
+from oqspy.steady_state import steady_state
+from oqspy.symmetry import \
+    connected_sectors, \
+    symmetry_sectors, \
+    split_superoperator
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_dissipators
+
+
+def parity(sys_size):
+    st_ids = np.arange(sys_size)
+    return csr_matrix((np.ones(sys_size), (st_ids, st_ids[::-1])), shape=(sys_size, sys_size))
+
+
+class TestSymmetry(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+        self.sys_size = dimer_get_sys_size(self.dimer.num_particles)
+        # Dimer without energy offset (E = 0) is symmetric under exchange of sites
+        self.sys = self.get_system(self.dimer.E)
+
+    def tearDown(self):
+        pass
+
+    def get_system(self, E, basis='vec'):
+        sys = oqs(self.sys_size, 0, 1, basis=basis)
+        sys.init_hamiltonian(dimer_get_hamiltonian(self.dimer.num_particles, E, self.dimer.U, self.dimer.J))
+        sys.init_dissipation(dimer_get_dissipators(self.dimer.num_particles), [0.1 / float(self.dimer.num_particles)])
+        return sys
+
+    def test_connected_sectors(self):
+        # Two uncoupled dimers: blocks of populations and coherences of each pair of dimers are independent
+        num_particles = [3, 4]
+        hamiltonians = [dimer_get_hamiltonian(n, self.dimer.E, self.dimer.U, self.dimer.J) for n in num_particles]
+        dissipators = [dimer_get_dissipators(n)[0] for n in num_particles]
+        sys_size = sum(dimer_get_sys_size(n) for n in num_particles)
+        sys = oqs(sys_size, 0, 1)
+        sys.init_hamiltonian(csr_matrix(block_diag(hamiltonians)))
+        sys.init_dissipation([csr_matrix(block_diag(dissipators))], [0.1])
+
+        sectors = sys.sectors()
+        self.assertEqual(len(sectors), 4)
+        self.assertEqual(sorted(sector.dim for sector in sectors), [16, 20, 20, 25])
+        self.assertEqual(len(split_superoperator(sys.lindbladian, sectors)), 4)
+
+        rhos, info = sys.sector_steady_states()
+        self.assertEqual(len(rhos), 2)
+        self.assertLess(max(info['residuals']), 1.0e-12)
+        for rho, n, offset in zip(rhos, num_particles, [0, dimer_get_sys_size(num_particles[0])]):
+            size = dimer_get_sys_size(n)
+            sub = oqs(size, 0, 1)
+            sub.init_hamiltonian(dimer_get_hamiltonian(n, self.dimer.E, self.dimer.U, self.dimer.J))
+            sub.init_dissipation(dimer_get_dissipators(n), [0.1])
+            expected, _ = sub.steady_state()
+            self.assertLess(np.max(np.abs(rho[offset:offset + size, offset:offset + size] - expected)), 1.0e-12)
+            self.assertAlmostEqual(np.trace(rho), 1.0)
+
+        sys_real = oqs(sys_size, 0, 1, basis='hermitian')
+        sys_real.init_hamiltonian(csr_matrix(block_diag(hamiltonians)))
+        sys_real.init_dissipation([csr_matrix(block_diag(dissipators))], [0.1])
+        rhos_real, _ = sys_real.sector_steady_states()
+        for rho_real, rho in zip(rhos_real, rhos):
+            self.assertLess(np.max(np.abs(rho_real - rho)), 1.0e-12)
+        with self.assertRaises(ValueError):
+            sys_real.sectors(parity(sys_size))
+
+    def test_symmetry_sectors(self):
+        sectors = self.sys.sectors(parity(self.sys_size))
+        self.assertEqual([sector.dim for sector in sectors], [61, 60])
+        self.assertEqual([sector.label for sector in sectors], [1.0, -1.0])
+        # Parity eigenvectors are sparse
+        self.assertEqual(sectors[0].basis.nnz, 221)
+        for sector in sectors:
+            self.assertTrue(np.allclose((sector.basis.conj().T @ sector.basis).toarray(), np.eye(sector.dim), atol=1.0e-14))
+
+        with self.assertRaises(ValueError):
+            self.get_system(1.0).sector_steady_states(parity(self.sys_size))
+        with self.assertRaises(ValueError):
+            symmetry_sectors(2.0 * parity(self.sys_size), self.sys_size)
+        with self.assertRaises(ValueError):
+            connected_sectors([])
+
+    def test_sector_solvers(self):
+        symmetry = parity(self.sys_size)
+        rho_expected, _ = steady_state(self.sys.lindbladian, self.sys_size)
+        for num_workers in [1, 2]:
+            rhos, info = self.sys.sector_steady_states(symmetry, num_workers=num_workers)
+            self.assertEqual(len(rhos), 1)
+            self.assertEqual(info['labels'], [1.0])
+            self.assertLess(np.max(np.abs(rhos[0] - rho_expected)), 1.0e-12)
+
+        eigenvalues, sector_ids, _ = self.sys.sector_spectrum(k=4, symmetry=symmetry)
+        expected = np.linalg.eigvals(self.sys.lindbladian.toarray())
+        self.assertEqual(eigenvalues.size, 8)
+        self.assertEqual(set(sector_ids), {0, 1})
+        self.assertLess(abs(eigenvalues[0]), 1.0e-10)
+        for eigenvalue in eigenvalues:
+            self.assertLess(np.min(np.abs(expected - eigenvalue)), 1.0e-8)
+
+        rho_init = np.zeros((self.sys_size, self.sys_size), dtype=np.complex128)
+        rho_init[0, 0] = 1.0
+        state = rho_init.ravel(order='F')
+        expected = [s for _, s in self.sys.iter_propagate(state, [0.0, 1.0])][-1]
+        for num_workers in [1, 2]:
+            actual = self.sys.propagate_sectors(state, 0.0, 1.0, symmetry, num_workers=num_workers)
+            self.assertLess(np.max(np.abs(actual - expected)), 1.0e-9)
@@ -0,0 +1,136 @@
+import unittest
+import numpy as np
+from unittest import mock
+from scipy.sparse import csr_matrix
+from oqspy.oqs import oqs
+from oqspy.trajectories import effective_hamiltonian, run_trajectories
+import oqspy.trajectories as trajectories
+from oqspy.propagation import propagate
+from tests.unit.models.dimer import DimerModel
+from oqspy.models.dimer import \
+    dimer_get_sys_size, \
+    dimer_get_hamiltonian, \
+    dimer_get_driving_hamiltonias, \
+    dimer_get_driving_functions, \
+    dimer_get_dissipators
+
+
+class TestTrajectories(unittest.TestCase):
+
+    def setUp(self):
+        self.dimer = DimerModel(1)
+        self.dimer.num_particles = 2
+        self.dimer.sys_size = 3
+
+    def tearDown(self):
+        pass
+
+    def get_system(self, gamma):
+        dimer = self.dimer
+        sys = oqs(dimer_get_sys_size(dimer.num_particles), 1, 1)
+        sys.init_hamiltonian(dimer_get_hamiltonian(dimer.num_particles, dimer.E, dimer.U, dimer.J))
+        sys.init_driving(
+            dimer_get_driving_hamiltonias(dimer.num_particles),
+            dimer_get_driving_functions(dimer.drv_type, dimer.drv_ampl, dimer.drv_freq, dimer.drv_phas)
+        )
+        sys.init_dissipation(dimer_get_dissipators(dimer.num_particles), [gamma])
+        return sys
+
+    def test_effective_hamiltonian(self):
+        hamiltonian = dimer_get_hamiltonian(2, 0.0, 0.5, 1.0)
+        dissipators = dimer_get_dissipators(2)
+        h_eff = effective_hamiltonian(hamiltonian, dissipators, [0.2])
+        h_expected = hamiltonian.toarray() - 0.1j * dissipators[0].toarray().T @ dissipators[0].toarray()
+        self.assertLess(np.linalg.norm(h_eff.toarray() - h_expected), 1.0e-14)
+
+    def test_trajectories_ensemble(self):
+        sys = self.get_system(0.3)
+        sys_size = self.dimer.sys_size
+        psi_init = np.zeros(sys_size, dtype=np.complex128)
+        psi_init[0] = 1.0
+        times = np.linspace(0.0, 1.5, 4)
+        observables = [csr_matrix(([1.0], ([k], [k])), shape=(sys_size, sys_size)) for k in range(sys_size)]
+
+        result = sys.trajectories(psi_init, times, observables, 300, seed=1, dt=1.0e-2)
+        self.assertEqual(result['num_trajectories'], 300)
+        self.assertGreater(result['num_jumps'], 0)
+        self.assertEqual(result['convergence'][-1][0], 300)
+        self.assertLess(result['convergence'][-1][1], result['convergence'][0][1])
+        self.assertLess(np.max(np.abs(np.sum(result['mean'], axis=0) - 1.0)), 1.0e-10)
+
+        sys._oqs__calc_lindbladian()
+        sys._oqs__calc_driving_lindbladians()
+        rho = np.outer(psi_init, psi_init.conj()).ravel(order='F')
+        for time_id in range(1, times.size):
+            rho = propagate(
+                sys._oqs__lindbladian,
+                rho,
+                times[time_id - 1],
+                times[time_id],
+                sys._oqs__driving_lindbladians,
+                sys._oqs__driving_functions
+            )
+            populations = np.real(np.diag(rho.reshape((sys_size, sys_size), order='F')))
+            diff = np.abs(result['mean'][:, time_id].real - populations)
+            self.assertTrue(np.all(diff < 5.0 * result['std_error'][:, time_id] + 1.0e-3))
+
+    def test_trajectories_reproducible(self):
+        sys = self.get_system(0.5)
+        psi_init = np.ones(self.dimer.sys_size, dtype=np.complex128)
+        times = np.linspace(0.0, 1.0, 3)
+        observables = [dimer_get_dissipators(self.dimer.num_particles)[0]]
+        serial = sys.trajectories(psi_init, times, observables, 40, seed=7, batch_size=5)
+        parallel = sys.trajectories(psi_init, times, observables, 40, num_workers=2, seed=7, batch_size=5)
+        self.assertLess(np.max(np.abs(serial['mean'] - parallel['mean'])), 1.0e-12)
+        self.assertEqual(serial['num_jumps'], parallel['num_jumps'])
+
+    def test_trajectories_stability(self):
+        # At num_particles=100 step * ||H_eff|| is about 5 for default dt, outside RK4 stability region
+        self.dimer.num_particles = 100
+        self.dimer.sys_size = 101
+        sys = self.get_system(0.1)
+        sys_size = self.dimer.sys_size
+        psi_init = np.zeros(sys_size, dtype=np.complex128)
+        psi_init[sys_size // 2] = 1.0
+        times = np.linspace(0.0, 0.2, 3)
+        observables = [csr_matrix(([1.0], ([k], [k])), shape=(sys_size, sys_size)) for k in range(sys_size)]
+
+        with mock.patch.object(trajectories, '_rk4_radius', np.inf):
+            with self.assertRaises(RuntimeError):
+                sys.trajectories(psi_init, times, observables, 1, seed=1)
+
+        result = sys.trajectories(psi_init, times, observables, 20, seed=1)
+        self.assertLess(np.max(np.abs(np.sum(result['mean'], axis=0) - 1.0)), 1.0e-10)
+        rho = np.outer(psi_init, psi_init.conj()).ravel(order='F')
+        rho = propagate(
+            sys.lindbladian,
+            rho,
+            times[0],
+            times[-1],
+            sys.driving_lindbladians,
+            sys._oqs__driving_functions
+        )
+        populations = np.real(np.diag(rho.reshape((sys_size, sys_size), order='F')))
+        diff = np.abs(result['mean'][:, -1].real - populations)
+        self.assertTrue(np.all(diff < 5.0 * result['std_error'][:, -1] + 1.0e-3))
+
+    def test_trajectories_errors(self):
+        sys = self.get_system(0.5)
+        psi_init = np.ones(self.dimer.sys_size, dtype=np.complex128)
+        with self.assertRaises(ValueError):
+            sys.trajectories(psi_init, [0.0, 1.0], [], 0)
+        with self.assertRaises(ValueError):
+            sys.trajectories(psi_init, [1.0, 0.0], [], 10)
+        with self.assertRaises(ValueError):
+            sys.trajectories(np.ones(2), [0.0, 1.0], [], 10)
+        with self.assertRaises(ValueError):
+            run_trajectories(
+                sys._oqs__hamiltonian,
+                sys._oqs__dissipators,
+                sys._oqs__gammas,
+                psi_init,
+                [0.0, 1.0],
+                [],
+                10,
+                num_workers=0
+            )